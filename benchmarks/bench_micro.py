@@ -0,0 +1,167 @@
+'''
+Micro benchmarks of the helper functions and GenericCrudView serialization.
+
+pytest-benchmark tests, kept out of the default test run by the file name;
+pass the file explicitly. The CRUD cases read from an in-memory SQLite
+database seeded with 1000 skills. Save a run, then compare later runs
+against it (non-zero exit when a median got more than 10% slower):
+
+    python -m pytest benchmarks/bench_micro.py --benchmark-autosave
+    python -m pytest benchmarks/bench_micro.py --benchmark-compare --benchmark-compare-fail=median:10%
+'''
+import os
+import datetime
+import uuid
+
+os.environ.setdefault("SQLALCHEMY_DATABASE_URL", "sqlite://")
+
+import pytest
+from cryptography.fernet import Fernet
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import insert
+
+from src.Api.config import ENTRYPTION_KEY
+from src.Api.database import engine, Base, SessionLocal
+from src.Api.models import Skill
+from src.Api.cache import LRUCache
+from src.Api.helper import (generate_jwt_token, decode_jwt_token, encode_cursor, decode_cursor,
+                            make_etag, etag_matches, create_email_token, read_email_token,
+                            VERIFY_EMAIL)
+from src.Api.instrumentation import fingerprint
+from src.Api.metrics import Histogram, Registry
+from src.Api.views.admin_view import skill_crud
+
+
+ROWS = 1000
+EMAIL = "bench@example.com"
+CURSOR_TIME = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+STATEMENT = "SELECT skill.id FROM skill WHERE skill.skill_name = 'python' AND skill.id IN (1, 2, 3)"
+FERNET = Fernet(ENTRYPTION_KEY)
+
+
+def fernet_link(email):
+    # Email links before signed tokens: the str() of a Fernet token, eval'd back on verify.
+    return str(FERNET.encrypt(email.encode()))
+
+
+def fernet_link_email(token):
+    return FERNET.decrypt(eval(token)).decode()
+
+
+@pytest.fixture(scope="module")
+def skill_ids():
+    Base.metadata.create_all(engine)
+    ids = [str(uuid.uuid4()) for _ in range(ROWS)]
+    with engine.begin() as connection:
+        connection.execute(insert(Skill.__table__), [
+            {"id": id, "skill_name": f"skill-{i}", "created_at": CURSOR_TIME + datetime.timedelta(seconds=i)}
+            for i, id in enumerate(ids)
+        ])
+    return ids
+
+
+@pytest.fixture
+def db(skill_ids):
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+@pytest.mark.benchmark(group="jwt")
+def test_generate_jwt_token(benchmark):
+    benchmark(generate_jwt_token, {"email": EMAIL})
+
+
+@pytest.mark.benchmark(group="jwt")
+def test_decode_jwt_token(benchmark):
+    token = generate_jwt_token({"email": EMAIL})
+    assert benchmark(decode_jwt_token, token)["email"] == EMAIL
+
+
+@pytest.mark.benchmark(group="cursor")
+def test_encode_cursor(benchmark):
+    benchmark(encode_cursor, CURSOR_TIME, str(uuid.uuid4()))
+
+
+@pytest.mark.benchmark(group="cursor")
+def test_decode_cursor(benchmark):
+    cursor = encode_cursor(CURSOR_TIME, str(uuid.uuid4()))
+    benchmark(decode_cursor, cursor)
+
+
+@pytest.mark.benchmark(group="etag")
+def test_make_etag(benchmark):
+    benchmark(make_etag, "skill", 0, 10, None, 1000, "2024-01-01")
+
+
+@pytest.mark.benchmark(group="etag")
+def test_etag_matches(benchmark):
+    etag = make_etag("skill", 0, 10, None, 1000, "2024-01-01")
+    assert benchmark(etag_matches, 'W/"abc", ' + etag, etag)
+
+
+@pytest.mark.benchmark(group="email links")
+def test_fernet_link_create(benchmark):
+    benchmark(fernet_link, EMAIL)
+
+
+@pytest.mark.benchmark(group="email links")
+def test_fernet_link_verify(benchmark):
+    link = fernet_link(EMAIL)
+    assert benchmark(fernet_link_email, link) == EMAIL
+
+
+@pytest.mark.benchmark(group="email links")
+def test_email_token_create(benchmark):
+    benchmark(create_email_token, EMAIL, VERIFY_EMAIL)
+
+
+@pytest.mark.benchmark(group="email links")
+def test_email_token_verify(benchmark):
+    token = create_email_token(EMAIL, VERIFY_EMAIL)
+    assert benchmark(read_email_token, token, VERIFY_EMAIL).email == EMAIL
+
+
+@pytest.mark.benchmark(group="cache")
+def test_lru_cache_hit(benchmark):
+    cache = LRUCache(1024, 60)
+    cache.set("hit", 1)
+    assert benchmark(cache.get, "hit") == 1
+
+
+@pytest.mark.benchmark(group="cache")
+def test_lru_cache_set(benchmark):
+    cache = LRUCache(1024, 60)
+    keys = iter(range(10 ** 12))
+    benchmark(lambda: cache.set(next(keys), 1))
+
+
+@pytest.mark.benchmark(group="instrumentation")
+def test_sql_fingerprint(benchmark):
+    benchmark(fingerprint, STATEMENT)
+
+
+@pytest.mark.benchmark(group="instrumentation")
+def test_histogram_observe(benchmark):
+    histogram = Histogram("bench_seconds", "Benchmark histogram.", registry=Registry())
+    benchmark(histogram.observe, 0.042)
+
+
+@pytest.mark.benchmark(group="crud")
+def test_crud_get_row(benchmark, db, skill_ids):
+    benchmark(skill_crud.get_row, db, skill_ids[0])
+
+
+@pytest.mark.benchmark(group="crud")
+@pytest.mark.parametrize("limit", [10, 100])
+def test_crud_fetch_page(benchmark, db, limit):
+    data, _ = benchmark(skill_crud.fetch_page, db, 0, limit, None)
+    assert len(data) == limit
+
+
+@pytest.mark.benchmark(group="crud")
+def test_crud_render_page(benchmark, db):
+    data, _ = skill_crud.fetch_page(db, 0, 10, None)
+    benchmark(lambda: ORJSONResponse({"message": "ok", "data": data}).body)
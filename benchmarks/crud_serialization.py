@@ -0,0 +1,83 @@
+'''
+Per-row cost of GenericCrudView's list read path, before and after column projection.
+
+"before" reproduces the old path: load full ORM entities, copy attributes
+out of obj.__dict__ and serialize with JSONResponse (stdlib json).
+"after" is GenericCrudView.fetch_page + ORJSONResponse: only the response
+model's columns are selected and rows are zipped straight into dicts.
+
+Runs against an in-memory SQLite database by default:
+
+    python -m benchmarks.crud_serialization --rows 2000 --repeat 20
+'''
+import os
+import argparse
+import datetime
+import time
+import uuid
+
+os.environ.setdefault("SQLALCHEMY_DATABASE_URL", "sqlite://")
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from sqlalchemy import insert
+
+from src.Api.database import engine, Base, SessionLocal
+from src.Api.models import Permission
+from src.Api.pydantic_models import PydanticPermission
+from src.Api.views.admin_view import GenericCrudView
+
+
+def seed(rows):
+    Base.metadata.create_all(engine)
+    start = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+    with engine.begin() as connection:
+        connection.execute(insert(Permission.__table__), [
+            {"id": str(uuid.uuid4()), "name": f"entity_{i % 50}", "operation": "read",
+             "created_at": start + datetime.timedelta(seconds=i)}
+            for i in range(rows)
+        ])
+
+
+def before(db, keys, limit):
+    db.expunge_all()
+    db_obj_list = db.query(Permission).order_by(Permission.created_at, Permission.id).limit(limit).all()
+    data_list = []
+    for obj in db_obj_list:
+        attributes = dict(obj.__dict__.items())
+        data = {key: attributes[key] for key in keys}
+        data["id"] = attributes["id"]
+        data_list.append(data)
+    return JSONResponse(status_code=200, content={"data": data_list})
+
+
+def after(db, view, limit):
+    data_list, next_cursor = view.fetch_page(db, 0, limit, None)
+    return ORJSONResponse(status_code=200, content={"data": data_list, "next_cursor": next_cursor})
+
+
+def measure(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    seed(args.rows)
+    db = SessionLocal()
+    view = GenericCrudView(Permission, response_model=PydanticPermission)
+    keys = PydanticPermission.__annotations__
+
+    old = measure(lambda: before(db, keys, args.rows), args.repeat)
+    new = measure(lambda: after(db, view, args.rows), args.repeat)
+    for name, elapsed in (("before (entities + json)", old), ("after (columns + orjson)", new)):
+        print(f"{name:<26} {elapsed * 1000:8.2f} ms/page  {elapsed / args.rows * 1e6:6.2f} us/row")
+    print(f"speedup: {old / new:.2f}x")
+    db.close()
@@ -0,0 +1,96 @@
+'''
+Throughput and memory of the streaming employee skills export on a synthetic dataset.
+
+Seeds a SQLite file (or the database in SQLALCHEMY_DATABASE_URL) with
+--rows EmpSkill rows spread over --users employees, then drains the CSV
+and NDJSON export generators exactly as the StreamingResponse would and
+reports rows/s and the peak Python heap seen by tracemalloc (which
+itself slows the loop down, so treat rows/s as a lower bound). With
+--compare it also materializes the same rows as one JSON document, which
+is what a single JSONResponse would have to build.
+
+    python -m benchmarks.export_stream --rows 1000000
+'''
+import os
+import argparse
+import tempfile
+import time
+import tracemalloc
+import uuid
+
+DB_PATH = os.path.join(tempfile.gettempdir(), "skill_matrix_export_bench.db")
+os.environ.setdefault("SQLALCHEMY_DATABASE_URL", f"sqlite:///{DB_PATH}")
+
+import orjson
+from sqlalchemy import insert
+
+from src.Api.database import engine, Base, SessionLocal
+from src.Api.models import User, UserProfile, Skill, EmpSkill
+from src.Api.views.matrix_view import export_body, export_query, EXPORT_COLUMNS
+
+BATCH = 50000
+
+
+def seed(rows, users, skills):
+    if engine.url.get_backend_name() == "sqlite" and os.path.exists(DB_PATH):
+        os.remove(DB_PATH)
+    Base.metadata.create_all(engine)
+    profile_ids = [str(uuid.uuid4()) for _ in range(users)]
+    skill_ids = [str(uuid.uuid4()) for _ in range(skills)]
+    with engine.begin() as connection:
+        connection.execute(insert(UserProfile.__table__), [{"id": id} for id in profile_ids])
+        connection.execute(insert(User.__table__), [
+            {"id": str(uuid.uuid4()), "full_name": f"Employee {i}", "password": "x",
+             "email_address": f"employee{i}@example.com", "user_profile_id": id}
+            for i, id in enumerate(profile_ids)
+        ])
+        connection.execute(insert(Skill.__table__), [
+            {"id": id, "skill_name": f"skill-{i}"} for i, id in enumerate(skill_ids)
+        ])
+        for start in range(0, rows, BATCH):
+            connection.execute(insert(EmpSkill.__table__), [
+                {"id": str(uuid.uuid4()), "user_profile_id": profile_ids[i % users],
+                 "skill_id": skill_ids[i % skills], "skill_type": "primary",
+                 "rate_by_self": i % 5 + 1, "certificate": f"cert-{i}"}
+                for i in range(start, min(start + BATCH, rows))
+            ])
+
+
+def measure(label, body, rows):
+    tracemalloc.start()
+    start = time.perf_counter()
+    size = 0
+    for chunk in body:
+        size += len(chunk)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<14} {rows / elapsed:10.0f} rows/s  {size / 2**20:8.1f} MiB out  "
+          f"peak heap {peak / 2**20:8.1f} MiB")
+
+
+def materialized():
+    db = SessionLocal()
+    try:
+        columns = list(EXPORT_COLUMNS)
+        data = [dict(zip(columns, row)) for row in db.execute(export_query())]
+        yield orjson.dumps({"data": data})
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--users", type=int, default=50000)
+    parser.add_argument("--skills", type=int, default=2000)
+    parser.add_argument("--compare", action="store_true")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    seed(args.rows, args.users, args.skills)
+    print(f"seeded {args.rows} rows in {time.perf_counter() - start:.1f}s")
+    measure("csv stream", export_body("csv"), args.rows)
+    measure("ndjson stream", export_body("ndjson"), args.rows)
+    if args.compare:
+        measure("materialized", materialized(), args.rows)
@@ -0,0 +1,163 @@
+'''
+HTTP load driver covering every router, with p50/p95/p99 and throughput per endpoint.
+
+Seeds a synthetic organisation with src.Api.datagen into a SQLite file,
+or into the database in SQLALCHEMY_DATABASE_URL (pass --truncate to
+replace an earlier run there), then fires --requests requests per
+endpoint with --concurrency in flight. Requests go through httpx's ASGI
+transport, so no server is needed; pass --url to load a running server
+that uses the same database instead.
+
+Endpoints that send mail or write data (signup, verify-email,
+forgot-password, updates, imports) are left out so runs are repeatable.
+
+    python -m benchmarks.load --users 2000 --requests 200 --concurrency 20 --save load.json
+    python -m benchmarks.load --baseline load.json
+'''
+import os
+import sys
+import argparse
+import asyncio
+import tempfile
+import time
+
+DB_PATH = os.path.join(tempfile.gettempdir(), "skill_matrix_load_bench.db")
+os.environ.setdefault("SQLALCHEMY_DATABASE_URL", f"sqlite:///{DB_PATH}")
+
+import httpx
+
+from src.Api.database import engine, Base
+from src.Api.datagen import Distribution, generate
+from src.Api.helper import generate_jwt_token
+
+from . import report
+
+
+PASSWORD = "bench-password"
+
+
+def seed(args):
+    '''
+    Load the synthetic organisation and return the ids the endpoints need.
+    '''
+    if engine.url.get_backend_name() == "sqlite" and os.path.exists(DB_PATH):
+        os.remove(DB_PATH)
+    Base.metadata.create_all(engine)
+    distribution = Distribution(
+        users=args.users, skills=args.skills, skills_per_user=(args.skills_per_user,) * 2,
+        fanout=args.fanout, projects=20, designations=10, competencies=10,
+        password=PASSWORD, seed=args.seed,
+    )
+    with engine.begin() as connection:
+        generator = generate(connection, distribution, clear=args.truncate, progress=lambda _: None)
+    return {
+        "email": generator.email(0),
+        "root": generator.root_id,
+        "manager": generator.profile_ids[1] if args.users > 1 else generator.root_id,
+        "project": generator.project_ids[0],
+        "skill": generator.skill_ids[0],
+        "skills": generator.skill_ids[:3],
+        "designation": generator.designation_ids[0],
+        "competency": generator.competency_ids[0],
+        "permission": generator.permission_ids[0],
+        "role": generator.admin_role_id,
+    }
+
+
+def endpoints(ids):
+    '''
+    (name, method, path, request kwargs) for every endpoint under load.
+    '''
+    search = {"criteria": [{"skill_id": id, "min_self_rating": 2} for id in ids["skills"][:2]],
+              "match": "any"}
+    cases = [
+        ("auth login", "POST", "/auth/login", {"json": {"email": ids["email"], "password": PASSWORD}}),
+    ]
+    for entity in ("project", "skill", "designation", "competency", "permission", "role"):
+        cases.append((f"admin {entity} list", "GET", f"/admin/{entity}-list", {"params": {"limit": 50}}))
+        cases.append((f"admin {entity} get", "GET", f"/admin/{entity}/{ids[entity]}", {}))
+    cases += [
+        ("admin cache stats", "GET", "/admin/cache-stats", {}),
+        ("admin hash pool", "GET", "/admin/password-hash-pool", {}),
+        ("matrix", "GET", "/matrix", {"params": {"project_id": ids["project"]}}),
+        ("matrix search", "POST", "/matrix/search", {"json": search}),
+        ("org subtree", "GET", f"/org/{ids['manager']}/subtree", {}),
+        ("org team", "GET", f"/org/{ids['root']}/team", {}),
+        ("org skills", "GET", f"/org/{ids['manager']}/skills", {}),
+        ("metrics", "GET", "/metrics", {}),
+    ]
+    return cases
+
+
+async def drive(client, method, path, kwargs, total, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = 0
+
+    async def one():
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.request(method, path, **kwargs)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    elapsed = time.perf_counter() - start
+    p50, p95, p99 = report.percentiles(latencies)
+    return {"requests": total, "errors": errors, "rps": total / elapsed,
+            "p50_ms": p50 * 1000, "p95_ms": p95 * 1000, "p99_ms": p99 * 1000}
+
+
+async def run(args, ids):
+    headers = {"authorization": "Bearer " + generate_jwt_token({"email": ids["email"]})}
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, headers=headers, timeout=60)
+    else:
+        from main import app
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app),
+                                   base_url="http://bench", headers=headers, timeout=60)
+    results = {}
+    async with client:
+        for name, method, path, kwargs in endpoints(ids):
+            if args.filter not in name:
+                continue
+            # One warm-up request fills the caches and the connection pool.
+            await client.request(method, path, **kwargs)
+            results[name] = await drive(client, method, path, kwargs, args.requests, args.concurrency)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--skills", type=int, default=200)
+    parser.add_argument("--skills-per-user", type=int, default=5)
+    parser.add_argument("--fanout", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--filter", default="", help="only load endpoints whose name contains this text")
+    parser.add_argument("--url", help="base url of a running server instead of the in-process app")
+    parser.add_argument("--truncate", action="store_true",
+                        help="empty the organisation tables before seeding a non-SQLite database")
+    report.add_arguments(parser)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    ids = seed(args)
+    print(f"seeded {args.users} users in {time.perf_counter() - start:.1f}s")
+    results = asyncio.run(run(args, ids))
+
+    report.print_table(
+        ["endpoint", "requests", "errors", "req/s", "p50 ms", "p95 ms", "p99 ms"],
+        [(name, r["requests"], r["errors"], f"{r['rps']:.0f}", f"{r['p50_ms']:.1f}",
+          f"{r['p95_ms']:.1f}", f"{r['p99_ms']:.1f}") for name, r in results.items()],
+    )
+    if args.save:
+        report.save(args.save, results)
+    if args.baseline and report.compare(results, args.baseline, args.tolerance,
+                                        ["p50_ms", "p95_ms", "p99_ms"], ["rps"]):
+        sys.exit(1)
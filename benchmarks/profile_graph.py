@@ -0,0 +1,90 @@
+'''
+Queries and time to load full profiles, lazily and with the org.profile_graph_query plan.
+
+Seeds --users profiles in a SQLite file (or the database in
+SQLALCHEMY_DATABASE_URL), then loads and serializes (org_view.profile_data)
+batches of each --sizes, once touching every relationship lazily and once
+with the eager loading plan. The eager plan must issue the same number of
+queries for every batch size; the run exits with status 1 otherwise.
+
+    python -m benchmarks.profile_graph --users 2000 --sizes 1,10,100,1000 --save profiles.json
+'''
+import os
+import sys
+import argparse
+import tempfile
+import time
+
+DB_PATH = os.path.join(tempfile.gettempdir(), "skill_matrix_profile_bench.db")
+os.environ.setdefault("SQLALCHEMY_DATABASE_URL", f"sqlite:///{DB_PATH}")
+
+from sqlalchemy import select
+
+from src.Api.database import engine, Base, SessionLocal
+from src.Api.datagen import Distribution, generate
+from src.Api.instrumentation import QueryStats, query_stats
+from src.Api.models import UserProfile
+from src.Api.org import profile_graph_query
+from src.Api.views.org_view import profile_data
+
+from . import report
+
+
+def seed(args):
+    if engine.url.get_backend_name() == "sqlite" and os.path.exists(DB_PATH):
+        os.remove(DB_PATH)
+    Base.metadata.create_all(engine)
+    distribution = Distribution(users=args.users, skills=max(args.users // 10, 10), projects=20,
+                                designations=10, competencies=10)
+    with engine.begin() as connection:
+        generator = generate(connection, distribution, clear=args.truncate, progress=lambda _: None)
+    return [str(profile_id) for profile_id in generator.profile_ids]
+
+
+def load(profile_ids, eager):
+    query = profile_graph_query(profile_ids) if eager else (
+        select(UserProfile).where(UserProfile.id.in_(profile_ids))
+    )
+    stats = QueryStats()
+    token = query_stats.set(stats)
+    start = time.perf_counter()
+    try:
+        with SessionLocal() as db:
+            data = [profile_data(profile) for profile in db.execute(query).scalars()]
+    finally:
+        query_stats.reset(token)
+    return {"profiles": len(data), "queries": stats.count,
+            "ms": (time.perf_counter() - start) * 1000}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--sizes", default="1,10,100,1000",
+                        help="comma separated batch sizes")
+    parser.add_argument("--truncate", action="store_true",
+                        help="empty the organisation tables before seeding a non-SQLite database")
+    report.add_arguments(parser)
+    args = parser.parse_args()
+
+    profile_ids = seed(args)
+    results = {}
+    for size in (int(size) for size in args.sizes.split(",")):
+        batch = profile_ids[:size]
+        for plan, eager in (("lazy", False), ("eager", True)):
+            results[f"{plan}_{size}"] = load(batch, eager)
+
+    report.print_table(
+        ["plan", "profiles", "queries", "ms"],
+        [(name, r["profiles"], r["queries"], f"{r['ms']:.1f}") for name, r in results.items()],
+    )
+    if args.save:
+        report.save(args.save, results)
+    eager_counts = {r["queries"] for name, r in results.items() if name.startswith("eager")}
+    failed = len(eager_counts) > 1
+    if failed:
+        print(f"eager plan query count varies with the batch size: {sorted(eager_counts)}")
+    if args.baseline and report.compare(results, args.baseline, args.tolerance, ["queries", "ms"]):
+        failed = True
+    if failed:
+        sys.exit(1)
@@ -0,0 +1,63 @@
+'''
+Result tables and baseline comparison shared by the benchmark scripts.
+
+Results are a dict of benchmark name -> metrics. Saving them with --save
+and passing the file back with --baseline on a later run flags every
+metric that got worse by more than --tolerance.
+'''
+import json
+import statistics
+
+
+def percentiles(samples):
+    '''
+    p50/p95/p99 of a list of durations.
+    '''
+    if len(samples) < 2:
+        value = samples[0] if samples else 0.0
+        return value, value, value
+    cuts = statistics.quantiles(samples, n=100, method="inclusive")
+    return cuts[49], cuts[94], cuts[98]
+
+
+def print_table(columns, rows):
+    widths = [max(len(str(column)), *(len(str(row[i])) for row in rows)) for i, column in enumerate(columns)]
+    print("  ".join(str(column).ljust(width) for column, width in zip(columns, widths)))
+    for row in rows:
+        print("  ".join(str(value).ljust(width) for value, width in zip(row, widths)))
+
+
+def save(path, results):
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+
+
+def compare(results, baseline_path, tolerance, lower_is_better, higher_is_better=()):
+    '''
+    Print and return the metrics that regressed against a saved baseline.
+    '''
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    regressions = []
+    for name, metrics in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        for metric in lower_is_better:
+            if previous.get(metric) and metrics[metric] > previous[metric] * (1 + tolerance):
+                regressions.append((name, metric, previous[metric], metrics[metric]))
+        for metric in higher_is_better:
+            if previous.get(metric) and metrics[metric] < previous[metric] * (1 - tolerance):
+                regressions.append((name, metric, previous[metric], metrics[metric]))
+    for name, metric, before, after in regressions:
+        print(f"REGRESSION {name} {metric}: {before:.4g} -> {after:.4g}")
+    if not regressions:
+        print(f"No regressions beyond {tolerance:.0%} against {baseline_path}.")
+    return regressions
+
+
+def add_arguments(parser):
+    parser.add_argument("--save", help="write results as JSON to this file")
+    parser.add_argument("--baseline", help="compare against results saved with --save")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="allowed relative slowdown before a regression is reported")
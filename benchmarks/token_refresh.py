@@ -0,0 +1,117 @@
+'''
+Cost of renewing an access token: POST /auth/login against POST /auth/refresh.
+
+Seeds --clients users in a SQLite file (or the database in
+SQLALCHEMY_DATABASE_URL) and logs each in once. Each client then renews
+its access token --rounds times, once by logging in again and once by
+rotating its refresh token, with all clients running concurrently.
+Requests go through httpx's ASGI transport.
+
+CPU per request is the API process time plus, for login, one bcrypt
+verify measured up front: verifies run in the hashing process pool, whose
+CPU time this process can't see.
+
+    python -m benchmarks.token_refresh --clients 8 --rounds 5 --save refresh.json
+'''
+import os
+import sys
+import argparse
+import asyncio
+import tempfile
+import time
+import timeit
+
+DB_PATH = os.path.join(tempfile.gettempdir(), "skill_matrix_refresh_bench.db")
+os.environ.setdefault("SQLALCHEMY_DATABASE_URL", f"sqlite:///{DB_PATH}")
+
+import httpx
+
+from src.Api.config import pwd_context
+from src.Api.database import engine, Base
+from src.Api.datagen import Distribution, generate
+
+from . import report
+
+
+PASSWORD = "bench-password"
+
+
+def seed(args):
+    if engine.url.get_backend_name() == "sqlite" and os.path.exists(DB_PATH):
+        os.remove(DB_PATH)
+    Base.metadata.create_all(engine)
+    distribution = Distribution(users=args.clients, skills=1, skills_per_user=(0, 0), projects=1,
+                                designations=1, competencies=1, password=PASSWORD)
+    with engine.begin() as connection:
+        generator = generate(connection, distribution, clear=args.truncate, progress=lambda _: None)
+    return [generator.email(i) for i in range(args.clients)]
+
+
+async def login(client, email, state):
+    response = await client.post("/auth/login", json={"email": email, "password": PASSWORD})
+    response.raise_for_status()
+    state[email] = response.json()["data"]["refresh_token"]
+
+
+async def refresh(client, email, state):
+    response = await client.post("/auth/refresh", json={"refresh_token": state[email]})
+    response.raise_for_status()
+    state[email] = response.json()["data"]["refresh_token"]
+
+
+async def drive(client, renew, emails, rounds, state):
+    latencies = []
+
+    async def one(email):
+        for _ in range(rounds):
+            start = time.perf_counter()
+            await renew(client, email, state)
+            latencies.append(time.perf_counter() - start)
+
+    cpu, start = time.process_time(), time.perf_counter()
+    await asyncio.gather(*(one(email) for email in emails))
+    elapsed, cpu = time.perf_counter() - start, time.process_time() - cpu
+    p50, p95, _ = report.percentiles(latencies)
+    return {"requests": len(latencies), "rps": len(latencies) / elapsed,
+            "p50_ms": p50 * 1000, "p95_ms": p95 * 1000, "cpu_ms": cpu * 1000 / len(latencies)}
+
+
+async def run(args, emails):
+    from main import app
+    state = {}
+    results = {}
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app),
+                                 base_url="http://bench", timeout=60) as client:
+        await asyncio.gather(*(login(client, email, state) for email in emails))
+        results["login"] = await drive(client, login, emails, args.rounds, state)
+        results["refresh"] = await drive(client, refresh, emails, args.rounds, state)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--truncate", action="store_true",
+                        help="empty the organisation tables before seeding a non-SQLite database")
+    report.add_arguments(parser)
+    args = parser.parse_args()
+
+    emails = seed(args)
+    password_hash = pwd_context.hash(PASSWORD)
+    verify_ms = min(timeit.repeat(lambda: pwd_context.verify(PASSWORD, password_hash),
+                                  number=1, repeat=5)) * 1000
+    results = asyncio.run(run(args, emails))
+    results["login"]["cpu_ms"] += verify_ms
+
+    report.print_table(
+        ["renewal", "requests", "req/s", "p50 ms", "p95 ms", "cpu ms/req"],
+        [(name, r["requests"], f"{r['rps']:.0f}", f"{r['p50_ms']:.1f}", f"{r['p95_ms']:.1f}",
+          f"{r['cpu_ms']:.2f}") for name, r in results.items()],
+    )
+    print(f"refresh uses {results['login']['cpu_ms'] / results['refresh']['cpu_ms']:.0f}x less CPU than login")
+    if args.save:
+        report.save(args.save, results)
+    if args.baseline and report.compare(results, args.baseline, args.tolerance,
+                                        ["p50_ms", "p95_ms", "cpu_ms"], ["rps"]):
+        sys.exit(1)
@@ -1,14 +1,73 @@
 # from src.Api.views.view import app
 # from src.urls import urls_dict
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from sqlalchemy.exc import StatementError
 
-from src.Api.views import view, admin_view
+from src.Api.views import view, admin_view, matrix_view, org_view, metrics_view
+from src.Api.hashing import password_hash_pool
+from src.Api.outbox import email_outbox
+from src.Api.replicas import replica_router
+from src.Api.instrumentation import QueryInstrumentationMiddleware
+from src.Api.metrics import MetricsMiddleware
+from src.Api.models import InvalidIdentifier
 
 app = FastAPI()
+app.add_middleware(QueryInstrumentationMiddleware)
+app.add_middleware(MetricsMiddleware)
 
 app.include_router(view.router)
 app.include_router(admin_view.router)
+app.include_router(matrix_view.router)
+app.include_router(org_view.router)
+app.include_router(metrics_view.router)
+
+
+@app.exception_handler(InvalidIdentifier)
+async def invalid_identifier_handler(request: Request, exc: InvalidIdentifier):
+    '''
+    A malformed id in a path, query or body is a bad request, not a server error.
+    '''
+    return JSONResponse(
+        status_code=400,
+        content={
+            "message": str(exc),
+            "data": {}
+        }
+    )
+
+
+@app.exception_handler(StatementError)
+async def invalid_bound_identifier_handler(request: Request, exc: StatementError):
+    '''
+    Same for ids only checked when bound to a GUID column.
+    '''
+    if isinstance(exc.orig, InvalidIdentifier):
+        return await invalid_identifier_handler(request, exc.orig)
+    raise exc
+
+
+@app.on_event("startup")
+async def start_email_outbox():
+    email_outbox.start()
+
+
+@app.on_event("startup")
+async def start_password_hash_pool():
+    password_hash_pool.start()
+
+
+@app.on_event("startup")
+async def start_replica_health_checks():
+    replica_router.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_background_workers():
+    await email_outbox.stop()
+    await replica_router.stop()
+    password_hash_pool.shutdown()
 
 
 # class Setup:
@@ -0,0 +1,104 @@
+import time
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+
+class CacheBackend(ABC):
+    """
+    Interface of the cache used by GenericCrudView.
+
+    Each view gets its own backend instance, so `clear` only has to drop the
+    entries of that view. A shared backend (e.g. Redis) should implement this
+    interface and keep its keys under a per-instance namespace.
+    """
+    @abstractmethod
+    def get(self, key):
+        '''
+        Return the cached value, or None on a miss.
+        '''
+
+    @abstractmethod
+    def set(self, key, value, ttl=None):
+        '''
+        Cache a value, `ttl` overrides the default expiry in seconds.
+        '''
+
+    @abstractmethod
+    def delete(self, key):
+        '''
+        Drop one entry, if cached.
+        '''
+
+    @abstractmethod
+    def clear(self):
+        '''
+        Drop every entry of this backend.
+        '''
+
+    @abstractmethod
+    def stats(self):
+        '''
+        Counters (hits, misses, size...) for the stats routes.
+        '''
+
+
+class LRUCache(CacheBackend):
+    """
+    Thread safe in-process LRU cache with a size bound and per entry TTL.
+    """
+    def __init__(self, max_size, ttl) -> None:
+        '''
+        Init method.
+        '''
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "max_size": self.max_size,
+            "ttl_in_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
@@ -1,3 +1,5 @@
+import os
+
 from passlib.context import CryptContext
 
 from fastapi_mail import ConnectionConfig
@@ -6,6 +8,7 @@ SECRET_KEY = "5a7a16201e690fbac4d0bf75be666da34c0848a9181bc3b632448634aadc4111"
 ENTRYPTION_KEY = b'TY1Smx4WBQvwI0ceeBtaYNI-VHdBm_41wygDHBNmME0='
 
 JWT_TOKEN_EXPIRY_IN_MINUTES = 5
+REFRESH_TOKEN_EXPIRY_IN_DAYS = 14
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
@@ -20,4 +23,81 @@ conf = ConnectionConfig(
    MAIL_SSL_TLS = False,
 )
 
-DEFAULT_ADMIN_ROUTE = "/admin"
\ No newline at end of file
+DEFAULT_ADMIN_ROUTE = "/admin"
+
+# Password hashing process pool
+PASSWORD_HASH_POOL_SIZE = os.cpu_count() or 2
+PASSWORD_HASH_QUEUE_LIMIT = 64
+PASSWORD_HASH_TIMEOUT_IN_SECONDS = 5
+
+
+# Email outbox
+EMAIL_OUTBOX_MAX_SIZE = 10000
+EMAIL_OUTBOX_CONNECTIONS = 2
+EMAIL_OUTBOX_BATCH_SIZE = 20
+EMAIL_OUTBOX_MAX_RETRIES = 5
+EMAIL_OUTBOX_RETRY_BACKOFF_IN_SECONDS = 2
+EMAIL_OUTBOX_IDLE_TIMEOUT_IN_SECONDS = 60
+EMAIL_OUTBOX_POLL_INTERVAL_IN_SECONDS = 5
+EMAIL_OUTBOX_LEASE_IN_SECONDS = 300
+
+
+# Reference table cache
+CACHE_MAX_SIZE = 1024
+CACHE_TTL_IN_SECONDS = 300
+
+
+# Authenticated token cache
+AUTH_CACHE_MAX_SIZE = 10000
+AUTH_CACHE_TTL_IN_SECONDS = 60
+
+
+# Role based access control
+RBAC_SUPERUSER_ROLE = "admin"
+RBAC_CACHE_MAX_SIZE = 10000
+RBAC_CACHE_TTL_IN_SECONDS = 300
+
+
+# Employee skill CSV import
+IMPORT_SPOOL_MAX_SIZE = 16 * 1024 * 1024
+IMPORT_BATCH_SIZE = 5000
+IMPORT_MAX_REPORTED_ERRORS = 1000
+
+
+# SQL instrumentation
+DEBUG = os.environ.get("DEBUG", "").lower() in ("1", "true", "yes")
+SQL_QUERY_BUDGET = 20
+SQL_REPEATED_STATEMENT_THRESHOLD = 5
+
+
+# Metrics
+METRICS_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+METRICS_HASH_BUCKETS = (0.05, 0.1, 0.2, 0.3, 0.5, 1, 2, 5)
+
+
+# Read replicas
+READ_REPLICA_URLS = [url for url in os.environ.get("READ_REPLICA_URLS", "").split(",") if url]
+REPLICA_HEALTH_CHECK_INTERVAL_IN_SECONDS = 5
+REPLICA_CONNECT_TIMEOUT_IN_SECONDS = 2
+REPLICA_MAX_LAG_IN_SECONDS = 5
+# No shorter than REPLICA_MAX_LAG_IN_SECONDS, or a writer can miss its write.
+READ_YOUR_WRITES_WINDOW_IN_SECONDS = 5
+READ_YOUR_WRITES_MAX_SIZE = 10000
+
+
+# Email verification and password reset links
+EMAIL_TOKEN_EXPIRY_IN_MINUTES = {"verify_email": 24 * 60, "reset_password": 30}
+
+
+# Skill search
+SKILL_SEARCH_MAX_LIMIT = 1000
+
+
+# Batch evaluations
+EVALUATION_BATCH_MAX_SIZE = 1000
+EVALUATION_RATING_MIN = 1
+EVALUATION_RATING_MAX = 5
+
+
+# Profile graph
+PROFILE_BATCH_MAX_SIZE = 1000
@@ -0,0 +1,278 @@
+'''
+Deterministic synthetic organisation for scale testing.
+
+Generates designations, competencies, roles with permissions, projects,
+skills, a manager tree of users and profiles, their employee skills and
+manager evaluations from one random seed, and loads them table by table
+with PostgreSQL COPY (batched inserts on other databases). The closure
+table is rebuilt at the end. Every user gets the same password hash, the
+first user is the root of the tree and holds the admin role.
+
+    python -m src.Api.datagen --users 100000 --skills 3000 --skills-per-user 5:15
+'''
+import io
+import csv
+import time
+import random
+import itertools
+from dataclasses import dataclass
+
+from sqlalchemy import insert, delete
+
+from .config import pwd_context, RBAC_SUPERUSER_ROLE
+from .org import rebuild_closure
+from .models import (User, UserProfile, UserProfileClosure, Role, Permission, RolePermission,
+                     UserRole, Project, UserProject, Skill, EmpSkill, SkillEvaluator,
+                     Designation, Competency, RefreshToken, uuid7)
+
+
+COPY_CHUNK_ROWS = 100000
+INSERT_BATCH_ROWS = 10000
+EPOCH_MS = 1704067200000  # 2024-01-01T00:00:00Z
+OPERATIONS = ("create", "read", "update", "delete")
+PERMISSION_ENTITIES = ("project", "skill", "designation", "competency", "permission", "role",
+                       "matrix", "export", "import", "org", "admin")
+
+
+@dataclass
+class Distribution:
+    '''
+    Sizes and shape of the generated organisation.
+    '''
+    users: int = 100000
+    skills: int = 3000
+    skills_per_user: tuple = (5, 15)
+    skill_skew: float = 1.0
+    evaluated: float = 0.6
+    fanout: int = 8
+    projects: int = 500
+    projects_per_user: tuple = (1, 3)
+    roles: int = 20
+    roles_per_user: tuple = (0, 2)
+    designations: int = 50
+    competencies: int = 30
+    occupied: float = 0.7
+    email_domain: str = "example.com"
+    password: str = "password"
+    seed: int = 42
+
+
+class OrgGenerator:
+    """
+    Yields the rows of every table, in foreign key order, as tuples of column values.
+
+    Ids come from the seeded generator too, so the same Distribution always
+    produces the same dataset.
+    """
+    def __init__(self, distribution: Distribution) -> None:
+        '''
+        Init method.
+        '''
+        self.d = distribution
+        self.rng = random.Random(distribution.seed)
+        self.clock_ms = EPOCH_MS
+
+    def new_id(self):
+        # UUIDv7 like the application's keys, on a synthetic clock ticking one ms per id.
+        self.clock_ms += 1
+        return uuid7(self.clock_ms, self.rng.getrandbits(74))
+
+    def email(self, index):
+        return f"user{index}@{self.d.email_domain}"
+
+    def rating(self):
+        return 1 + int(self.rng.random() * 5)
+
+    def ids(self, count):
+        return [self.new_id() for _ in range(count)]
+
+    def between(self, bounds):
+        return self.rng.randint(*bounds)
+
+    def tables(self):
+        '''
+        (table, columns, rows) for each table; rows are generated lazily.
+        '''
+        d, rng = self.d, self.rng
+        # Kept on the generator so callers can find generated rows afterwards.
+        self.designation_ids = designation_ids = self.ids(d.designations)
+        self.competency_ids = competency_ids = self.ids(d.competencies)
+        self.project_ids = project_ids = self.ids(d.projects)
+        self.skill_ids = skill_ids = self.ids(d.skills)
+        self.role_ids = role_ids = self.ids(d.roles + 1)
+        self.permission_ids = permission_ids = self.ids(len(PERMISSION_ENTITIES) * len(OPERATIONS))
+        self.profile_ids = profile_ids = self.ids(d.users)
+        self.root_id = profile_ids[0]
+        self.admin_role_id = role_ids[0]
+
+        yield Designation, ("id", "desg_name"), (
+            (id, f"Designation {i}") for i, id in enumerate(designation_ids))
+        yield Competency, ("id", "comp_name"), (
+            (id, f"Competency {i}") for i, id in enumerate(competency_ids))
+        yield Role, ("id", "role_name"), (
+            (id, RBAC_SUPERUSER_ROLE if i == 0 else f"role-{i}") for i, id in enumerate(role_ids))
+        permissions = list(itertools.product(PERMISSION_ENTITIES, OPERATIONS))
+        yield Permission, ("id", "name", "operation"), (
+            (id, name, operation) for id, (name, operation) in zip(permission_ids, permissions))
+        yield RolePermission, ("role_id", "permission_id"), (
+            (role_id, permission_id)
+            for role_id in role_ids[1:]
+            for permission_id in rng.sample(permission_ids, rng.randint(1, len(permission_ids) // 4))
+        )
+        yield Project, ("id", "project_name"), (
+            (id, f"Project {i}") for i, id in enumerate(project_ids))
+        yield Skill, ("id", "skill_name"), (
+            (id, f"Skill {i}") for i, id in enumerate(skill_ids))
+
+        # Profile i reports to profile (i - 1) // fanout: a balanced tree rooted at profile 0.
+        managers = [None] + [profile_ids[(i - 1) // d.fanout] for i in range(1, d.users)]
+        yield UserProfile, ("id", "manager_id", "designation_id", "competency_id", "occupied"), (
+            (id, manager_id, rng.choice(designation_ids), rng.choice(competency_ids),
+             rng.random() < d.occupied)
+            for id, manager_id in zip(profile_ids, managers)
+        )
+        password = pwd_context.hash(d.password)
+        yield User, ("id", "full_name", "email_address", "password", "is_active", "user_profile_id"), (
+            (self.new_id(), f"Employee {i}", self.email(i), password, True, id)
+            for i, id in enumerate(profile_ids)
+        )
+        yield UserRole, ("role_id", "user_profile_id"), itertools.chain(
+            [(self.admin_role_id, self.root_id)],
+            ((role_id, id) for id in profile_ids[1:]
+             for role_id in rng.sample(role_ids[1:], min(self.between(d.roles_per_user), d.roles))),
+        )
+        yield UserProject, ("project_id", "user_profile_id"), (
+            (project_id, id) for id in profile_ids
+            for project_id in rng.sample(project_ids, min(self.between(d.projects_per_user), d.projects))
+        )
+
+        # Zipf-like skill popularity: a few skills are held by most people.
+        cum_weights = list(itertools.accumulate(1 / (rank + 1) ** d.skill_skew for rank in range(d.skills)))
+        evaluations = []
+
+        def emp_skills():
+            for id, manager_id in zip(profile_ids, managers):
+                wanted = min(self.between(d.skills_per_user), d.skills)
+                # Oversample, then keep the first `wanted` distinct skills in draw order.
+                drawn = rng.choices(skill_ids, cum_weights=cum_weights, k=wanted * 2)
+                for skill_id in list(dict.fromkeys(drawn))[:wanted]:
+                    emp_skill_id = self.new_id()
+                    evaluated = manager_id is not None and rng.random() < d.evaluated
+                    if evaluated:
+                        evaluations.append((emp_skill_id, manager_id))
+                    yield (emp_skill_id, id, skill_id,
+                           "primary" if rng.random() < 0.5 else "secondary",
+                           self.rating(), manager_id, evaluated)
+
+        yield EmpSkill, ("id", "user_profile_id", "skill_id", "skill_type", "rate_by_self",
+                         "emp_manager_id", "is_evaluated"), emp_skills()
+        yield SkillEvaluator, ("id", "employee_id", "evaluator_id", "evaluator_rating"), (
+            (self.new_id(), employee_id, evaluator_id, self.rating())
+            for employee_id, evaluator_id in evaluations
+        )
+
+
+def copy_rows(connection, table, columns, rows):
+    '''
+    Load rows with COPY in chunks of COPY_CHUNK_ROWS, returns the row count.
+    '''
+    cursor = connection.connection.cursor()
+    sql = 'COPY "{}" ({}) FROM STDIN WITH (FORMAT csv)'.format(table.name, ", ".join(columns))
+    count = 0
+    try:
+        while True:
+            chunk = list(itertools.islice(rows, COPY_CHUNK_ROWS))
+            if not chunk:
+                return count
+            buffer = io.StringIO()
+            csv.writer(buffer).writerows(chunk)
+            buffer.seek(0)
+            cursor.copy_expert(sql, buffer)
+            count += len(chunk)
+    finally:
+        cursor.close()
+
+
+def insert_rows(connection, table, columns, rows):
+    '''
+    Load rows with batched executemany inserts, returns the row count.
+    '''
+    count = 0
+    while True:
+        batch = [dict(zip(columns, row)) for row in itertools.islice(rows, INSERT_BATCH_ROWS)]
+        if not batch:
+            return count
+        connection.execute(insert(table), batch)
+        count += len(batch)
+
+
+def truncate(connection, models):
+    if connection.dialect.name == "postgresql":
+        names = ", ".join(f'"{model.__table__.name}"' for model in models)
+        connection.exec_driver_sql(f"TRUNCATE {names} CASCADE")
+        return
+    for model in reversed(models):
+        connection.execute(delete(model.__table__))
+
+
+def generate(connection, distribution: Distribution, clear=False, progress=print):
+    '''
+    Generate and load the whole dataset in the caller's transaction, returns the generator.
+    '''
+    generator = OrgGenerator(distribution)
+    load = copy_rows if connection.dialect.name == "postgresql" else insert_rows
+    tables = generator.tables()
+    if clear:
+        truncate(connection, [Designation, Competency, Role, Permission, RolePermission, Project,
+                              Skill, UserProfile, UserProfileClosure, User, RefreshToken, UserRole,
+                              UserProject, EmpSkill, SkillEvaluator])
+    for model, columns, rows in tables:
+        start = time.perf_counter()
+        count = load(connection, model.__table__, columns, iter(rows))
+        progress(f"{model.__tablename__:<22} {count:>10} rows  {time.perf_counter() - start:6.1f}s")
+    start = time.perf_counter()
+    rebuild_closure(connection)
+    progress(f"{'user_profile_closure':<22} {'rebuilt':>10}       {time.perf_counter() - start:6.1f}s")
+    return generator
+
+
+def bounds(value):
+    low, _, high = value.partition(":")
+    return int(low), int(high or low)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from .database import engine, Base
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    defaults = Distribution()
+    parser.add_argument("--users", type=int, default=defaults.users)
+    parser.add_argument("--skills", type=int, default=defaults.skills)
+    parser.add_argument("--skills-per-user", type=bounds, default=defaults.skills_per_user,
+                        help="min:max skills per employee")
+    parser.add_argument("--skill-skew", type=float, default=defaults.skill_skew,
+                        help="Zipf exponent of skill popularity, 0 for uniform")
+    parser.add_argument("--evaluated", type=float, default=defaults.evaluated,
+                        help="share of employee skills with a manager evaluation")
+    parser.add_argument("--fanout", type=int, default=defaults.fanout, help="direct reports per manager")
+    parser.add_argument("--projects", type=int, default=defaults.projects)
+    parser.add_argument("--projects-per-user", type=bounds, default=defaults.projects_per_user)
+    parser.add_argument("--roles", type=int, default=defaults.roles)
+    parser.add_argument("--roles-per-user", type=bounds, default=defaults.roles_per_user)
+    parser.add_argument("--designations", type=int, default=defaults.designations)
+    parser.add_argument("--competencies", type=int, default=defaults.competencies)
+    parser.add_argument("--email-domain", default=defaults.email_domain)
+    parser.add_argument("--password", default=defaults.password, help="password of every generated user")
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--truncate", action="store_true",
+                        help="empty the organisation tables first (destroys existing data)")
+    args = vars(parser.parse_args())
+    clear = args.pop("truncate")
+
+    Base.metadata.create_all(engine)
+    start = time.perf_counter()
+    with engine.begin() as connection:
+        generate(connection, Distribution(**args), clear)
+    print(f"loaded in {time.perf_counter() - start:.1f}s")
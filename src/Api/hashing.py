@@ -0,0 +1,144 @@
+import asyncio
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from fastapi import HTTPException
+
+from .config import (pwd_context, PASSWORD_HASH_POOL_SIZE, PASSWORD_HASH_QUEUE_LIMIT,
+                     PASSWORD_HASH_TIMEOUT_IN_SECONDS, METRICS_HASH_BUCKETS)
+from .metrics import Histogram
+
+
+password_hash_duration_seconds = Histogram(
+    "password_hash_duration_seconds", "bcrypt hash/verify time in the process pool, queueing included.",
+    ("operation",), buckets=METRICS_HASH_BUCKETS,
+)
+
+
+def _hash(password):
+    return pwd_context.hash(password)
+
+
+def _verify(input_password, password_hash):
+    return pwd_context.verify(input_password, password_hash)
+
+
+class PasswordHashPool:
+    """
+    Bounded process pool that runs bcrypt off the event loop.
+
+    At most `size` jobs run at once and `queue_limit` more may wait for a
+    worker; anything beyond that is rejected with a 503 instead of piling up.
+    Counters are only touched from the event loop thread, so no locking is
+    needed.
+
+    Workers are spawned rather than forked: forking a process that already
+    runs threads (the event loop's executor, database pools) can leave a
+    lock held in the child, which then deadlocks.
+    """
+    def __init__(self, size, queue_limit, timeout, start_method="spawn") -> None:
+        '''
+        Init method.
+        '''
+        self.size = size
+        self.queue_limit = queue_limit
+        self.timeout = timeout
+        self.mp_context = multiprocessing.get_context(start_method)
+        self._executor = None
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.submitted = 0
+        self.completed = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.failed = 0
+        self.total_seconds = 0.0
+
+    def _get_executor(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.size, mp_context=self.mp_context)
+        return self._executor
+
+    def start(self):
+        """
+        Create the executor up front (at app startup) instead of on the first login.
+        """
+        self._get_executor()
+
+    def _release(self, operation, started):
+        elapsed = time.perf_counter() - started
+        self.in_flight -= 1
+        self.completed += 1
+        self.total_seconds += elapsed
+        password_hash_duration_seconds.observe(elapsed, operation)
+
+    async def run(self, fn, *args):
+        """
+        Run `fn(*args)` in a worker process and await the result.
+        """
+        if self.in_flight >= self.size + self.queue_limit:
+            self.rejected += 1
+            raise HTTPException(status_code=503, detail="Server busy, please retry.")
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except BrokenProcessPool:
+            self._executor = None
+            future = self._get_executor().submit(fn, *args)
+        self.submitted += 1
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        # The slot is only freed once the worker is really done, even if the
+        # caller stopped waiting because of the timeout.
+        future.add_done_callback(
+            lambda _: loop.call_soon_threadsafe(self._release, fn.__name__.lstrip("_"), started)
+        )
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+        except asyncio.TimeoutError:
+            self.timed_out += 1
+            raise HTTPException(status_code=503, detail="Server busy, please retry.")
+        except BrokenProcessPool:
+            self.failed += 1
+            self._executor = None
+            raise HTTPException(status_code=503, detail="Server busy, please retry.")
+
+    def stats(self):
+        """
+        Saturation metrics used to size the pool.
+        """
+        return {
+            "size": self.size,
+            "queue_limit": self.queue_limit,
+            "timeout_in_seconds": self.timeout,
+            "in_flight": self.in_flight,
+            "queued": max(self.in_flight - self.size, 0),
+            "peak_in_flight": self.peak_in_flight,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "failed": self.failed,
+            "total_seconds": round(self.total_seconds, 3),
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hash_pool = PasswordHashPool(
+    PASSWORD_HASH_POOL_SIZE, PASSWORD_HASH_QUEUE_LIMIT, PASSWORD_HASH_TIMEOUT_IN_SECONDS
+)
+
+
+async def hash_in_pool(password):
+    return await password_hash_pool.run(_hash, password)
+
+
+async def verify_in_pool(input_password, password_hash):
+    return await password_hash_pool.run(_verify, input_password, password_hash)
@@ -1,27 +1,72 @@
 
 import jwt
+import hmac
+import time
+import json
+import base64
+import struct
+import hashlib
+import secrets
 import datetime
-from fastapi import HTTPException, Header
-from fastapi_mail import FastMail, MessageSchema
+from typing import Optional, NamedTuple
+from fastapi import HTTPException, Header, Depends
 import uuid
-from cryptography.fernet import Fernet
 import tracemalloc
+from sqlalchemy import delete
+from sqlalchemy.exc import IntegrityError
 
-from .config import SECRET_KEY, pwd_context, ENTRYPTION_KEY, conf, JWT_TOKEN_EXPIRY_IN_MINUTES
-from .database import SessionLocal
+from .config import (SECRET_KEY, JWT_TOKEN_EXPIRY_IN_MINUTES, REFRESH_TOKEN_EXPIRY_IN_DAYS,
+                     EMAIL_TOKEN_EXPIRY_IN_MINUTES, AUTH_CACHE_MAX_SIZE, AUTH_CACHE_TTL_IN_SECONDS)
+from .database import SessionLocal, AsyncSessionLocal
+from .replicas import read_session
+from .models import User, RefreshToken, UsedTokenNonce, uuid7
+from .cache import LRUCache
+from .hashing import hash_in_pool, verify_in_pool
+from .outbox import email_outbox, VERIFICATION_TEMPLATE
 
 
-FERNET = Fernet(ENTRYPTION_KEY)
+VERIFY_EMAIL = "verify_email"
+RESET_PASSWORD = "reset_password"
+EMAIL_TOKEN_PURPOSES = {VERIFY_EMAIL: 1, RESET_PASSWORD: 2}
+# purpose, expiry in unix seconds, nonce; the email and the signature follow.
+EMAIL_TOKEN_HEADER = struct.Struct(">BI16s")
+EMAIL_TOKEN_SIGNATURE_SIZE = 16
+EMAIL_TOKEN_KEY = hmac.new(SECRET_KEY.encode(), b"email-token", hashlib.sha256).digest()
 
+# Authenticated user per access token, so repeated requests with the same
+# token skip the HS256 decode and the user lookup.
+auth_cache = LRUCache(AUTH_CACHE_MAX_SIZE, AUTH_CACHE_TTL_IN_SECONDS)
 
-def get_db():
+
+def get_db(authorization: Optional[str] = Header(None)):
     db = SessionLocal()
+    # A commit pins this client to the primary for its next reads.
+    db.info["writer"] = authorization
     try:
         yield db
     finally:
         db.close()
 
 
+async def get_async_db(authorization: Optional[str] = Header(None)):
+    '''
+    Yield a per-request AsyncSession so database I/O doesn't block the event loop.
+    '''
+    async with AsyncSessionLocal() as db:
+        db.info["writer"] = authorization
+        yield db
+
+
+def get_read_db(authorization: Optional[str] = Header(None)):
+    '''
+    Session on a read replica for read-only routes, see replicas.py.
+    '''
+    db = read_session(authorization)
+    try:
+        yield db
+    finally:
+        db.close()
+
 
 def generate_jwt_token(data:dict):
     '''
@@ -44,75 +89,210 @@ def decode_jwt_token(token:dict):
         raise HTTPException(status_code=401, detail="Token has expired")
     except jwt.InvalidTokenError:
         raise HTTPException(status_code=401, detail="Invalid token")
+
+
+def hash_refresh_token(token):
+    '''
+    Digest a refresh token is stored and looked up by.
+
+    Refresh tokens are 256 random bits, so unlike passwords they need no
+    salt or slow hash: a single SHA-256 keeps them useless if the table leaks.
+    '''
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def add_refresh_token(db, user_id, family_id=None):
+    '''
+    Add a new refresh token of `user_id` to the session and return it.
+
+    Without `family_id` the token starts a new family (a login).
+    '''
+    token = secrets.token_urlsafe(32)
+    db.add(RefreshToken(
+        user_id=user_id,
+        family_id=family_id or uuid7(),
+        token_hash=hash_refresh_token(token),
+        expires_at=datetime.datetime.now(tz=datetime.timezone.utc) + \
+            datetime.timedelta(days=REFRESH_TOKEN_EXPIRY_IN_DAYS),
+    ))
+    return token
     
 
 
-def hash_password(password, confirm_password):
+async def hash_password(password, confirm_password):
     '''
-    Hash Password.
+    Hash Password in the bcrypt process pool.
     '''
     #check password
     if password == confirm_password:
-        return pwd_context.hash(password)
+        return await hash_in_pool(password)
     return None
 
 
-def verify_password(input_password, password_hash):
+async def verify_password(input_password, password_hash):
     '''
-    Verify Hashed password with the user entered password.
+    Verify Hashed password with the user entered password in the bcrypt process pool.
     '''
-    return pwd_context.verify(input_password, password_hash)
+    return await verify_in_pool(input_password, password_hash)
 
 
-def create_link(email):
+class InvalidEmailToken(ValueError):
+    pass
+
+
+class EmailToken(NamedTuple):
+    purpose: str
+    email: str
+    nonce: str
+    expires_at: datetime.datetime
+
+
+def sign_email_token(payload):
+    return hmac.new(EMAIL_TOKEN_KEY, payload, hashlib.sha256).digest()[:EMAIL_TOKEN_SIGNATURE_SIZE]
+
+
+def create_email_token(email, purpose):
     '''
-    Create Unique verification link.
+    Create a URL-safe token for an email link, valid once for `purpose`.
+
+    The purpose, expiry, a random nonce and the email are signed with a
+    truncated HMAC-SHA256 and base64url encoded; nothing is encrypted.
     '''
-    encMessage = FERNET.encrypt(email.encode())
-    return encMessage
+    expires = int(time.time()) + EMAIL_TOKEN_EXPIRY_IN_MINUTES[purpose] * 60
+    payload = EMAIL_TOKEN_HEADER.pack(
+        EMAIL_TOKEN_PURPOSES[purpose], expires, secrets.token_bytes(16)
+    ) + email.encode()
+    return base64.urlsafe_b64encode(payload + sign_email_token(payload)).decode().rstrip("=")
+
 
-def decrypt_link(token):
+def read_email_token(token, *purposes):
     '''
-    Decrypt verification link.
+    Check the signature, purpose and expiry of a token made by create_email_token.
+
+    Raises InvalidEmailToken. Whether the token was already used is checked
+    by consume_email_token.
     '''
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+    except ValueError:
+        raise InvalidEmailToken("Invalid token.")
+    payload, signature = raw[:-EMAIL_TOKEN_SIGNATURE_SIZE], raw[-EMAIL_TOKEN_SIGNATURE_SIZE:]
+    if (len(payload) < EMAIL_TOKEN_HEADER.size
+            or not hmac.compare_digest(signature, sign_email_token(payload))):
+        raise InvalidEmailToken("Invalid token.")
+    purpose_id, expires, nonce = EMAIL_TOKEN_HEADER.unpack_from(payload)
+    purpose = next((name for name in purposes if EMAIL_TOKEN_PURPOSES[name] == purpose_id), None)
+    if purpose is None:
+        raise InvalidEmailToken("Invalid token.")
+    if expires <= time.time():
+        raise InvalidEmailToken("Token has expired.")
+    return EmailToken(
+        purpose=purpose,
+        email=payload[EMAIL_TOKEN_HEADER.size:].decode(),
+        nonce=str(uuid.UUID(bytes=nonce)),
+        expires_at=datetime.datetime.fromtimestamp(expires, tz=datetime.timezone.utc),
+    )
 
-    decMessage = FERNET.decrypt(token).decode()
-    return decMessage
-    
 
+async def consume_email_token(db, token: EmailToken):
+    '''
+    Record the nonce of a token read by read_email_token so it works only once.
 
-async def send_email(email, base_url, redirect_url, forgot=""):
+    The nonce is flushed in the caller's transaction, commit it together
+    with the change the token allows. Raises InvalidEmailToken when the
+    token was used before.
     '''
-    Sending Email.
+    # Nonces are only needed until their token expires.
+    await db.execute(delete(UsedTokenNonce).where(
+        UsedTokenNonce.expires_at<=datetime.datetime.now(tz=datetime.timezone.utc)
+    ))
+    db.add(UsedTokenNonce(nonce=token.nonce, purpose=token.purpose, expires_at=token.expires_at))
+    try:
+        await db.flush()
+    except IntegrityError:
+        await db.rollback()
+        raise InvalidEmailToken("Token has already been used.")
+
+
+async def send_email(email, base_url, redirect_url, purpose=VERIFY_EMAIL):
     '''
-    encrypt = create_link(email)
-    link = base_url + f"{redirect_url}?token={encrypt}&email={email}&forgot={forgot}"
-    template = f"""
-        <html>
-            <body>
-            
-                <p>Email Verification Link
-                <br>Click on this link to verify the email :- {link}</p>
-    
-            </body>
-        </html>
-    """
-    message = MessageSchema(
-       subject="Email Verification | Skill Matrix",
-       recipients=[email],  # List of recipients, as many as you can pass  
-       body=template,
-       subtype="html"
-       )
-    fm = FastMail(conf)
-    await fm.send_message(message)
+    Queue the verification email on the outbox, delivery happens in the background.
+    '''
+    link = base_url + f"{redirect_url}?token={create_email_token(email, purpose)}"
+    template = VERIFICATION_TEMPLATE.render(link=link)
+    await email_outbox.enqueue(email, "Email Verification | Skill Matrix", template)
     return True
 
 
-def verify_user(authorization: str = Header(..., convert_underscores=False)):
+def encode_cursor(created_at, id):
+    '''
+    Encode the (created_at, id) keyset position of a row into an opaque cursor.
+    '''
+    raw = json.dumps([created_at.isoformat(), id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    '''
+    Decode a cursor made by encode_cursor, raises ValueError when it is malformed.
+    '''
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.datetime.fromisoformat(created_at), str(id)
+    except (TypeError, ValueError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def make_etag(*parts):
+    '''
+    Strong ETag from the parts that identify a response (table, params, version).
+    '''
+    raw = "|".join(str(part) for part in parts)
+    return '"' + hashlib.sha1(raw.encode()).hexdigest() + '"'
+
+
+def etag_matches(if_none_match, etag):
+    '''
+    Check an If-None-Match header value against an ETag.
+    '''
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    tags = (tag.strip() for tag in if_none_match.split(","))
+    return etag in (tag[2:] if tag.startswith("W/") else tag for tag in tags)
+
+
+def verify_user(authorization: str = Header(..., convert_underscores=False),
+                db = Depends(get_db)):
+    '''
+    Authenticate the bearer token and return the current user.
+
+    Decoded tokens are cached until the token expires, capped at
+    AUTH_CACHE_TTL_IN_SECONDS so user changes are picked up.
+    '''
     if not authorization or not authorization.startswith("Bearer "):
         raise HTTPException(status_code=401, detail="Invalid Credentials")
     token = authorization.split("Bearer ")[1]
 
-    #token validation logic will be written here.
+    current_user = auth_cache.get(token)
+    if current_user is not None:
+        return current_user
 
-    return token
+    payload = decode_jwt_token(token)
+    user = db.query(User.id, User.email_address, User.user_profile_id).filter(
+        User.email_address==payload.get("email")
+    ).first()
+    if not user:
+        raise HTTPException(status_code=401, detail="Invalid Credentials")
+    current_user = {
+        "id": user.id,
+        "email": user.email_address,
+        "user_profile_id": user.user_profile_id,
+        "token": token,
+    }
+    ttl = min(AUTH_CACHE_TTL_IN_SECONDS, payload.get("exp", 0) - time.time())
+    if ttl > 0:
+        auth_cache.set(token, current_user, ttl=ttl)
+    return current_user
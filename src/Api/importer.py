@@ -0,0 +1,284 @@
+'''
+Bulk import of employee skills from CSV.
+
+Rows are validated while the file is read and the good ones are spooled
+as CSV, then loaded into a temporary staging table with PostgreSQL COPY
+(batched inserts on other databases). Emails and skill names are
+resolved against `user` and `skill` with a handful of set-wise
+statements, and the result is merged into `emp_skill` in the caller's
+transaction.
+
+    python -m src.Api.importer employee_skills.csv
+'''
+import io
+import csv
+import tempfile
+
+from sqlalchemy import (MetaData, Table, Column, Index, Integer, String, select, insert,
+                        exists, distinct, func, literal, and_, text)
+from sqlalchemy.orm import Session
+
+from .config import IMPORT_SPOOL_MAX_SIZE, IMPORT_BATCH_SIZE, IMPORT_MAX_REPORTED_ERRORS
+from .models import User, UserProfile, Skill, EmpSkill, GUID, uuid7, bump_table_version
+
+
+IMPORT_COLUMNS = ("email_address", "skill_name", "skill_type", "skill_category",
+                  "rate_by_self", "certificate")
+REQUIRED_COLUMNS = ("email_address", "skill_name", "skill_type")
+
+# Staging table, created per import on the importing connection.
+staging = Table(
+    "emp_skill_import", MetaData(),
+    Column("line_no", Integer, primary_key=True, autoincrement=False),
+    Column("id", GUID, nullable=False),
+    Column("email_address", String, nullable=False),
+    Column("skill_name", String, nullable=False),
+    Column("skill_type", String, nullable=False),
+    Column("skill_category", String),
+    Column("rate_by_self", Integer),
+    Column("certificate", String),
+    Column("user_profile_id", GUID),
+    Column("skill_id", GUID),
+    Index("ix_emp_skill_import_target", "user_profile_id", "skill_id", "line_no"),
+    prefixes=["TEMPORARY"],
+)
+STAGED_COLUMNS = ("line_no", "id") + IMPORT_COLUMNS
+COPY_SQL = "COPY emp_skill_import ({}) FROM STDIN WITH (FORMAT csv)".format(", ".join(STAGED_COLUMNS))
+
+
+class ImportReport:
+    """
+    Counters of one import and the first IMPORT_MAX_REPORTED_ERRORS rejected rows.
+    """
+    def __init__(self) -> None:
+        '''
+        Init method.
+        '''
+        self.received = 0
+        self.inserted = 0
+        self.updated = 0
+        self.superseded = 0
+        self.skills_created = 0
+        self.rejected = 0
+        self.errors = []
+
+    def reject(self, line_no, error):
+        self.rejected += 1
+        if len(self.errors) < IMPORT_MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line_no, "error": error})
+
+    def as_dict(self):
+        return {
+            "received": self.received,
+            "inserted": self.inserted,
+            "updated": self.updated,
+            "superseded": self.superseded,
+            "skills_created": self.skills_created,
+            "rejected": self.rejected,
+            "errors": self.errors,
+        }
+
+
+def validate_rows(lines, report: ImportReport):
+    '''
+    Yield (line_no, id, *IMPORT_COLUMNS) for every valid row, rejecting the rest.
+
+    Raises ValueError when the header lacks a required column.
+    '''
+    reader = csv.DictReader(lines)
+    missing = [column for column in REQUIRED_COLUMNS if column not in (reader.fieldnames or ())]
+    if missing:
+        raise ValueError(f"Missing required column(s): {', '.join(missing)}.")
+    for record in reader:
+        report.received += 1
+        line_no = reader.line_num
+        values = {column: (record.get(column) or "").strip() or None for column in IMPORT_COLUMNS}
+        empty = [column for column in REQUIRED_COLUMNS if values[column] is None]
+        if empty:
+            report.reject(line_no, f"Empty {', '.join(empty)}.")
+            continue
+        if values["rate_by_self"] is not None:
+            try:
+                values["rate_by_self"] = int(values["rate_by_self"])
+            except ValueError:
+                report.reject(line_no, "rate_by_self must be an integer.")
+                continue
+        yield (line_no, uuid7(), *(values[column] for column in IMPORT_COLUMNS))
+
+
+def spool_rows(rows):
+    '''
+    Write rows as CSV into a temporary file that spills to disk past IMPORT_SPOOL_MAX_SIZE.
+    '''
+    spool = tempfile.SpooledTemporaryFile(max_size=IMPORT_SPOOL_MAX_SIZE, mode="w+", newline="")
+    csv.writer(spool).writerows(rows)
+    spool.seek(0)
+    return spool
+
+
+def load_staging(connection, spool):
+    '''
+    Fill the staging table from the spooled CSV, with COPY on PostgreSQL.
+    '''
+    if connection.dialect.name == "postgresql":
+        cursor = connection.connection.cursor()
+        try:
+            cursor.copy_expert(COPY_SQL, spool)
+        finally:
+            cursor.close()
+        # Temporary tables are never analyzed automatically.
+        connection.execute(text("ANALYZE emp_skill_import"))
+        return
+    batch = []
+    for row in csv.reader(spool):
+        record = dict(zip(STAGED_COLUMNS, (value or None for value in row)))
+        record["line_no"] = int(record["line_no"])
+        if record["rate_by_self"] is not None:
+            record["rate_by_self"] = int(record["rate_by_self"])
+        batch.append(record)
+        if len(batch) >= IMPORT_BATCH_SIZE:
+            connection.execute(insert(staging), batch)
+            batch = []
+    if batch:
+        connection.execute(insert(staging), batch)
+
+
+def update_from(connection, table, source, condition, columns, **values):
+    '''
+    Set table.<target> = source.<name> for each `columns` item on the rows matching `condition`.
+
+    PostgreSQL gets a joined UPDATE ... FROM; SQLAlchemy can't render that
+    for SQLite, which gets correlated subqueries instead.
+    '''
+    if connection.dialect.name == "postgresql":
+        values.update({target: source.c[name] for target, name in columns.items()})
+        return connection.execute(table.update().values(values).where(condition))
+    values.update({
+        target: select(source.c[name]).where(condition).limit(1).scalar_subquery()
+        for target, name in columns.items()
+    })
+    return connection.execute(table.update().values(values).where(exists().where(condition)))
+
+
+def resolve_skills(connection):
+    skills = (
+        select(Skill.skill_name, func.min(Skill.id).label("id"))
+        .group_by(Skill.skill_name)
+        .subquery()
+    )
+    update_from(connection, staging, skills,
+                and_(skills.c.skill_name==staging.c.skill_name, staging.c.skill_id.is_(None)),
+                {"skill_id": "id"})
+
+
+def merge_staging(connection, report: ImportReport, imported_by):
+    '''
+    Resolve the staged rows set-wise and merge them into emp_skill.
+    '''
+    user = User.__table__
+    update_from(connection, staging, user, user.c.email_address==staging.c.email_address,
+                {"user_profile_id": "user_profile_id"})
+    unknown = staging.c.user_profile_id.is_(None)
+    rows = connection.execute(
+        select(staging.c.line_no, staging.c.email_address)
+        .where(unknown)
+        .order_by(staging.c.line_no)
+        .limit(IMPORT_MAX_REPORTED_ERRORS)
+    ).all()
+    for row in rows:
+        report.reject(row.line_no, f"No user with a profile for {row.email_address}.")
+    deleted = connection.execute(staging.delete().where(unknown)).rowcount
+    # Rows past the reported ones still count as rejected.
+    report.rejected += deleted - len(rows)
+
+    resolve_skills(connection)
+    names = connection.execute(
+        select(distinct(staging.c.skill_name)).where(staging.c.skill_id.is_(None))
+    ).scalars().all()
+    if names:
+        connection.execute(insert(Skill.__table__), [
+            {"id": uuid7(), "skill_name": name, "created_by": imported_by}
+            for name in names
+        ])
+        bump_table_version(connection, Skill.__tablename__)
+        resolve_skills(connection)
+        report.skills_created = len(names)
+
+    # The last row for a (user, skill) pair wins.
+    later = staging.alias("later")
+    report.superseded = connection.execute(staging.delete().where(exists().where(and_(
+        later.c.user_profile_id==staging.c.user_profile_id,
+        later.c.skill_id==staging.c.skill_id,
+        later.c.line_no > staging.c.line_no,
+    )))).rowcount
+
+    emp_skill = EmpSkill.__table__
+    report.updated = update_from(
+        connection, emp_skill, staging,
+        and_(emp_skill.c.user_profile_id==staging.c.user_profile_id,
+             emp_skill.c.skill_id==staging.c.skill_id),
+        {name: name for name in ("skill_type", "skill_category", "rate_by_self", "certificate")},
+        updated_by=imported_by,
+    ).rowcount
+    new_rows = (
+        select(staging.c.id, staging.c.user_profile_id, staging.c.skill_id, staging.c.skill_type,
+               staging.c.skill_category, staging.c.rate_by_self, staging.c.certificate,
+               UserProfile.manager_id, literal(False), literal(imported_by))
+        .join(UserProfile, UserProfile.id==staging.c.user_profile_id)
+        .where(~exists().where(and_(emp_skill.c.user_profile_id==staging.c.user_profile_id,
+                                    emp_skill.c.skill_id==staging.c.skill_id)))
+    )
+    report.inserted = connection.execute(insert(emp_skill).from_select(
+        ["id", "user_profile_id", "skill_id", "skill_type", "skill_category", "rate_by_self",
+         "certificate", "emp_manager_id", "is_evaluated", "created_by"],
+        new_rows,
+    )).rowcount
+
+
+def import_emp_skills(db: Session, lines, imported_by="CSV Import"):
+    '''
+    Import employee skills from an iterable of CSV lines in one transaction.
+
+    Returns the ImportReport; raises ValueError for an unusable header.
+    '''
+    report = ImportReport()
+    with spool_rows(validate_rows(lines, report)) as spool:
+        try:
+            connection = db.connection()
+            staging.drop(connection, checkfirst=True)
+            staging.create(connection)
+            load_staging(connection, spool)
+            merge_staging(connection, report, imported_by)
+            staging.drop(connection)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+    return report
+
+
+def open_csv(file):
+    '''
+    Text view of a binary upload, decoded as it is read.
+    '''
+    return io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+
+
+if __name__ == "__main__":
+    import json
+    import argparse
+
+    from .database import SessionLocal
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("path")
+    parser.add_argument("--imported-by", default="CSV Import")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        with open(args.path, encoding="utf-8-sig", newline="") as lines:
+            report = import_emp_skills(db, lines, args.imported_by)
+    finally:
+        db.close()
+    print(json.dumps(report.as_dict(), indent=2))
@@ -0,0 +1,127 @@
+import re
+import time
+import logging
+from collections import Counter
+from contextvars import ContextVar
+
+from sqlalchemy import event
+
+from .config import DEBUG, SQL_QUERY_BUDGET, SQL_REPEATED_STATEMENT_THRESHOLD
+from .database import engine, async_engine
+from .replicas import replica_router
+
+
+logger = logging.getLogger(__name__)
+
+LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+WHITESPACE = re.compile(r"\s+")
+
+
+def fingerprint(statement):
+    '''
+    Statement with literals and whitespace normalized, so repeats of one query compare equal.
+    '''
+    return WHITESPACE.sub(" ", LITERALS.sub("?", statement)).strip()
+
+
+class QueryStats:
+    """
+    Queries issued while serving one request.
+
+    The object is shared by reference with the threadpool workers that run
+    sync routes, which all write to it for the same request.
+    """
+    def __init__(self) -> None:
+        '''
+        Init method.
+        '''
+        self.count = 0
+        self.total_seconds = 0.0
+        self.statements = Counter()
+
+    def record(self, statement, seconds):
+        self.count += 1
+        self.total_seconds += seconds
+        self.statements[statement] += 1
+
+    def repeated(self, threshold=SQL_REPEATED_STATEMENT_THRESHOLD):
+        '''
+        Fingerprints run at least `threshold` times, most frequent first.
+        '''
+        repeats = Counter()
+        for statement, count in self.statements.items():
+            repeats[fingerprint(statement)] += count
+        return [(statement, count) for statement, count in repeats.most_common() if count >= threshold]
+
+
+query_stats: ContextVar = ContextVar("query_stats", default=None)
+
+
+# The start time lives on the statement's execution context, so a statement
+# that raises leaves nothing behind on the pooled connection. Statements run
+# without a context (dialect internals) are counted with no duration.
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context.query_start_time = time.perf_counter()
+
+
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = query_stats.get()
+    if stats is not None:
+        start = getattr(context, "query_start_time", None)
+        stats.record(statement, 0.0 if start is None else time.perf_counter() - start)
+
+
+replica_engines = [replica.engine for replica in replica_router.replicas]
+for instrumented_engine in (engine, async_engine.sync_engine, *replica_engines):
+    event.listen(instrumented_engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(instrumented_engine, "after_cursor_execute", after_cursor_execute)
+
+
+class QueryInstrumentationMiddleware:
+    """
+    ASGI middleware counting the SQL each request issues.
+
+    Warns when a request goes over SQL_QUERY_BUDGET queries or repeats one
+    statement SQL_REPEATED_STATEMENT_THRESHOLD times (usually a lazy load
+    in a loop). With DEBUG on, the counts so far are sent as X-DB-* headers;
+    queries run by a streaming body after the headers are only logged.
+    """
+    def __init__(self, app, budget=SQL_QUERY_BUDGET, debug=DEBUG) -> None:
+        '''
+        Init method.
+        '''
+        self.app = app
+        self.budget = budget
+        self.debug = debug
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        stats = QueryStats()
+        token = query_stats.set(stats)
+
+        async def send_with_headers(message):
+            if self.debug and message["type"] == "http.response.start":
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [
+                    (b"x-db-query-count", str(stats.count).encode()),
+                    (b"x-db-query-time-ms", f"{stats.total_seconds * 1000:.2f}".encode()),
+                    (b"x-db-repeated-statements", str(len(stats.repeated())).encode()),
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            query_stats.reset(token)
+            self.report(scope, stats)
+
+    def report(self, scope, stats: QueryStats):
+        repeated = stats.repeated()
+        if stats.count > self.budget:
+            logger.warning("%s %s issued %s queries (budget %s) in %.1f ms.", scope["method"],
+                           scope["path"], stats.count, self.budget, stats.total_seconds * 1000)
+        for statement, count in repeated:
+            logger.warning("%s %s ran the same statement %s times, possible N+1: %s",
+                           scope["method"], scope["path"], count, statement)
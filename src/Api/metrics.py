@@ -0,0 +1,197 @@
+import time
+import bisect
+
+from .config import METRICS_LATENCY_BUCKETS
+
+
+def format_labels(labelnames, labels):
+    if not labelnames:
+        return ""
+    pairs = ",".join(
+        '{}="{}"'.format(name, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in zip(labelnames, labels)
+    )
+    return "{" + pairs + "}"
+
+
+def format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    """
+    Base of the metric types, keyed by a tuple of label values.
+
+    Metrics are only updated from the event loop thread (middleware,
+    done-callbacks scheduled with call_soon_threadsafe), so updates are
+    plain dict operations without locks.
+    """
+    type = "untyped"
+
+    def __init__(self, name, documentation, labelnames=(), registry=None) -> None:
+        '''
+        Init method.
+        '''
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+        (registry or REGISTRY).register(self)
+
+    def samples(self):
+        for labels, value in self.values.items():
+            yield self.name, format_labels(self.labelnames, labels), value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        for name, labels, value in self.samples():
+            lines.append(f"{name}{labels} {format_value(value)}")
+        return lines
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, *labels, amount=1):
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def inc(self, *labels, amount=1):
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def dec(self, *labels, amount=1):
+        self.values[labels] = self.values.get(labels, 0) - amount
+
+    def set(self, value, *labels):
+        self.values[labels] = value
+
+
+class Histogram(Metric):
+    """
+    Cumulative histogram; each label set holds [bucket counts..., sum].
+    """
+    type = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=METRICS_LATENCY_BUCKETS,
+                 registry=None) -> None:
+        '''
+        Init method.
+        '''
+        super().__init__(name, documentation, labelnames, registry)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+
+    def observe(self, value, *labels):
+        state = self.values.get(labels)
+        if state is None:
+            state = self.values[labels] = [0] * len(self.buckets) + [0.0]
+        state[bisect.bisect_left(self.buckets, value)] += 1
+        state[-1] += value
+
+    def samples(self):
+        labelnames = self.labelnames + ("le",)
+        for labels, state in self.values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets, state):
+                cumulative += count
+                yield (f"{self.name}_bucket",
+                       format_labels(labelnames, labels + (format_value(bound),)), cumulative)
+            yield f"{self.name}_sum", format_labels(self.labelnames, labels), state[-1]
+            yield f"{self.name}_count", format_labels(self.labelnames, labels), cumulative
+
+
+class Registry:
+    """
+    Metrics and scrape time collectors rendered together in the Prometheus text format.
+
+    A collector is a callable returning Metric-like objects; it is used for
+    values that already live elsewhere (pool sizes, outbox counters) and
+    are cheaper to read on scrape than to mirror on every change.
+    """
+    def __init__(self) -> None:
+        '''
+        Init method.
+        '''
+        self.metrics = []
+        self.collectors = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+
+    def add_collector(self, collector):
+        self.collectors.append(collector)
+        return collector
+
+    def render(self):
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        for collector in self.collectors:
+            for metric in collector():
+                lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+def collected(metric_type, name, documentation, labelnames, values):
+    '''
+    Unregistered metric holding values read at scrape time, for collectors.
+    '''
+    metric = metric_type(name, documentation, labelnames, registry=Registry())
+    metric.values = values
+    return metric
+
+
+http_requests_total = Counter(
+    "http_requests_total", "HTTP requests by route template and status.",
+    ("method", "route", "status"),
+)
+http_request_duration_seconds = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template, body included.",
+    ("method", "route"),
+)
+http_requests_in_flight = Gauge(
+    "http_requests_in_flight", "HTTP requests currently being served.",
+)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware feeding the HTTP request metrics.
+
+    Requests are labelled with the matched route template, never the raw
+    path, to keep the label set bounded.
+    """
+    def __init__(self, app) -> None:
+        '''
+        Init method.
+        '''
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        status = 500
+        started = time.perf_counter()
+        http_requests_in_flight.inc()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            http_requests_in_flight.dec()
+            route = scope.get("route")
+            route = route.path if route is not None else "unmatched"
+            http_requests_total.inc(scope["method"], route, status)
+            http_request_duration_seconds.observe(time.perf_counter() - started, scope["method"], route)
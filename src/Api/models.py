@@ -1,11 +1,16 @@
+import os
+import time
 import uuid
 import datetime
 
 from typing import List
 from typing import Optional
-from sqlalchemy import (create_engine, ForeignKey, String,
-                         Column, Integer, Boolean, DateTime, func)
-from sqlalchemy.orm import relationship
+from sqlalchemy import (create_engine, ForeignKey, String, Text, CHAR,
+                         Column, Integer, BigInteger, Boolean, DateTime, Index, func,
+                         event, select, insert, delete, inspect, literal, and_, true)
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.types import TypeDecorator
+from sqlalchemy.orm import relationship, aliased
 from sqlalchemy.ext.declarative import declarative_base
 
 from .database import Base
@@ -16,18 +21,83 @@ from .database import Base
 # from sqlalchemy.orm import relationship
 
 
+class InvalidIdentifier(ValueError):
+    pass
+
+
+def canonical_id(value):
+    '''
+    Lowercase hyphenated form of a UUID given in any spelling uuid.UUID accepts.
+    '''
+    try:
+        return str(value if isinstance(value, uuid.UUID) else uuid.UUID(value))
+    except (TypeError, ValueError, AttributeError):
+        raise InvalidIdentifier(f"Invalid id: {value!r}") from None
+
+
+class GUID(TypeDecorator):
+    """
+    UUID key stored natively (16 bytes) on PostgreSQL and as CHAR(36) elsewhere.
+
+    Values are canonical lowercase strings on both sides; binding anything
+    that isn't a UUID raises InvalidIdentifier before it reaches the database.
+    """
+    impl = CHAR(36)
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "postgresql":
+            return dialect.type_descriptor(postgresql.UUID(as_uuid=False))
+        return dialect.type_descriptor(CHAR(36))
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return canonical_id(value)
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else str(value)
+
+
+def uuid7(timestamp_ms=None, random_bits=None):
+    '''
+    Time ordered UUID (version 7) string: a 48 bit unix millisecond timestamp
+    followed by 74 random bits, so new keys land at the right edge of the
+    index instead of on random pages.
+    '''
+    if timestamp_ms is None:
+        timestamp_ms = time.time_ns() // 1000000
+    if random_bits is None:
+        random_bits = int.from_bytes(os.urandom(10), "big")
+    value = ((timestamp_ms & 0xffffffffffff) << 80 | 0x7 << 76 | (random_bits >> 62 & 0xfff) << 64
+             | 0x2 << 62 | random_bits & 0x3fffffffffffffff)
+    h = "%032x" % value
+    return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+
+
+# SQLite fills server side timestamps from CURRENT_TIMESTAMP, which has no
+# fractional seconds, and compares them as text. Binding at the same precision
+# keeps keyset comparisons such as (created_at, id) > (?, ?) exact.
+Timestamp = DateTime(timezone=True).with_variant(
+    sqlite.DATETIME(storage_format="%(year)04d-%(month)02d-%(day)02d "
+                                   "%(hour)02d:%(minute)02d:%(second)02d"),
+    "sqlite",
+)
+
+
 class BaseAbs(Base):
     __abstract__ = True
 
-    id = Column(String, primary_key=True, default=str(uuid.uuid4()))
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    id = Column(GUID, primary_key=True, default=uuid7)
+    created_at = Column(Timestamp, server_default=func.now())
+    updated_at = Column(Timestamp, onupdate=func.now())
     created_by = Column(String, default="New User")
     updated_by = Column(String)
     
 
 class Permission(BaseAbs):
     __tablename__ = "permission"
+    __table_args__ = (Index('ix_permission_created_at_id', 'created_at', 'id'),)
 
     name = Column(String)
     operation = Column(String)
@@ -36,6 +106,7 @@ class Permission(BaseAbs):
 
 class Role(BaseAbs):
     __tablename__ = "role"
+    __table_args__ = (Index('ix_role_created_at_id', 'created_at', 'id'),)
 
     role_name = Column(String, nullable=False)
     permissions = relationship('Permission', secondary='role_permission', back_populates='roles')
@@ -44,6 +115,7 @@ class Role(BaseAbs):
 
 class Project(BaseAbs):
     __tablename__ = "project"
+    __table_args__ = (Index('ix_project_created_at_id', 'created_at', 'id'),)
 
     project_name = Column(String, nullable=False)
     users = relationship('UserProfile', secondary='user_project', back_populates='projects')
@@ -52,23 +124,23 @@ class Project(BaseAbs):
 class RolePermission(Base):
     __tablename__ = 'role_permission'
 
-    role_id = Column(String, ForeignKey('role.id'), primary_key=True)
-    permission_id = Column(String, ForeignKey('permission.id'), primary_key=True)
+    role_id = Column(GUID, ForeignKey('role.id'), primary_key=True)
+    permission_id = Column(GUID, ForeignKey('permission.id'), primary_key=True)
     created_at = Column(DateTime, server_default=func.now())
 
 
 class UserRole(Base):
     __tablename__ = 'user_role'
 
-    role_id = Column(String, ForeignKey('role.id'), primary_key=True)
-    user_profile_id = Column(String, ForeignKey('user_profile.id'), primary_key=True)
+    role_id = Column(GUID, ForeignKey('role.id'), primary_key=True)
+    user_profile_id = Column(GUID, ForeignKey('user_profile.id'), primary_key=True)
     created_at = Column(DateTime, server_default=func.now())
 
 class UserProject(Base):
     __tablename__ = 'user_project'
 
-    project_id = Column(String, ForeignKey('project.id'), primary_key=True)
-    user_profile_id = Column(String, ForeignKey('user_profile.id'), primary_key=True)
+    project_id = Column(GUID, ForeignKey('project.id'), primary_key=True)
+    user_profile_id = Column(GUID, ForeignKey('user_profile.id'), primary_key=True)
     created_at = Column(DateTime, server_default=func.now())
 
 
@@ -77,22 +149,105 @@ class User(BaseAbs):
 
     full_name = Column(String, nullable=False)
     email_address = Column(String, nullable=False, unique=True)
-    user_profile_id = Column(String, ForeignKey('user_profile.id'), unique=True)
+    user_profile_id = Column(GUID, ForeignKey('user_profile.id'), unique=True)
     user_profile = relationship('UserProfile', back_populates='user', uselist=False)
     password = Column(String, nullable=False)
     is_active = Column(Boolean, default=False)
 
 
+class RefreshToken(BaseAbs):
+    '''
+    SHA-256 hash of a refresh token issued at login.
+
+    Every refresh revokes the token and issues its successor in the same
+    family, so presenting a revoked token again means it leaked and the
+    whole family is revoked.
+    '''
+    __tablename__ = "refresh_token"
+    __table_args__ = (
+        Index('ix_refresh_token_user_id', 'user_id'),
+        Index('ix_refresh_token_family_id', 'family_id'),
+    )
+
+    user_id = Column(GUID, ForeignKey('user.id', ondelete='CASCADE'), nullable=False)
+    family_id = Column(GUID, nullable=False)
+    token_hash = Column(String(64), nullable=False, unique=True)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    revoked_at = Column(DateTime(timezone=True))
+
+
+class UsedTokenNonce(Base):
+    '''
+    Nonce of a used email link token, kept until the token expires so it works only once.
+    '''
+    __tablename__ = "used_token_nonce"
+    __table_args__ = (Index('ix_used_token_nonce_expires_at', 'expires_at'),)
+
+    nonce = Column(GUID, primary_key=True)
+    purpose = Column(String, nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    used_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class TableVersion(Base):
+    '''
+    Counter bumped in the same transaction as every write to an admin table,
+    the version its ETags are derived from.
+    '''
+    __tablename__ = "table_version"
+
+    table_name = Column(String, primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+
+
+class OutboxEmail(Base):
+    '''
+    Email waiting in the outbox, deleted once it is sent.
+
+    Workers claim due rows for `claimed_until`, so the rows of a worker
+    that died are picked up again when its claim runs out.
+    '''
+    __tablename__ = "email_outbox"
+    __table_args__ = (Index('ix_email_outbox_available_at', 'available_at'),)
+
+    id = Column(GUID, primary_key=True, default=uuid7)
+    recipient = Column(String, nullable=False)
+    subject = Column(String, nullable=False)
+    html = Column(Text, nullable=False)
+    attempts = Column(Integer, nullable=False, default=0)
+    available_at = Column(DateTime(timezone=True), nullable=False)
+    claimed_by = Column(GUID)
+    claimed_until = Column(DateTime(timezone=True))
+    failed_at = Column(DateTime(timezone=True))
+    last_error = Column(String)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+def bump_table_version(connection, table_name):
+    '''
+    Bump the version of `table_name` within the connection's transaction.
+
+    A counter never repeats, unlike the latest updated_at, which has one
+    second resolution on SQLite and follows the writers' clocks.
+    '''
+    dialect = postgresql if connection.dialect.name == "postgresql" else sqlite
+    statement = dialect.insert(TableVersion.__table__).values(table_name=table_name, version=1)
+    connection.execute(statement.on_conflict_do_update(
+        index_elements=["table_name"],
+        set_={"version": TableVersion.__table__.c.version + 1},
+    ))
+
+
 class UserProfile(BaseAbs):
     __tablename__ = "user_profile"
 
     user = relationship('User', back_populates='user_profile', uselist=False)
-    manager_id = Column(String, ForeignKey('user_profile.id'))
+    manager_id = Column(GUID, ForeignKey('user_profile.id'))
     team = relationship("UserProfile", foreign_keys=[manager_id], remote_side='UserProfile.id')
     occupied = Column(Boolean, default=False)
-    designation_id = Column(String, ForeignKey('designation.id'))
+    designation_id = Column(GUID, ForeignKey('designation.id'))
     designation = relationship('Designation', foreign_keys=[designation_id], back_populates='user')
-    competency_id = Column(String, ForeignKey('competency.id'))
+    competency_id = Column(GUID, ForeignKey('competency.id'))
     competency = relationship('Competency', foreign_keys=[competency_id], back_populates='user_profile')
     roles = relationship('Role', secondary='user_role', back_populates='users')
     projects = relationship('Project', secondary='user_project', back_populates='users')
@@ -101,8 +256,67 @@ class UserProfile(BaseAbs):
     skill_evaluator = relationship('SkillEvaluator', back_populates='evaluator')
 
 
+class UserProfileClosure(Base):
+    '''
+    Every (ancestor, descendant) pair of the manager hierarchy, including
+    each profile paired with itself at depth 0. Kept in sync with
+    UserProfile.manager_id by the mapper events below.
+    '''
+    __tablename__ = 'user_profile_closure'
+    __table_args__ = (
+        Index('ix_user_profile_closure_ancestor_id_depth', 'ancestor_id', 'depth', 'descendant_id'),
+        Index('ix_user_profile_closure_descendant_id', 'descendant_id'),
+    )
+
+    ancestor_id = Column(GUID, ForeignKey('user_profile.id', ondelete='CASCADE'), primary_key=True)
+    descendant_id = Column(GUID, ForeignKey('user_profile.id', ondelete='CASCADE'), primary_key=True)
+    depth = Column(Integer, nullable=False)
+
+
+@event.listens_for(UserProfile, "after_insert")
+def insert_closure_rows(mapper, connection, target):
+    closure = UserProfileClosure.__table__
+    connection.execute(insert(closure).values(
+        ancestor_id=target.id, descendant_id=target.id, depth=0
+    ))
+    if target.manager_id:
+        connection.execute(insert(closure).from_select(
+            ["ancestor_id", "descendant_id", "depth"],
+            select(closure.c.ancestor_id, literal(target.id, GUID), closure.c.depth + 1)
+            .where(closure.c.descendant_id==target.manager_id)
+        ))
+
+
+@event.listens_for(UserProfile, "after_update")
+def move_closure_subtree(mapper, connection, target):
+    history = inspect(target).attrs.manager_id.history
+    if not history.has_changes():
+        return
+    closure = UserProfileClosure.__table__
+    subtree = select(closure.c.descendant_id).where(closure.c.ancestor_id==target.id)
+    if target.manager_id and connection.execute(
+            select(closure.c.depth).where(and_(closure.c.ancestor_id==target.id,
+                                               closure.c.descendant_id==target.manager_id))
+    ).first():
+        raise ValueError("A profile can't be managed by one of its own reports.")
+    # Detach the subtree from its old ancestors, then attach it under the new manager.
+    connection.execute(delete(closure).where(and_(
+        closure.c.descendant_id.in_(subtree),
+        closure.c.ancestor_id.not_in(subtree),
+    )))
+    if target.manager_id:
+        above, below = aliased(closure), aliased(closure)
+        connection.execute(insert(closure).from_select(
+            ["ancestor_id", "descendant_id", "depth"],
+            select(above.c.ancestor_id, below.c.descendant_id, above.c.depth + below.c.depth + 1)
+            .select_from(above).join(below, true())
+            .where(and_(above.c.descendant_id==target.manager_id, below.c.ancestor_id==target.id))
+        ))
+
+
 class Skill(BaseAbs):
     __tablename__ = "skill"
+    __table_args__ = (Index('ix_skill_created_at_id', 'created_at', 'id'),)
 
     skill_name = Column(String, nullable=False)
     emp = relationship('EmpSkill', back_populates='emp_skill')
@@ -110,27 +324,36 @@ class Skill(BaseAbs):
 
 class EmpSkill(BaseAbs):
     __tablename__ = "emp_skill"
+    __table_args__ = (
+        Index('ix_emp_skill_skill_id_rate_by_self', 'skill_id', 'rate_by_self', 'user_profile_id'),
+        Index('ix_emp_skill_user_profile_id', 'user_profile_id'),
+        Index('ix_emp_skill_emp_manager_id', 'emp_manager_id'),
+    )
 
-    user_profile_id = Column(String, ForeignKey('user_profile.id'))
+    user_profile_id = Column(GUID, ForeignKey('user_profile.id'))
     user = relationship('UserProfile', foreign_keys=[user_profile_id], back_populates='emp_skill_user')
     skill_type = Column(String, nullable=False)
     is_evaluated = Column(Boolean, default=False)
     rate_by_self = Column(Integer)
-    emp_manager_id = Column(String, ForeignKey('user_profile.id'))
+    emp_manager_id = Column(GUID, ForeignKey('user_profile.id'))
     emp_manager = relationship('UserProfile', foreign_keys=[emp_manager_id], back_populates='emp_skill_mng')
     certificate = Column(String)
     skill_category = Column(String)
-    skill_id = Column(String, ForeignKey('skill.id'))
+    skill_id = Column(GUID, ForeignKey('skill.id'))
     emp_skill = relationship('Skill', foreign_keys=[skill_id], back_populates='emp')
     evaluate = relationship('SkillEvaluator', back_populates="employee_skill")
 
 
 class SkillEvaluator(BaseAbs):
     __tablename__ = "skill_evaluator"
+    __table_args__ = (
+        Index('ix_skill_evaluator_evaluator_id', 'evaluator_id'),
+        Index('ix_skill_evaluator_employee_id_rating', 'employee_id', 'evaluator_rating'),
+    )
 
-    employee_id = Column(String, ForeignKey('emp_skill.id'), unique=True)
+    employee_id = Column(GUID, ForeignKey('emp_skill.id'), unique=True)
     employee_skill = relationship('EmpSkill', back_populates='evaluate')
-    evaluator_id = Column(String, ForeignKey('user_profile.id'))
+    evaluator_id = Column(GUID, ForeignKey('user_profile.id'))
     evaluator = relationship('UserProfile', back_populates='skill_evaluator')
     evaluator_comment = Column(String)
     evaluator_rating = Column(Integer)
@@ -138,6 +361,7 @@ class SkillEvaluator(BaseAbs):
 
 class Designation(BaseAbs):
     __tablename__ = "designation"
+    __table_args__ = (Index('ix_designation_created_at_id', 'created_at', 'id'),)
 
     user = relationship('UserProfile', back_populates='designation')
     desg_name = Column(String, nullable=False)
@@ -145,6 +369,7 @@ class Designation(BaseAbs):
 
 class Competency(BaseAbs):
     __tablename__ = "competency"
+    __table_args__ = (Index('ix_competency_created_at_id', 'created_at', 'id'),)
 
     user_profile = relationship('UserProfile', back_populates='competency')
     comp_name = Column(String, nullable=False)
@@ -0,0 +1,103 @@
+from sqlalchemy import select, func, distinct, text
+from sqlalchemy.orm import joinedload, subqueryload
+
+from .models import User, UserProfile, UserProfileClosure, EmpSkill, Skill, SkillEvaluator
+
+
+# Recomputes the closure from manager_id, for loads that bypass the ORM events.
+REBUILD_CLOSURE_SQL = """
+INSERT INTO user_profile_closure (ancestor_id, descendant_id, depth)
+WITH RECURSIVE tree (ancestor_id, descendant_id, depth) AS (
+    SELECT id, id, 0 FROM user_profile
+    UNION ALL
+    SELECT tree.ancestor_id, user_profile.id, tree.depth + 1
+    FROM tree JOIN user_profile ON user_profile.manager_id = tree.descendant_id
+)
+SELECT ancestor_id, descendant_id, depth FROM tree
+"""
+
+
+def rebuild_closure(connection):
+    '''
+    Rebuild user_profile_closure from scratch in the caller's transaction.
+    '''
+    connection.execute(text("DELETE FROM user_profile_closure"))
+    connection.execute(text(REBUILD_CLOSURE_SQL))
+
+
+def subtree_query(profile_id, max_depth=None, skip=0, limit=1000):
+    '''
+    Reports under `profile_id` with their depth, optionally limited to `max_depth` levels.
+    '''
+    closure = UserProfileClosure
+    query = (
+        select(closure.descendant_id, closure.depth, UserProfile.manager_id,
+               User.full_name, User.email_address)
+        .join(UserProfile, UserProfile.id==closure.descendant_id)
+        .outerjoin(User, User.user_profile_id==closure.descendant_id)
+        .where(closure.ancestor_id==profile_id, closure.depth > 0)
+        .order_by(closure.depth, closure.descendant_id)
+        .offset(skip)
+        .limit(limit)
+    )
+    if max_depth is not None:
+        query = query.where(closure.depth <= max_depth)
+    return query
+
+
+def subtree_skill_rollup_query(profile_id, include_self=False):
+    '''
+    Per skill headcount and ratings across the whole subtree, in one grouped query.
+    '''
+    closure = UserProfileClosure
+    query = (
+        select(
+            Skill.id,
+            Skill.skill_name,
+            func.count(distinct(EmpSkill.user_profile_id)).label("employees"),
+            func.avg(EmpSkill.rate_by_self).label("avg_self_rating"),
+            func.max(EmpSkill.rate_by_self).label("max_self_rating"),
+            func.avg(SkillEvaluator.evaluator_rating).label("avg_evaluator_rating"),
+        )
+        .select_from(closure)
+        .join(EmpSkill, EmpSkill.user_profile_id==closure.descendant_id)
+        .join(Skill, Skill.id==EmpSkill.skill_id)
+        .outerjoin(SkillEvaluator, SkillEvaluator.employee_id==EmpSkill.id)
+        .where(closure.ancestor_id==profile_id)
+        .group_by(Skill.id, Skill.skill_name)
+        .order_by(Skill.skill_name)
+    )
+    if not include_self:
+        query = query.where(closure.depth > 0)
+    return query
+
+
+# Loader plan for a profile and everything hanging off it. To-one relations
+# are joined into the profile query; each collection is one more query,
+# whatever the number of profiles (selectinload would split the keys into
+# chunks of 500).
+PROFILE_GRAPH_OPTIONS = (
+    joinedload(UserProfile.user),
+    joinedload(UserProfile.team).joinedload(UserProfile.user),
+    joinedload(UserProfile.designation),
+    joinedload(UserProfile.competency),
+    subqueryload(UserProfile.roles),
+    subqueryload(UserProfile.projects),
+    subqueryload(UserProfile.emp_skill_user).options(
+        joinedload(EmpSkill.emp_skill),
+        joinedload(EmpSkill.evaluate),
+    ),
+    subqueryload(UserProfile.skill_evaluator),
+)
+
+
+def profile_graph_query(profile_ids):
+    '''
+    Profiles with their user, manager, designation, competency, roles, projects,
+    skills and the evaluations they gave, in a fixed number of queries.
+    '''
+    return (
+        select(UserProfile)
+        .where(UserProfile.id.in_(profile_ids))
+        .options(*PROFILE_GRAPH_OPTIONS)
+    )
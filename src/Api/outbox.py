@@ -0,0 +1,303 @@
+import asyncio
+import logging
+import os
+import datetime
+from email.message import EmailMessage
+
+import aiosmtplib
+from fastapi import HTTPException
+from pydantic import SecretStr
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+from sqlalchemy import select, update, delete, func, or_
+
+from .config import (conf, EMAIL_OUTBOX_MAX_SIZE, EMAIL_OUTBOX_CONNECTIONS,
+                     EMAIL_OUTBOX_BATCH_SIZE, EMAIL_OUTBOX_MAX_RETRIES,
+                     EMAIL_OUTBOX_RETRY_BACKOFF_IN_SECONDS,
+                     EMAIL_OUTBOX_IDLE_TIMEOUT_IN_SECONDS,
+                     EMAIL_OUTBOX_POLL_INTERVAL_IN_SECONDS, EMAIL_OUTBOX_LEASE_IN_SECONDS)
+from .database import AsyncSessionLocal
+from .models import OutboxEmail, uuid7
+
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(__file__), "templates")
+
+# Templates are compiled once at import and reused for every message.
+template_env = Environment(
+    loader=FileSystemLoader(TEMPLATE_DIR),
+    autoescape=select_autoescape(["html"]),
+    auto_reload=False,
+)
+VERIFICATION_TEMPLATE = template_env.get_template("verification_email.html")
+
+
+def utcnow():
+    return datetime.datetime.now(tz=datetime.timezone.utc)
+
+
+class EmailOutbox:
+    """
+    Outbox table (email_outbox) drained by background workers.
+
+    `enqueue` commits the message to the table, so it survives restarts and
+    can be sent by any process. Each worker owns one persistent SMTP
+    connection (so the pool size is the number of workers), claims up to
+    `batch_size` due rows for `lease` seconds, sends them over that
+    connection and deletes them. A worker that dies mid-batch leaves its
+    rows to be claimed again when the lease runs out, so delivery is at
+    least once. Failed messages are retried with exponential backoff until
+    `max_retries` is reached, then kept with failed_at set.
+
+    Workers wake up on `enqueue` in this process and poll every
+    `poll_interval` seconds for everything else (retries, other processes).
+    """
+    def __init__(self, settings, session_factory=AsyncSessionLocal, max_size=EMAIL_OUTBOX_MAX_SIZE,
+                 connections=EMAIL_OUTBOX_CONNECTIONS, batch_size=EMAIL_OUTBOX_BATCH_SIZE,
+                 max_retries=EMAIL_OUTBOX_MAX_RETRIES,
+                 backoff=EMAIL_OUTBOX_RETRY_BACKOFF_IN_SECONDS,
+                 idle_timeout=EMAIL_OUTBOX_IDLE_TIMEOUT_IN_SECONDS,
+                 poll_interval=EMAIL_OUTBOX_POLL_INTERVAL_IN_SECONDS,
+                 lease=EMAIL_OUTBOX_LEASE_IN_SECONDS) -> None:
+        '''
+        Init method.
+        '''
+        self.settings = settings
+        self.session_factory = session_factory
+        self.max_size = max_size
+        self.connections = connections
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.idle_timeout = idle_timeout
+        self.poll_interval = poll_interval
+        self.lease = lease
+        self._workers = []
+        self._wakeup = None
+        self._stopping = False
+        # Last counts read by a worker, enqueue adds its own messages to `queued`.
+        self.queued = 0
+        self.waiting_retry = 0
+        self.sent = 0
+        self.retried = 0
+        self.failed = 0
+        self.rejected = 0
+
+    def start(self):
+        """
+        Start the workers, must be called from the running event loop.
+        Workers that died are replaced.
+        """
+        if not self._workers:
+            self._wakeup = asyncio.Event()
+            self._stopping = False
+        alive = [worker for worker in self._workers if not worker.done()]
+        if self._workers and len(alive) < len(self._workers):
+            logger.warning("Restarting %s stopped email outbox workers.", len(self._workers) - len(alive))
+        self._workers = alive + [
+            asyncio.create_task(self._worker()) for _ in range(self.connections - len(alive))
+        ]
+
+    async def stop(self, timeout=10):
+        """
+        Let the workers finish their batch (bounded by `timeout`) and stop them.
+        Unsent messages stay in the table for the next start.
+        """
+        if not self._workers:
+            return
+        self._stopping = True
+        self._wakeup.set()
+        _, running = await asyncio.wait(self._workers, timeout=timeout)
+        if running:
+            logger.warning("Email outbox stopped with %s workers mid-batch.", len(running))
+        for task in running:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def enqueue(self, recipient, subject, html):
+        """
+        Store an html message for delivery and return once it is committed.
+        """
+        self.start()
+        # Backpressure on the last count seen, not a query per message.
+        if self.queued + self.waiting_retry >= self.max_size:
+            self.rejected += 1
+            raise HTTPException(status_code=503, detail="Email service busy, please retry.")
+        async with self.session_factory() as db:
+            db.add(OutboxEmail(recipient=recipient, subject=subject, html=html,
+                               available_at=utcnow()))
+            await db.commit()
+        self.queued += 1
+        self._wakeup.set()
+
+    def message(self, row):
+        message = EmailMessage()
+        message["From"] = self.settings.MAIL_FROM
+        message["To"] = row.recipient
+        message["Subject"] = row.subject
+        message.set_content(row.html, subtype="html")
+        return message
+
+    async def pending(self):
+        """
+        Number of messages not sent and not given up on.
+        """
+        async with self.session_factory() as db:
+            return await db.scalar(
+                select(func.count()).select_from(OutboxEmail).where(OutboxEmail.failed_at.is_(None))
+            )
+
+    async def _claim(self):
+        """
+        Claim up to batch_size due rows for this worker, returns them.
+        """
+        now = utcnow()
+        token = uuid7()
+        table = OutboxEmail
+        unclaimed = or_(table.claimed_until.is_(None), table.claimed_until < now)
+        async with self.session_factory() as db:
+            self.queued, self.waiting_retry = (await db.execute(
+                select(func.count(), func.count().filter(table.available_at > now))
+                .where(table.failed_at.is_(None))
+            )).one()
+            self.queued -= self.waiting_retry
+            ids = (await db.execute(
+                select(table.id)
+                .where(table.failed_at.is_(None), table.available_at <= now, unclaimed)
+                .order_by(table.available_at)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+            )).scalars().all()
+            if not ids:
+                return []
+            # Checked again, without SKIP LOCKED (SQLite) two workers may pick the same ids.
+            await db.execute(
+                update(table).where(table.id.in_(ids), unclaimed)
+                .values(claimed_by=token, claimed_until=now + datetime.timedelta(seconds=self.lease))
+            )
+            await db.commit()
+            return (await db.execute(
+                select(table.id, table.recipient, table.subject, table.html, table.attempts)
+                .where(table.claimed_by==token)
+            )).all()
+
+    async def _finish(self, sent_ids, failures):
+        """
+        Delete the sent rows, release the failed ones for a retry or give up on them.
+        """
+        now = utcnow()
+        async with self.session_factory() as db:
+            if sent_ids:
+                await db.execute(delete(OutboxEmail).where(OutboxEmail.id.in_(sent_ids)))
+            for row, error in failures:
+                attempts = row.attempts + 1
+                values = {"attempts": attempts, "claimed_by": None, "claimed_until": None,
+                          "last_error": str(error)[:500]}
+                if attempts > self.max_retries:
+                    self.failed += 1
+                    logger.error("Giving up on email to %s after %s attempts.", row.recipient, attempts)
+                    values["failed_at"] = now
+                else:
+                    self.retried += 1
+                    values["available_at"] = now + datetime.timedelta(
+                        seconds=self.backoff * 2 ** row.attempts
+                    )
+                await db.execute(update(OutboxEmail).where(OutboxEmail.id==row.id).values(values))
+            await db.commit()
+
+    async def _wait(self):
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+        except asyncio.TimeoutError:
+            pass
+        if not self._stopping:
+            self._wakeup.clear()
+
+    async def _connect(self):
+        settings = self.settings
+        smtp = aiosmtplib.SMTP(
+            hostname=settings.MAIL_SERVER,
+            timeout=settings.TIMEOUT,
+            port=settings.MAIL_PORT,
+            use_tls=settings.MAIL_SSL_TLS,
+            start_tls=settings.MAIL_STARTTLS,
+            validate_certs=settings.VALIDATE_CERTS,
+        )
+        await smtp.connect()
+        if settings.USE_CREDENTIALS:
+            password = settings.MAIL_PASSWORD
+            if isinstance(password, SecretStr):
+                password = password.get_secret_value()
+            await smtp.login(settings.MAIL_USERNAME, password)
+        return smtp
+
+    async def _close(self, smtp):
+        if smtp is not None and smtp.is_connected:
+            try:
+                await smtp.quit()
+            except aiosmtplib.SMTPException:
+                smtp.close()
+
+    async def _worker(self):
+        loop = asyncio.get_running_loop()
+        smtp = None
+        last_sent = loop.time()
+        try:
+            while not self._stopping:
+                try:
+                    batch = await self._claim()
+                except Exception:
+                    logger.exception("Email outbox worker failed to claim messages.")
+                    batch = []
+                if not batch:
+                    if smtp is not None and loop.time() - last_sent > self.idle_timeout:
+                        await self._close(smtp)
+                        smtp = None
+                    await self._wait()
+                    continue
+                try:
+                    smtp = await self._send_batch(smtp, batch)
+                except Exception:
+                    logger.exception("Email outbox worker failed on a batch.")
+                    await self._close(smtp)
+                    smtp = None
+                last_sent = loop.time()
+        finally:
+            await self._close(smtp)
+
+    async def _send_batch(self, smtp, batch):
+        sent_ids, failures = [], []
+        for row in batch:
+            try:
+                if not self.settings.SUPPRESS_SEND:
+                    if smtp is None or not smtp.is_connected:
+                        smtp = await self._connect()
+                    await smtp.send_message(self.message(row))
+                self.sent += 1
+                sent_ids.append(row.id)
+            except Exception as error:
+                if isinstance(error, (aiosmtplib.SMTPException, OSError)):
+                    logger.warning("Email to %s failed: %s", row.recipient, error)
+                else:
+                    logger.exception("Email to %s failed.", row.recipient)
+                failures.append((row, error))
+                # Don't reuse a connection that may be in a bad state.
+                if smtp is not None:
+                    smtp.close()
+                smtp = None
+        await self._finish(sent_ids, failures)
+        return smtp
+
+    def stats(self):
+        return {
+            "queued": self.queued,
+            "waiting_retry": self.waiting_retry,
+            "sent": self.sent,
+            "retried": self.retried,
+            "failed": self.failed,
+            "rejected": self.rejected,
+        }
+
+
+email_outbox = EmailOutbox(conf)
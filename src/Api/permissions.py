@@ -0,0 +1,143 @@
+import time
+import logging
+import threading
+from collections import defaultdict
+
+from fastapi import HTTPException, Depends
+from sqlalchemy.orm import Session
+
+from .cache import LRUCache
+from .config import RBAC_SUPERUSER_ROLE, RBAC_CACHE_MAX_SIZE, RBAC_CACHE_TTL_IN_SECONDS
+from .helper import get_db, verify_user
+from .models import Permission, Role, RolePermission, UserRole
+
+
+logger = logging.getLogger(__name__)
+
+ALL_PERMISSIONS = -1
+
+
+class CompiledPermissions:
+    """
+    Snapshot of the role/permission tables.
+
+    Every distinct (name, operation) gets a bit index and every role is
+    reduced to an int bitset of its permissions, so checking a permission
+    is a shift and a mask.
+    """
+    def __init__(self, bits, role_masks, superuser_roles, generation) -> None:
+        '''
+        Init method.
+        '''
+        self.bits = bits
+        self.role_masks = role_masks
+        self.superuser_roles = superuser_roles
+        self.generation = generation
+        self.compiled_at = time.monotonic()
+
+
+class PermissionEngine:
+    """
+    Resolves a user's effective permissions from the precompiled role bitsets.
+
+    The compiled snapshot and the per-user masks are rebuilt after
+    `invalidate` (called on role/permission writes) or after `ttl` seconds,
+    which bounds staleness for changes made by other workers.
+    """
+    def __init__(self, max_size=RBAC_CACHE_MAX_SIZE, ttl=RBAC_CACHE_TTL_IN_SECONDS) -> None:
+        '''
+        Init method.
+        '''
+        self.ttl = ttl
+        self.user_masks = LRUCache(max_size, ttl)
+        self._lock = threading.Lock()
+        self._compiled = None
+        self._generation = 0
+
+    def compile(self, db: Session, generation=0):
+        """
+        Build a CompiledPermissions snapshot from the database.
+        """
+        bits = {}
+        permission_bits = {}
+        permissions = db.query(Permission.id, Permission.name, Permission.operation).order_by(
+            Permission.name, Permission.operation
+        ).all()
+        for permission in permissions:
+            bit = bits.setdefault((permission.name, permission.operation), len(bits))
+            permission_bits[permission.id] = bit
+        role_masks = defaultdict(int)
+        for role_id, permission_id in db.query(RolePermission.role_id, RolePermission.permission_id):
+            bit = permission_bits.get(permission_id)
+            if bit is None:
+                # Dangling row (the permission was deleted); it grants nothing.
+                logger.warning("Role %s references unknown permission %s", role_id, permission_id)
+                continue
+            role_masks[role_id] |= 1 << bit
+        superuser_roles = {
+            row.id for row in db.query(Role.id).filter(Role.role_name==RBAC_SUPERUSER_ROLE)
+        }
+        return CompiledPermissions(bits, dict(role_masks), superuser_roles, generation)
+
+    def compiled(self, db: Session):
+        """
+        Current snapshot, compiled on first use.
+        """
+        compiled = self._compiled
+        if compiled is None or time.monotonic() - compiled.compiled_at > self.ttl:
+            with self._lock:
+                compiled = self._compiled
+                if compiled is None or time.monotonic() - compiled.compiled_at > self.ttl:
+                    self._generation += 1
+                    compiled = self._compiled = self.compile(db, self._generation)
+        return compiled
+
+    def effective_permissions(self, db: Session, user_profile_id):
+        """
+        Bitset of everything the user may do, ALL_PERMISSIONS for superusers.
+        """
+        compiled = self.compiled(db)
+        # Masks are only valid for the snapshot they were computed from.
+        key = (compiled.generation, user_profile_id)
+        mask = self.user_masks.get(key)
+        if mask is None:
+            mask = 0
+            role_ids = db.query(UserRole.role_id).filter(UserRole.user_profile_id==user_profile_id)
+            for (role_id,) in role_ids:
+                if role_id in compiled.superuser_roles:
+                    mask = ALL_PERMISSIONS
+                    break
+                mask |= compiled.role_masks.get(role_id, 0)
+            self.user_masks.set(key, mask)
+        return compiled, mask
+
+    def has_permission(self, db: Session, user_profile_id, name, operation):
+        compiled, mask = self.effective_permissions(db, user_profile_id)
+        if mask == ALL_PERMISSIONS:
+            return True
+        bit = compiled.bits.get((name, operation))
+        return bit is not None and bool(mask >> bit & 1)
+
+    def invalidate(self):
+        """
+        Drop the snapshot and cached user masks after a role or permission change.
+        """
+        with self._lock:
+            self._compiled = None
+            self.user_masks.clear()
+
+
+permission_engine = PermissionEngine()
+
+
+def require_permission(name, operation):
+    '''
+    Dependency that only lets users holding the (name, operation) permission through.
+    '''
+    def check_permission(current_user: dict = Depends(verify_user), db: Session = Depends(get_db)):
+        user_profile_id = current_user["user_profile_id"]
+        if not user_profile_id or not permission_engine.has_permission(
+                db, user_profile_id, name, operation):
+            raise HTTPException(status_code=403, detail="Permission denied")
+        return current_user
+    return check_permission
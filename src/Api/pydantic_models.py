@@ -1,5 +1,9 @@
-from pydantic import BaseModel, EmailStr
-from typing import List
+from pydantic import BaseModel, EmailStr, Field
+from typing import List, Generic, TypeVar, Optional, Literal
+
+from .config import SKILL_SEARCH_MAX_LIMIT, EVALUATION_RATING_MIN, EVALUATION_RATING_MAX
+
+T = TypeVar("T")
 
 
 class PydanticUser(BaseModel):
@@ -12,6 +16,7 @@ class PydanticChangePassword(BaseModel):
     email:EmailStr
     password: str
     confirm_password: str
+    token: str
 
 
 
@@ -43,3 +48,38 @@ class PydanticRole(BaseModel):
 
 class PydanticForgotPassword(BaseModel):
     email_address: EmailStr
+
+class PydanticRefreshToken(BaseModel):
+    refresh_token: str
+
+class PydanticBulkUpdateItem(BaseModel, Generic[T]):
+    id: str
+    data: T
+
+class PydanticBulkDelete(BaseModel):
+    ids: List[str]
+
+
+# Skill Matrix Pydantic Models
+
+class PydanticSkillCriterion(BaseModel):
+    skill_id: str
+    min_self_rating: Optional[int] = None
+    min_evaluated_rating: Optional[int] = None
+
+class PydanticSkillSearch(BaseModel):
+    criteria: List[PydanticSkillCriterion]
+    match: Literal["all", "any"] = "all"
+    occupied: Optional[bool] = None
+    limit: int = Field(100, ge=1, le=SKILL_SEARCH_MAX_LIMIT)
+
+class PydanticEvaluation(BaseModel):
+    employee_id: str
+    evaluator_rating: int = Field(ge=EVALUATION_RATING_MIN, le=EVALUATION_RATING_MAX)
+    evaluator_comment: Optional[str] = None
+
+class PydanticEvaluationBatch(BaseModel):
+    evaluations: List[PydanticEvaluation]
+
+class PydanticProfileIds(BaseModel):
+    ids: List[str]
@@ -0,0 +1,189 @@
+'''
+Routing of read-only requests to read replicas.
+
+Read-only handlers take their session from get_read_db (helper.py) instead of get_db. Those hand out a session on one of the
+healthy replicas in READ_REPLICA_URLS, round robin, and a primary session
+when there is none. A background task probes every replica; one that
+fails the probe, lags more than REPLICA_MAX_LAG_IN_SECONDS or loses its
+connection mid request is skipped until a later probe passes.
+
+A client whose session commits is pinned to the primary for
+READ_YOUR_WRITES_WINDOW_IN_SECONDS, keyed by its Authorization header, so
+it reads its own writes even when the replicas are behind.
+'''
+import time
+import asyncio
+import logging
+import itertools
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import Session
+
+from .cache import LRUCache
+from .config import (READ_REPLICA_URLS, REPLICA_HEALTH_CHECK_INTERVAL_IN_SECONDS,
+                     REPLICA_CONNECT_TIMEOUT_IN_SECONDS, REPLICA_MAX_LAG_IN_SECONDS,
+                     READ_YOUR_WRITES_WINDOW_IN_SECONDS, READ_YOUR_WRITES_MAX_SIZE)
+from .database import SessionLocal
+
+
+logger = logging.getLogger(__name__)
+
+# Seconds of WAL replay a standby is behind; 0 when it has replayed all it
+# received, so an idle primary doesn't make the replica look stale.
+LAG_QUERY = text(
+    "SELECT CASE WHEN NOT pg_is_in_recovery() "
+    "OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+
+class Replica:
+    """
+    One read replica with its engine and its last known health.
+    """
+    def __init__(self, name, url) -> None:
+        '''
+        Init method.
+        '''
+        self.name = name
+        if url.startswith("sqlite"):
+            connect_args = {"check_same_thread": False}
+        else:
+            connect_args = {"connect_timeout": REPLICA_CONNECT_TIMEOUT_IN_SECONDS}
+        self.engine = create_engine(url, connect_args=connect_args)
+        self.healthy = False
+        self.lag = None
+        self.checked_at = None
+        self.outages = 0
+        event.listen(self.engine, "handle_error", self.on_error)
+
+    def on_error(self, context):
+        # Lost or refused connections take the replica out of rotation at
+        # once instead of failing requests until the next probe.
+        if context.is_disconnect or context.connection is None:
+            self.take_out("is down: %s", context.original_exception)
+
+    def take_out(self, reason, *args):
+        if self.healthy:
+            logger.warning("Read replica %s " + reason, self.name, *args)
+            self.outages += 1
+        self.healthy = False
+
+    def check(self):
+        '''
+        Probe the replica and update its health.
+        '''
+        try:
+            with self.engine.connect() as connection:
+                if connection.dialect.name == "postgresql":
+                    lag = float(connection.execute(LAG_QUERY).scalar())
+                else:
+                    connection.execute(text("SELECT 1"))
+                    lag = 0.0
+        except Exception as e:
+            self.take_out("is down: %s", e)
+            return
+        finally:
+            self.checked_at = time.time()
+        self.lag = lag
+        if lag > REPLICA_MAX_LAG_IN_SECONDS:
+            self.take_out("lags %.1fs, reading from elsewhere.", lag)
+        elif not self.healthy:
+            logger.info("Read replica %s is in rotation.", self.name)
+            self.healthy = True
+
+    def stats(self):
+        return {
+            "name": self.name,
+            "healthy": self.healthy,
+            "lag_seconds": self.lag,
+            "checked_at": self.checked_at,
+            "outages": self.outages,
+        }
+
+
+class ReplicaRouter:
+    """
+    Picks the engine a read-only session is bound to.
+    """
+    def __init__(self, urls, interval=REPLICA_HEALTH_CHECK_INTERVAL_IN_SECONDS) -> None:
+        '''
+        Init method.
+
+        Replicas start out of rotation until the first probe, which `start`
+        runs on startup.
+        '''
+        self.replicas = [Replica(f"replica-{index}", url) for index, url in enumerate(urls)]
+        self.interval = interval
+        self.recent_writers = LRUCache(READ_YOUR_WRITES_MAX_SIZE, READ_YOUR_WRITES_WINDOW_IN_SECONDS)
+        self._turn = itertools.count()
+        self._task = None
+
+    def mark_write(self, key):
+        '''
+        Pin the client identified by `key` to the primary for a while.
+        '''
+        if key and self.replicas:
+            self.recent_writers.set(key, True)
+
+    def choose(self, key=None):
+        '''
+        A healthy replica for the client identified by `key`, None for the primary.
+        '''
+        if not self.replicas or (key and self.recent_writers.get(key) is not None):
+            return None
+        healthy = [replica for replica in self.replicas if replica.healthy]
+        if not healthy:
+            return None
+        return healthy[next(self._turn) % len(healthy)]
+
+    def check(self):
+        for replica in self.replicas:
+            replica.check()
+
+    async def _run(self):
+        while True:
+            # Probes block on connect, keep them off the event loop.
+            await asyncio.to_thread(self.check)
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        """
+        Start the health checks, must be called from the running event loop.
+        """
+        if self.replicas and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    def stats(self):
+        return [replica.stats() for replica in self.replicas]
+
+
+replica_router = ReplicaRouter(READ_REPLICA_URLS)
+
+
+def pin_writer(session):
+    replica_router.mark_write(session.info.get("writer"))
+
+
+# On the Session base class: SessionLocal's sessions and the ones
+# AsyncSession wraps are instances of different subclasses of it.
+event.listen(Session, "after_commit", pin_writer)
+
+
+def read_session(key=None):
+    '''
+    Session for a read-only request of the client identified by `key`.
+    '''
+    replica = replica_router.choose(key)
+    if replica is None:
+        return SessionLocal()
+    db = SessionLocal(bind=replica.engine)
+    db.info["replica"] = replica.name
+    return db
@@ -1,12 +1,22 @@
+import time
 import asyncio
+from typing import Optional, List
+from sqlalchemy import tuple_, inspect, insert
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
-from fastapi.responses import JSONResponse
-from fastapi import APIRouter, status, Request, Depends
+from fastapi.responses import JSONResponse, ORJSONResponse, Response
+from fastapi import APIRouter, status, Request, Depends, Header
 
 from ..pydantic_models import *
-from ..helper import get_db, verify_user
+from ..helper import (get_db, get_read_db, verify_user, encode_cursor, decode_cursor,
+                      make_etag, etag_matches, auth_cache)
+from ..hashing import password_hash_pool
+from ..cache import LRUCache
+from ..permissions import permission_engine, require_permission
+from ..config import CACHE_MAX_SIZE, CACHE_TTL_IN_SECONDS, REPLICA_MAX_LAG_IN_SECONDS
 from src.Api.models import (Competency, Designation, Project,
-                             Skill, Permission, Role)
+                             Skill, Permission, Role, TableVersion, bump_table_version,
+                             uuid7, canonical_id, InvalidIdentifier)
 
 
 router = APIRouter(
@@ -16,16 +26,40 @@ router = APIRouter(
     # responses={404: {"description": "Not found"}},
 )
 
+def _error_message(error):
+    '''
+    The database's (or the bind processor's) message for a failed statement.
+    '''
+    return str(getattr(error, "orig", None) or error).strip()
+
+
 class GenericCrudView:
     """
     Generic Class to get the CRUD operation.
     """
-    def __init__(self, model, response_model) -> None:
+    def __init__(self, model, response_model, cache=None, on_write=None) -> None:
         '''
         Init method.
+
+        `cache` is an optional CacheBackend serving `get` and `list_data`,
+        it is cleared by every write made through this view. `on_write` is an
+        optional callback run after each of those writes.
         '''
         self.model = model
+        self.cache = cache
+        self.on_write = on_write
+        self.invalidated_at = 0.0
         self.keys = response_model.__annotations__
+        self.columns = {column.key for column in model.__table__.columns}
+        # Reads select only the response model's columns plus id, as plain
+        # rows instead of ORM entities.
+        self.fields = ("id", *(key for key in self.keys if key in self.columns))
+        self.read_columns = [getattr(model, key) for key in self.fields]
+        # Many-to-many relationships (e.g. Role.permissions) are written to
+        # their association table by the bulk methods.
+        self.secondaries = {
+            rel.key: rel for rel in inspect(model).relationships if rel.secondary is not None
+        }
     
     def get_object(self, db:Session, id):
         """
@@ -34,39 +68,96 @@ class GenericCrudView:
         db_obj = db.query(self.model).filter(self.model.id==id).first()
         return db_obj
 
+    def get_row(self, db: Session, id):
+        """
+        Get the projected columns of one object as a dict.
+        """
+        row = db.query(*self.read_columns).filter(self.model.id==id).first()
+        return dict(zip(self.fields, row)) if row else None
+
     def extract_key_value(self, obj):
-        data = {}
-        attributes = dict(obj.__dict__.items())
-        for key in self.keys:
-            data[key] = attributes[key]
-            data['id'] = attributes['id']
-        return data
+        return {key: getattr(obj, key) for key in self.fields}
     
-    def get(self, db: Session, id):
+    def invalidate(self):
+        """
+        Drop every cached read of this view after a write.
+        """
+        self.invalidated_at = time.monotonic()
+        if self.cache is not None:
+            self.cache.clear()
+        if self.on_write is not None:
+            self.on_write()
+
+    def cacheable(self, db: Session):
+        """
+        Whether a read made on `db` may fill the cache.
+
+        A replica may not have replayed the last write yet, so its reads are
+        only cached once the replicas' allowed lag has passed since then.
+        """
+        if self.cache is None:
+            return False
+        return ("replica" not in db.info
+                or time.monotonic() - self.invalidated_at > REPLICA_MAX_LAG_IN_SECONDS)
+
+    def table_version(self, db: Session):
+        """
+        Version of the whole table, bumped by every insert, update and delete.
+        """
+        version = db.query(TableVersion.version).filter(
+            TableVersion.table_name==self.model.__tablename__
+        ).scalar()
+        return version or 0
+
+    def touch(self, db: Session):
+        """
+        Bump the table version within the write's transaction.
+        """
+        bump_table_version(db.connection(), self.model.__tablename__)
+
+    def not_modified(self, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    def get(self, db: Session, id, if_none_match: str = None):
         """
         Get method to retrive a single object.
+
+        Answers 304 when `if_none_match` holds the current ETag, which is
+        checked against the cache or the table version before the row is loaded.
         """
-        db_obj = self.get_object(db, id)
-        data = self.extract_key_value(db_obj)
-        if db_obj:
+        key = ("get", id)
+        cached = self.cache.get(key) if self.cache is not None else None
+        if cached is not None:
+            etag, data = cached
+        else:
+            # Only ever sent for a row that existed at this version, so a
+            # match means it is unchanged.
+            etag = make_etag(self.model.__tablename__, "get", id, self.table_version(db))
+            if etag_matches(if_none_match, etag):
+                return self.not_modified(etag)
+            data = self.get_row(db, id)
+            if data and self.cacheable(db):
+                self.cache.set(key, (etag, data))
+        if data:
+            if etag_matches(if_none_match, etag):
+                return self.not_modified(etag)
             data_dict = {
             "message": f"{self.model.__tablename__} Retrived Successful.",
             "data": {
                 **data
                 }
             }
-            return JSONResponse(
+            return ORJSONResponse(
                 status_code=200,
-                content= data_dict
+                content= data_dict,
+                headers={"ETag": etag}
             )
         else:
             data_dict = {
             "message": f"Failed to get {self.model.__tablename__} .",
-            "data": {
-                **db_obj.__dict__
-                }
+            "data": {}
             }
-            return JSONResponse(
+            return ORJSONResponse(
                 status_code=400,
                 content= data_dict
             )
@@ -78,8 +169,10 @@ class GenericCrudView:
         try:
             db_obj = self.model(**data_dict)
             db.add(db_obj)
+            self.touch(db)
             db.commit()
             db.close()
+            self.invalidate()
         except:
             db_obj =  None
         if db_obj:
@@ -87,7 +180,7 @@ class GenericCrudView:
             "message": f"{self.model.__tablename__} Created Successfully.",
             "data": data_dict
             }
-            return JSONResponse(
+            return ORJSONResponse(
                     status_code=200,
                     content= data_dict
                     )
@@ -96,38 +189,79 @@ class GenericCrudView:
             "message": f"Failed to create {self.model.__tablename__} .",
             "data": data_dict
             }
-            return JSONResponse(
+            return ORJSONResponse(
                 status_code=400,
                 content= data_dict
             )
 
-    def list_data(self, db: Session, skip: int = 0, limit: int = 10):
+    def fetch_page(self, db: Session, skip, limit, cursor):
         """
-        Get the list of objects.
+        Query one page, returns (data_list, next_cursor).
         """
-        db_obj_list = db.query(self.model).offset(skip).limit(limit).all()
-        data_list = []
-        for obj in db_obj_list:
-            data = self.extract_key_value(obj)
-            data_list.append(data)
-        if data_list:
-            data_dict = {
-            "message": f"{self.model.__tablename__} list retrived Successfully.",
-            "data": [*data_list]
-            }
-            return JSONResponse(
-                status_code=200,
-                content= data_dict
-            )
-        else:
-            data_dict = {
-            "message": f"Failed to retirive {self.model.__tablename__} list.",
-            "data": {}
-            }
-            return JSONResponse(
-                status_code=400,
-                content= data_dict
-            )
+        query = db.query(*self.read_columns, self.model.created_at).order_by(
+            self.model.created_at, self.model.id
+        )
+        if cursor:
+            position = decode_cursor(cursor)
+            query = query.filter(tuple_(self.model.created_at, self.model.id) > position)
+        elif skip:
+            query = query.offset(skip)
+        # One extra row tells whether there is a next page, so the last
+        # page never hands out a cursor to an empty one.
+        rows = query.limit(limit + 1).all()
+        next_cursor = None
+        if 0 < limit < len(rows):
+            rows = rows[:limit]
+            last = rows[-1]
+            next_cursor = encode_cursor(last.created_at, last.id)
+        # zip stops at the last field, leaving the trailing created_at out.
+        data_list = [dict(zip(self.fields, row)) for row in rows]
+        return data_list, next_cursor
+
+    def list_data(self, db: Session, skip: int = 0, limit: int = 10, cursor: str = None,
+                  if_none_match: str = None):
+        """
+        Get the list of objects ordered by (created_at, id).
+
+        Pages are fetched by keyset from `cursor` (the `next_cursor` of the
+        previous page); `skip` is only used as a legacy offset when no cursor
+        is given. The ETag is derived from the table version, so a 304 costs
+        one primary key lookup (or nothing on a cache hit).
+        """
+        key = ("list", skip, limit, cursor)
+        page = self.cache.get(key) if self.cache is not None else None
+        if page is None:
+            etag = make_etag(self.model.__tablename__, "list", skip, limit, cursor,
+                             self.table_version(db))
+            if etag_matches(if_none_match, etag):
+                return self.not_modified(etag)
+            try:
+                page = (etag, *self.fetch_page(db, skip, limit, cursor))
+            except ValueError:
+                data_dict = {
+                "message": "Invalid cursor.",
+                "data": {}
+                }
+                return ORJSONResponse(
+                    status_code=400,
+                    content= data_dict
+                )
+            if self.cacheable(db):
+                self.cache.set(key, page)
+        etag, data_list, next_cursor = page
+        if etag_matches(if_none_match, etag):
+            return self.not_modified(etag)
+        # An empty page (past the end, or an empty table) is still a valid page.
+        data_dict = {
+        "message": f"{self.model.__tablename__} list retrived Successfully.",
+        "data": [*data_list],
+        "next_cursor": next_cursor
+        }
+        return ORJSONResponse(
+            status_code=200,
+            content= data_dict,
+            headers={"ETag": etag}
+        )
 
     def update(self, db: Session, id, data_dict: dict):
         """
@@ -138,7 +272,9 @@ class GenericCrudView:
             try:
                 for key, value in data_dict.items():
                     setattr(db_obj, key, value)
+                self.touch(db)
                 db.commit()
+                self.invalidate()
                 # db.refresh(db_obj)
             except:
                 db.rollback()
@@ -146,7 +282,7 @@ class GenericCrudView:
                     "message": f"Failed to Update {self.model.__tablename__} .",
                     "data": {}
                     }
-                return JSONResponse(
+                return ORJSONResponse(
                     status_code=400,
                     content= data_dict
                 )
@@ -157,7 +293,7 @@ class GenericCrudView:
                 **data
                 }
             }
-            return JSONResponse(
+            return ORJSONResponse(
                 status_code=200,
                 content= data_dict
             )
@@ -166,7 +302,7 @@ class GenericCrudView:
             "message": f"Failed to retrive {self.model.__tablename__} .",
             "data": {}
             }
-            return JSONResponse(
+            return ORJSONResponse(
                 status_code=400,
                 content= data_dict
             )  
@@ -178,13 +314,15 @@ class GenericCrudView:
         db_obj = self.get_object(db, id)
         if db_obj:
             db.delete(db_obj)
+            self.touch(db)
             db.commit()
             db.close()
+            self.invalidate()
             data_dict = {
                     "message": f"{self.model.__tablename__} Deleted Successfully.",
                     "data": {}
                     }
-            return JSONResponse(
+            return ORJSONResponse(
                 status_code=200,
                 content= data_dict
             )
@@ -193,18 +331,222 @@ class GenericCrudView:
                     "message": f"Failed to Delete {self.model.__tablename__} .",
                     "data": {}
                     }
-            return JSONResponse(
+            return ORJSONResponse(
                 status_code=400,
                 content= data_dict
             )
 
+    def _association_columns(self, rel):
+        '''
+        (own id column, related id column) of a many-to-many association table.
+        '''
+        local_column = rel.synchronize_pairs[0][1]
+        remote_column = rel.secondary_synchronize_pairs[0][1]
+        return local_column, remote_column
+
+    def _association_rows(self, rel, id, remote_ids):
+        local_column, remote_column = self._association_columns(rel)
+        return [
+            {local_column.key: id, remote_column.key: remote_id} for remote_id in remote_ids
+        ]
+
+    def _existing_ids(self, db: Session, ids):
+        rows = db.query(self.model.id).filter(self.model.id.in_(ids)).all()
+        return {row.id for row in rows}
+
+    def _bulk_response(self, action, statuses, errors=None):
+        if errors is None:
+            data_dict = {
+            "message": f"{self.model.__tablename__} Bulk {action} Successful.",
+            "data": statuses
+            }
+            return ORJSONResponse(
+                status_code=200,
+                content= data_dict
+            )
+        data_dict = {
+        "message": f"Failed to bulk {action.lower()} {self.model.__tablename__}, nothing was saved.",
+        "data": errors
+        }
+        return ORJSONResponse(
+            status_code=400,
+            content= data_dict
+        )
+
+    def _item_errors(self, db: Session, items, write, error, ids=None):
+        """
+        After a failed bulk write, replay it one item at a time, each in a
+        savepoint that is rolled back, and return the items the database
+        rejects. Nothing is kept.
+        """
+        errors = []
+        for index, item in enumerate(items):
+            savepoint = db.begin_nested()
+            try:
+                write(item)
+            except SQLAlchemyError as e:
+                errors.append({"index": index, **({"id": ids[index]} if ids else {}),
+                               "error": _error_message(e)})
+            finally:
+                if savepoint.is_active:
+                    savepoint.rollback()
+        db.rollback()
+        # The items only fail together (e.g. duplicates within the batch).
+        return errors or [{"index": None, "error": _error_message(error)}]
+
+    def _link_errors(self, db: Session, data_list, ids=None):
+        """
+        Items linking (through a many-to-many list such as Role.permissions) to
+        ids that are malformed or don't exist. Checked up front because the
+        database doesn't always catch them: SQLite doesn't enforce foreign keys.
+        """
+        messages = {}
+        for key, rel in self.secondaries.items():
+            requested = {}
+            for index, data_dict in enumerate(data_list):
+                for remote_id in data_dict.get(key) or []:
+                    try:
+                        requested.setdefault(canonical_id(remote_id), []).append((index, remote_id))
+                    except InvalidIdentifier as e:
+                        messages.setdefault(index, []).append(str(e))
+            if not requested:
+                continue
+            remote = rel.mapper.class_
+            found = {row.id for row in db.query(remote.id).filter(remote.id.in_(requested))}
+            for remote_id in requested.keys() - found:
+                for index, given in requested[remote_id]:
+                    messages.setdefault(index, []).append(f"Unknown {key} id: {given!r}")
+        return [
+            {"index": index, **({"id": ids[index]} if ids else {}), "error": "; ".join(messages[index])}
+            for index in sorted(messages)
+        ]
+
+    def _create_rows(self, data_list):
+        rows = []
+        links = {key: [] for key in self.secondaries}
+        for data_dict in data_list:
+            row = {key: value for key, value in data_dict.items() if key in self.columns}
+            row["id"] = uuid7()
+            rows.append(row)
+            for key, rel in self.secondaries.items():
+                links[key] += self._association_rows(rel, row["id"], data_dict.get(key) or [])
+        return rows, links
+
+    def _insert(self, db: Session, rows, links):
+        if rows:
+            db.execute(insert(self.model.__table__), rows)
+        for key, rel in self.secondaries.items():
+            if links[key]:
+                db.execute(insert(rel.secondary), links[key])
+
+    def bulk_create(self, db: Session, data_list: List[dict]):
+        """
+        Create all objects with one multi-row INSERT in a single transaction.
+        """
+        errors = self._link_errors(db, data_list)
+        if errors:
+            return self._bulk_response("Create", None, errors=errors)
+        rows, links = self._create_rows(data_list)
+        try:
+            self._insert(db, rows, links)
+            self.touch(db)
+            db.commit()
+            self.invalidate()
+        except SQLAlchemyError as e:
+            db.rollback()
+            errors = self._item_errors(
+                db, data_list, lambda data_dict: self._insert(db, *self._create_rows([data_dict])), e
+            )
+            return self._bulk_response("Create", None, errors=errors)
+        statuses = [{"id": row["id"], "status": "created"} for row in rows]
+        return self._bulk_response("Create", statuses)
+
+    def _update(self, db: Session, items, existing):
+        mappings = [
+            {"id": id, **{key: value for key, value in data_dict.items() if key in self.columns}}
+            for id, data_dict in items if id in existing
+        ]
+        if mappings:
+            db.bulk_update_mappings(self.model, mappings)
+        for key, rel in self.secondaries.items():
+            replaced = [(id, data_dict[key]) for id, data_dict in items
+                        if id in existing and key in data_dict]
+            if not replaced:
+                continue
+            local_column, _ = self._association_columns(rel)
+            db.execute(rel.secondary.delete().where(
+                local_column.in_([id for id, _ in replaced])
+            ))
+            link_rows = []
+            for id, remote_ids in replaced:
+                link_rows += self._association_rows(rel, id, remote_ids or [])
+            if link_rows:
+                db.execute(insert(rel.secondary), link_rows)
+
+    def bulk_update(self, db: Session, items: List[tuple]):
+        """
+        Update `(id, data_dict)` items in a single transaction, missing ids are reported as not_found.
+        """
+        items = [(canonical_id(id), data_dict) for id, data_dict in items]
+        existing = self._existing_ids(db, [id for id, _ in items])
+        errors = self._link_errors(db, [data_dict if id in existing else {} for id, data_dict in items],
+                                   ids=[id for id, _ in items])
+        if errors:
+            return self._bulk_response("Update", None, errors=errors)
+        statuses = [
+            {"id": id, "status": "updated" if id in existing else "not_found"} for id, _ in items
+        ]
+        try:
+            self._update(db, items, existing)
+            self.touch(db)
+            db.commit()
+            self.invalidate()
+        except SQLAlchemyError as e:
+            db.rollback()
+            errors = self._item_errors(db, items, lambda item: self._update(db, [item], existing), e,
+                                       ids=[id for id, _ in items])
+            return self._bulk_response("Update", None, errors=errors)
+        return self._bulk_response("Update", statuses)
+
+    def _delete(self, db: Session, ids):
+        if not ids:
+            return
+        for rel in self.secondaries.values():
+            local_column, _ = self._association_columns(rel)
+            db.execute(rel.secondary.delete().where(local_column.in_(ids)))
+        db.query(self.model).filter(self.model.id.in_(ids)).delete(
+            synchronize_session=False
+        )
+
+    def bulk_delete(self, db: Session, ids: List[str]):
+        """
+        Delete all ids with one DELETE in a single transaction, missing ids are reported as not_found.
+        """
+        ids = [canonical_id(id) for id in ids]
+        existing = self._existing_ids(db, ids)
+        try:
+            self._delete(db, existing)
+            self.touch(db)
+            db.commit()
+            self.invalidate()
+        except SQLAlchemyError as e:
+            db.rollback()
+            errors = self._item_errors(
+                db, ids, lambda id: self._delete(db, [id] if id in existing else []), e, ids=ids
+            )
+            return self._bulk_response("Delete", None, errors=errors)
+        statuses = [
+            {"id": id, "status": "deleted" if id in existing else "not_found"} for id in ids
+        ]
+        return self._bulk_response("Delete", statuses)
+
 
 # Actual Admin views starts here
 
 #Product Crud
 project_crud = GenericCrudView(Project, response_model=PydanticProject)
 
-@router.post("/project/create")
+@router.post("/project/create", dependencies=[Depends(require_permission("project", "create"))])
 def create_project(request: PydanticProject, db: Session = Depends(get_db)):
     '''
     Create Project.
@@ -212,7 +554,32 @@ def create_project(request: PydanticProject, db: Session = Depends(get_db)):
     data = project_crud.create(db, request.model_dump())
     return data
 
-@router.put("/project/{id}")
+@router.post("/project/bulk", dependencies=[Depends(require_permission("project", "create"))])
+def bulk_create_project(request: List[PydanticProject], db: Session = Depends(get_db)):
+    '''
+    Bulk Create Project.
+    '''
+    data = project_crud.bulk_create(db, [item.model_dump() for item in request])
+    return data
+
+@router.put("/project/bulk", dependencies=[Depends(require_permission("project", "update"))])
+def bulk_update_project(request: List[PydanticBulkUpdateItem[PydanticProject]],
+                      db: Session = Depends(get_db)):
+    '''
+    Bulk Update Project.
+    '''
+    data = project_crud.bulk_update(db, [(item.id, item.data.model_dump()) for item in request])
+    return data
+
+@router.delete("/project/bulk", dependencies=[Depends(require_permission("project", "delete"))])
+def bulk_delete_project(request: PydanticBulkDelete, db: Session = Depends(get_db)):
+    '''
+    Bulk Delete Project.
+    '''
+    data = project_crud.bulk_delete(db, request.ids)
+    return data
+
+@router.put("/project/{id}", dependencies=[Depends(require_permission("project", "update"))])
 def update_project(id, request:PydanticProject, db: Session = Depends(get_db)):
     '''
     Update Project.
@@ -220,23 +587,24 @@ def update_project(id, request:PydanticProject, db: Session = Depends(get_db)):
     data = project_crud.update(db, id, request.model_dump())
     return data
 
-@router.get("/project/{id}")
-def get_project(id, db: Session = Depends(get_db)):
+@router.get("/project/{id}", dependencies=[Depends(require_permission("project", "read"))])
+def get_project(id, db: Session = Depends(get_read_db), if_none_match: Optional[str] = Header(None)):
     '''
     Get Project.
     '''
-    data = project_crud.get(db, id)
+    data = project_crud.get(db, id, if_none_match)
     return data
 
-@router.get("/project-list")
-def get_project_list( db: Session = Depends(get_db), skip: int = 0, limit: int = 10):
+@router.get("/project-list", dependencies=[Depends(require_permission("project", "read"))])
+def get_project_list( db: Session = Depends(get_read_db), skip: int = 0, limit: int = 10,
+                 cursor: Optional[str] = None, if_none_match: Optional[str] = Header(None)):
     '''
     Get Project List.
     '''
-    data = project_crud.list_data(db, skip, limit)
+    data = project_crud.list_data(db, skip, limit, cursor, if_none_match)
     return data
 
-@router.delete("/project/{id}")
+@router.delete("/project/{id}", dependencies=[Depends(require_permission("project", "delete"))])
 def delete_project(id, db: Session = Depends(get_db)):
     '''
     Delete Project.
@@ -246,9 +614,10 @@ def delete_project(id, db: Session = Depends(get_db)):
 
 
 #Skill Crud
-skill_crud = GenericCrudView(Skill, response_model=PydanticSkill)
+skill_crud = GenericCrudView(Skill, response_model=PydanticSkill,
+                             cache=LRUCache(CACHE_MAX_SIZE, CACHE_TTL_IN_SECONDS))
 
-@router.post("/skill/create")
+@router.post("/skill/create", dependencies=[Depends(require_permission("skill", "create"))])
 def create_skill(request: PydanticSkill, db: Session = Depends(get_db)):
     '''
     Create Skill.
@@ -256,7 +625,32 @@ def create_skill(request: PydanticSkill, db: Session = Depends(get_db)):
     data = skill_crud.create(db, request.model_dump())
     return data
 
-@router.put("/skill/{id}")
+@router.post("/skill/bulk", dependencies=[Depends(require_permission("skill", "create"))])
+def bulk_create_skill(request: List[PydanticSkill], db: Session = Depends(get_db)):
+    '''
+    Bulk Create Skill.
+    '''
+    data = skill_crud.bulk_create(db, [item.model_dump() for item in request])
+    return data
+
+@router.put("/skill/bulk", dependencies=[Depends(require_permission("skill", "update"))])
+def bulk_update_skill(request: List[PydanticBulkUpdateItem[PydanticSkill]],
+                      db: Session = Depends(get_db)):
+    '''
+    Bulk Update Skill.
+    '''
+    data = skill_crud.bulk_update(db, [(item.id, item.data.model_dump()) for item in request])
+    return data
+
+@router.delete("/skill/bulk", dependencies=[Depends(require_permission("skill", "delete"))])
+def bulk_delete_skill(request: PydanticBulkDelete, db: Session = Depends(get_db)):
+    '''
+    Bulk Delete Skill.
+    '''
+    data = skill_crud.bulk_delete(db, request.ids)
+    return data
+
+@router.put("/skill/{id}", dependencies=[Depends(require_permission("skill", "update"))])
 def update_skill(id, request:PydanticSkill, db: Session = Depends(get_db)):
     '''
     Update Skill.
@@ -264,23 +658,24 @@ def update_skill(id, request:PydanticSkill, db: Session = Depends(get_db)):
     data = skill_crud.update(db, id, request.model_dump())
     return data
 
-@router.get("/skill/{id}")
-def get_skill(id, db: Session = Depends(get_db)):
+@router.get("/skill/{id}", dependencies=[Depends(require_permission("skill", "read"))])
+def get_skill(id, db: Session = Depends(get_read_db), if_none_match: Optional[str] = Header(None)):
     '''
     Get Skill.
     '''
-    data = skill_crud.get(db, id)
+    data = skill_crud.get(db, id, if_none_match)
     return data
 
-@router.get("/skill-list")
-def get_skill_list( db: Session = Depends(get_db), skip: int = 0, limit: int = 10):
+@router.get("/skill-list", dependencies=[Depends(require_permission("skill", "read"))])
+def get_skill_list( db: Session = Depends(get_read_db), skip: int = 0, limit: int = 10,
+                 cursor: Optional[str] = None, if_none_match: Optional[str] = Header(None)):
     '''
     Get Skill List.
     '''
-    data = skill_crud.list_data(db, skip, limit)
+    data = skill_crud.list_data(db, skip, limit, cursor, if_none_match)
     return data
 
-@router.delete("/skill/{id}")
+@router.delete("/skill/{id}", dependencies=[Depends(require_permission("skill", "delete"))])
 def delete_skill(id, db: Session = Depends(get_db)):
     '''
     Delete Skill.
@@ -290,9 +685,10 @@ def delete_skill(id, db: Session = Depends(get_db)):
 
 
 #Designation Crud
-designation_crud = GenericCrudView(Designation, response_model=PydanticDesignation)
+designation_crud = GenericCrudView(Designation, response_model=PydanticDesignation,
+                                   cache=LRUCache(CACHE_MAX_SIZE, CACHE_TTL_IN_SECONDS))
 
-@router.post("/project/create")
+@router.post("/designation/create", dependencies=[Depends(require_permission("designation", "create"))])
 def create_designation(request: PydanticDesignation, db: Session = Depends(get_db)):
     '''
     Create Designation.
@@ -300,7 +696,32 @@ def create_designation(request: PydanticDesignation, db: Session = Depends(get_d
     data = designation_crud.create(db, request.model_dump())
     return data
 
-@router.put("/designation/{id}")
+@router.post("/designation/bulk", dependencies=[Depends(require_permission("designation", "create"))])
+def bulk_create_designation(request: List[PydanticDesignation], db: Session = Depends(get_db)):
+    '''
+    Bulk Create Designation.
+    '''
+    data = designation_crud.bulk_create(db, [item.model_dump() for item in request])
+    return data
+
+@router.put("/designation/bulk", dependencies=[Depends(require_permission("designation", "update"))])
+def bulk_update_designation(request: List[PydanticBulkUpdateItem[PydanticDesignation]],
+                      db: Session = Depends(get_db)):
+    '''
+    Bulk Update Designation.
+    '''
+    data = designation_crud.bulk_update(db, [(item.id, item.data.model_dump()) for item in request])
+    return data
+
+@router.delete("/designation/bulk", dependencies=[Depends(require_permission("designation", "delete"))])
+def bulk_delete_designation(request: PydanticBulkDelete, db: Session = Depends(get_db)):
+    '''
+    Bulk Delete Designation.
+    '''
+    data = designation_crud.bulk_delete(db, request.ids)
+    return data
+
+@router.put("/designation/{id}", dependencies=[Depends(require_permission("designation", "update"))])
 def update_designation(id, request:PydanticDesignation, db: Session = Depends(get_db)):
     '''
     Update Designation.
@@ -308,23 +729,24 @@ def update_designation(id, request:PydanticDesignation, db: Session = Depends(ge
     data = designation_crud.update(db, id, request.model_dump())
     return data
 
-@router.get("/designation/{id}")
-def get_designation(id, db: Session = Depends(get_db)):
+@router.get("/designation/{id}", dependencies=[Depends(require_permission("designation", "read"))])
+def get_designation(id, db: Session = Depends(get_read_db), if_none_match: Optional[str] = Header(None)):
     '''
     Get Designation.
     '''
-    data = designation_crud.get(db, id)
+    data = designation_crud.get(db, id, if_none_match)
     return data
 
-@router.get("/designation-list")
-def get_designation_list( db: Session = Depends(get_db), skip: int = 0, limit: int = 10):
+@router.get("/designation-list", dependencies=[Depends(require_permission("designation", "read"))])
+def get_designation_list( db: Session = Depends(get_read_db), skip: int = 0, limit: int = 10,
+                 cursor: Optional[str] = None, if_none_match: Optional[str] = Header(None)):
     '''
     Get Designation List.
     '''
-    data = designation_crud.list_data(db, skip, limit)
+    data = designation_crud.list_data(db, skip, limit, cursor, if_none_match)
     return data
 
-@router.delete("/designation/{id}")
+@router.delete("/designation/{id}", dependencies=[Depends(require_permission("designation", "delete"))])
 def delete_designation(id, db: Session = Depends(get_db)):
     '''
     Delete Designation.
@@ -334,9 +756,10 @@ def delete_designation(id, db: Session = Depends(get_db)):
 
 
 #Competency Crud
-competency_crud = GenericCrudView(Competency, response_model=PydanticCompetency)
+competency_crud = GenericCrudView(Competency, response_model=PydanticCompetency,
+                                  cache=LRUCache(CACHE_MAX_SIZE, CACHE_TTL_IN_SECONDS))
 
-@router.post("/competency/create")
+@router.post("/competency/create", dependencies=[Depends(require_permission("competency", "create"))])
 def create_competency(request: PydanticCompetency, db: Session = Depends(get_db)):
     '''
     Create Competency.
@@ -344,7 +767,32 @@ def create_competency(request: PydanticCompetency, db: Session = Depends(get_db)
     data = competency_crud.create(db, request.model_dump())
     return data
 
-@router.put("/competency/{id}")
+@router.post("/competency/bulk", dependencies=[Depends(require_permission("competency", "create"))])
+def bulk_create_competency(request: List[PydanticCompetency], db: Session = Depends(get_db)):
+    '''
+    Bulk Create Competency.
+    '''
+    data = competency_crud.bulk_create(db, [item.model_dump() for item in request])
+    return data
+
+@router.put("/competency/bulk", dependencies=[Depends(require_permission("competency", "update"))])
+def bulk_update_competency(request: List[PydanticBulkUpdateItem[PydanticCompetency]],
+                      db: Session = Depends(get_db)):
+    '''
+    Bulk Update Competency.
+    '''
+    data = competency_crud.bulk_update(db, [(item.id, item.data.model_dump()) for item in request])
+    return data
+
+@router.delete("/competency/bulk", dependencies=[Depends(require_permission("competency", "delete"))])
+def bulk_delete_competency(request: PydanticBulkDelete, db: Session = Depends(get_db)):
+    '''
+    Bulk Delete Competency.
+    '''
+    data = competency_crud.bulk_delete(db, request.ids)
+    return data
+
+@router.put("/competency/{id}", dependencies=[Depends(require_permission("competency", "update"))])
 def update_competency(id, request:PydanticCompetency, db: Session = Depends(get_db)):
     '''
     Update Competency.
@@ -352,23 +800,24 @@ def update_competency(id, request:PydanticCompetency, db: Session = Depends(get_
     data = competency_crud.update(db, id, request.model_dump())
     return data
 
-@router.get("/competency/{id}")
-def get_competency(id, db: Session = Depends(get_db)):
+@router.get("/competency/{id}", dependencies=[Depends(require_permission("competency", "read"))])
+def get_competency(id, db: Session = Depends(get_read_db), if_none_match: Optional[str] = Header(None)):
     '''
     Get Competency.
     '''
-    data = competency_crud.get(db, id)
+    data = competency_crud.get(db, id, if_none_match)
     return data
 
-@router.get("/competency-list")
-def get_competency_list( db: Session = Depends(get_db), skip: int = 0, limit: int = 10):
+@router.get("/competency-list", dependencies=[Depends(require_permission("competency", "read"))])
+def get_competency_list( db: Session = Depends(get_read_db), skip: int = 0, limit: int = 10,
+                 cursor: Optional[str] = None, if_none_match: Optional[str] = Header(None)):
     '''
     Get Competency List.
     '''
-    data = competency_crud.list_data(db, skip, limit)
+    data = competency_crud.list_data(db, skip, limit, cursor, if_none_match)
     return data
 
-@router.delete("/competency/{id}")
+@router.delete("/competency/{id}", dependencies=[Depends(require_permission("competency", "delete"))])
 def delete_competency(id, db: Session = Depends(get_db)):
     '''
     Delete Competency.
@@ -378,9 +827,11 @@ def delete_competency(id, db: Session = Depends(get_db)):
 
 
 #Permission Crud
-permission_crud = GenericCrudView(Permission, response_model=PydanticPermission)
+permission_crud = GenericCrudView(Permission, response_model=PydanticPermission,
+                                  cache=LRUCache(CACHE_MAX_SIZE, CACHE_TTL_IN_SECONDS),
+                                  on_write=permission_engine.invalidate)
 
-@router.post("/permission/create")
+@router.post("/permission/create", dependencies=[Depends(require_permission("permission", "create"))])
 def create_permission(request: PydanticPermission, db: Session = Depends(get_db)):
     '''
     Create Permission.
@@ -388,7 +839,32 @@ def create_permission(request: PydanticPermission, db: Session = Depends(get_db)
     data = permission_crud.create(db, request.model_dump())
     return data
 
-@router.put("/permission/{id}")
+@router.post("/permission/bulk", dependencies=[Depends(require_permission("permission", "create"))])
+def bulk_create_permission(request: List[PydanticPermission], db: Session = Depends(get_db)):
+    '''
+    Bulk Create Permission.
+    '''
+    data = permission_crud.bulk_create(db, [item.model_dump() for item in request])
+    return data
+
+@router.put("/permission/bulk", dependencies=[Depends(require_permission("permission", "update"))])
+def bulk_update_permission(request: List[PydanticBulkUpdateItem[PydanticPermission]],
+                      db: Session = Depends(get_db)):
+    '''
+    Bulk Update Permission.
+    '''
+    data = permission_crud.bulk_update(db, [(item.id, item.data.model_dump()) for item in request])
+    return data
+
+@router.delete("/permission/bulk", dependencies=[Depends(require_permission("permission", "delete"))])
+def bulk_delete_permission(request: PydanticBulkDelete, db: Session = Depends(get_db)):
+    '''
+    Bulk Delete Permission.
+    '''
+    data = permission_crud.bulk_delete(db, request.ids)
+    return data
+
+@router.put("/permission/{id}", dependencies=[Depends(require_permission("permission", "update"))])
 def update_permission(id, request:PydanticPermission, db: Session = Depends(get_db)):
     '''
     Update Permission.
@@ -396,23 +872,24 @@ def update_permission(id, request:PydanticPermission, db: Session = Depends(get_
     data = permission_crud.update(db, id, request.model_dump())
     return data
 
-@router.get("/permission/{id}")
-def get_permission(id, db: Session = Depends(get_db)):
+@router.get("/permission/{id}", dependencies=[Depends(require_permission("permission", "read"))])
+def get_permission(id, db: Session = Depends(get_read_db), if_none_match: Optional[str] = Header(None)):
     '''
     Get Permission.
     '''
-    data = permission_crud.get(db, id)
+    data = permission_crud.get(db, id, if_none_match)
     return data
 
-@router.get("/permission-list")
-def get_permission_list( db: Session = Depends(get_db), skip: int = 0, limit: int = 10):
+@router.get("/permission-list", dependencies=[Depends(require_permission("permission", "read"))])
+def get_permission_list( db: Session = Depends(get_read_db), skip: int = 0, limit: int = 10,
+                 cursor: Optional[str] = None, if_none_match: Optional[str] = Header(None)):
     '''
     Get Permission List.
     '''
-    data = permission_crud.list_data(db, skip, limit)
+    data = permission_crud.list_data(db, skip, limit, cursor, if_none_match)
     return data
 
-@router.delete("/permission/{id}")
+@router.delete("/permission/{id}", dependencies=[Depends(require_permission("permission", "delete"))])
 def delete_permission(id, db: Session = Depends(get_db)):
     '''
     Delete Permission.
@@ -422,9 +899,11 @@ def delete_permission(id, db: Session = Depends(get_db)):
 
 
 #Roles Crud
-roles_crud = GenericCrudView(Role, response_model=PydanticRole)
+roles_crud = GenericCrudView(Role, response_model=PydanticRole,
+                            cache=LRUCache(CACHE_MAX_SIZE, CACHE_TTL_IN_SECONDS),
+                            on_write=permission_engine.invalidate)
 
-@router.post("/role/create")
+@router.post("/role/create", dependencies=[Depends(require_permission("role", "create"))])
 def create_role(request: PydanticRole, db: Session = Depends(get_db)):
     '''
     Create Role.
@@ -432,7 +911,32 @@ def create_role(request: PydanticRole, db: Session = Depends(get_db)):
     data = roles_crud.create(db, request.model_dump())
     return data
 
-@router.put("/role/{id}")
+@router.post("/role/bulk", dependencies=[Depends(require_permission("role", "create"))])
+def bulk_create_role(request: List[PydanticRole], db: Session = Depends(get_db)):
+    '''
+    Bulk Create Role.
+    '''
+    data = roles_crud.bulk_create(db, [item.model_dump() for item in request])
+    return data
+
+@router.put("/role/bulk", dependencies=[Depends(require_permission("role", "update"))])
+def bulk_update_role(request: List[PydanticBulkUpdateItem[PydanticRole]],
+                      db: Session = Depends(get_db)):
+    '''
+    Bulk Update Role.
+    '''
+    data = roles_crud.bulk_update(db, [(item.id, item.data.model_dump()) for item in request])
+    return data
+
+@router.delete("/role/bulk", dependencies=[Depends(require_permission("role", "delete"))])
+def bulk_delete_role(request: PydanticBulkDelete, db: Session = Depends(get_db)):
+    '''
+    Bulk Delete Role.
+    '''
+    data = roles_crud.bulk_delete(db, request.ids)
+    return data
+
+@router.put("/role/{id}", dependencies=[Depends(require_permission("role", "update"))])
 def update_role(id, request:PydanticRole, db: Session = Depends(get_db)):
     '''
     Update Role.
@@ -440,26 +944,64 @@ def update_role(id, request:PydanticRole, db: Session = Depends(get_db)):
     data = roles_crud.update(db, id, request.model_dump())
     return data
 
-@router.get("/role/{id}")
-def get_role(id, db: Session = Depends(get_db)):
+@router.get("/role/{id}", dependencies=[Depends(require_permission("role", "read"))])
+def get_role(id, db: Session = Depends(get_read_db), if_none_match: Optional[str] = Header(None)):
     '''
     Get Role.
     '''
-    data = roles_crud.get(db, id)
+    data = roles_crud.get(db, id, if_none_match)
     return data
 
-@router.get("/role-list")
-def get_role_list( db: Session = Depends(get_db), skip: int = 0, limit: int = 10):
+@router.get("/role-list", dependencies=[Depends(require_permission("role", "read"))])
+def get_role_list( db: Session = Depends(get_read_db), skip: int = 0, limit: int = 10,
+                 cursor: Optional[str] = None, if_none_match: Optional[str] = Header(None)):
     '''
     Get Role List.
     '''
-    data = roles_crud.list_data(db, skip, limit)
+    data = roles_crud.list_data(db, skip, limit, cursor, if_none_match)
     return data
 
-@router.delete("/role/{id}")
+@router.delete("/role/{id}", dependencies=[Depends(require_permission("role", "delete"))])
 def delete_role(id, db: Session = Depends(get_db)):
     '''
     Delete Role.
     '''
     data = roles_crud.delete(db, id)
     return data
+
+
+#Password hashing pool
+@router.get("/password-hash-pool", dependencies=[Depends(require_permission("admin", "read"))])
+def get_password_hash_pool_stats():
+    '''
+    Get Password Hashing Pool saturation metrics.
+    '''
+    data_dict = {
+        "message": "Password hash pool stats retrived Successfully.",
+        "data": password_hash_pool.stats()
+    }
+    return JSONResponse(
+        status_code=200,
+        content= data_dict
+    )
+
+
+#Cache stats
+@router.get("/cache-stats", dependencies=[Depends(require_permission("admin", "read"))])
+def get_cache_stats():
+    '''
+    Get hit/miss counters of the auth and reference table caches.
+    '''
+    cached_views = [skill_crud, designation_crud, competency_crud, permission_crud, roles_crud]
+    data_dict = {
+        "message": "Cache stats retrived Successfully.",
+        "data": {
+            "auth": auth_cache.stats(),
+            "rbac": permission_engine.user_masks.stats(),
+            **{view.model.__tablename__: view.cache.stats() for view in cached_views}
+        }
+    }
+    return JSONResponse(
+        status_code=200,
+        content= data_dict
+    )
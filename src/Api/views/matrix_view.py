@@ -0,0 +1,448 @@
+import io
+import csv
+from typing import Optional, Literal
+
+import orjson
+from sqlalchemy import select, update, and_, or_, func, distinct
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, UploadFile, File, Header
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from ..pydantic_models import *
+from ..helper import get_db, get_read_db, verify_user
+from ..replicas import read_session
+from ..permissions import require_permission
+from ..importer import import_emp_skills, open_csv
+from ..config import EVALUATION_BATCH_MAX_SIZE
+from .admin_view import skill_crud
+from src.Api.models import (User, UserProfile, UserProject, EmpSkill, Skill,
+                             SkillEvaluator, uuid7, canonical_id, InvalidIdentifier)
+
+
+router = APIRouter(
+    tags=["Skill Matrix"],
+    dependencies=[Depends(verify_user)],
+)
+
+STREAM_CHUNK_SIZE = 64 * 1024
+STREAM_PARTITION_SIZE = 1000
+
+
+def matrix_query(project_id=None, competency_id=None, designation_id=None):
+    '''
+    One row per (user, skill), ordered by user so rows can be pivoted while streaming.
+    '''
+    query = (
+        select(
+            UserProfile.id,
+            User.full_name,
+            User.email_address,
+            Skill.skill_name,
+            EmpSkill.rate_by_self,
+            SkillEvaluator.evaluator_rating,
+        )
+        .select_from(UserProfile)
+        .join(User, User.user_profile_id==UserProfile.id)
+        .outerjoin(EmpSkill, EmpSkill.user_profile_id==UserProfile.id)
+        .outerjoin(Skill, Skill.id==EmpSkill.skill_id)
+        .outerjoin(SkillEvaluator, SkillEvaluator.employee_id==EmpSkill.id)
+        .order_by(UserProfile.id, Skill.skill_name)
+    )
+    if project_id:
+        query = query.where(UserProfile.id.in_(
+            select(UserProject.user_profile_id).where(UserProject.project_id==project_id)
+        ))
+    if competency_id:
+        query = query.where(UserProfile.competency_id==competency_id)
+    if designation_id:
+        query = query.where(UserProfile.designation_id==designation_id)
+    return query
+
+
+def pivot_rows(rows):
+    '''
+    Fold consecutive (user, skill) rows into one matrix row per user.
+    '''
+    current = None
+    for row in rows:
+        if current is None or current["user_profile_id"] != row.id:
+            if current is not None:
+                yield current
+            current = {
+                "user_profile_id": row.id,
+                "full_name": row.full_name,
+                "email_address": row.email_address,
+                "skills": {},
+            }
+        if row.skill_name is not None:
+            current["skills"][row.skill_name] = {
+                "self": row.rate_by_self,
+                "evaluator": row.evaluator_rating,
+            }
+    if current is not None:
+        yield current
+
+
+def iter_query(query, reader=None):
+    '''
+    Run `query` on a server side cursor and yield its rows one partition at a time.
+
+    The session is opened on a read replica for the client identified by `reader`.
+    '''
+    db = read_session(reader)
+    try:
+        # Core execution on the session's connection: the ORM result path
+        # would buffer every row before yielding the first one.
+        result = db.connection().execute(query.execution_options(stream_results=True))
+        for partition in result.partitions(STREAM_PARTITION_SIZE):
+            yield from partition
+    finally:
+        db.close()
+
+
+def chunked(lines):
+    '''
+    Join encoded lines into ~64KB chunks for the StreamingResponse.
+    '''
+    buffer = []
+    size = 0
+    for line in lines:
+        buffer.append(line)
+        size += len(line)
+        if size >= STREAM_CHUNK_SIZE:
+            yield b"".join(buffer)
+            buffer = []
+            size = 0
+    if buffer:
+        yield b"".join(buffer)
+
+
+def ndjson_lines(items):
+    for item in items:
+        yield orjson.dumps(item) + b"\n"
+
+
+def csv_chunks(columns, rows):
+    '''
+    Write rows with csv.writer into a reused buffer, yielding ~64KB chunks.
+    '''
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for row in rows:
+        writer.writerow(row)
+        if buffer.tell() >= STREAM_CHUNK_SIZE:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+@router.get("/matrix", dependencies=[Depends(require_permission("matrix", "read"))])
+def get_skill_matrix(project_id: Optional[str] = None, competency_id: Optional[str] = None,
+                     designation_id: Optional[str] = None,
+                     authorization: Optional[str] = Header(None)):
+    '''
+    Users x skills matrix, streamed as NDJSON with one line per user.
+
+    Each line maps skill names to the self rating (EmpSkill.rate_by_self)
+    and the evaluator rating (SkillEvaluator.evaluator_rating).
+    '''
+    # Checked here: once streaming starts, a bad id could only cut the body short.
+    project_id, competency_id, designation_id = (
+        canonical_id(value) if value else None
+        for value in (project_id, competency_id, designation_id)
+    )
+    query = matrix_query(project_id, competency_id, designation_id)
+    body = chunked(ndjson_lines(pivot_rows(iter_query(query, authorization))))
+    return StreamingResponse(body, media_type="application/x-ndjson")
+
+
+def skill_search_query(search: PydanticSkillSearch):
+    '''
+    Profiles matching the skill criteria.
+
+    Each criterion is an index range scan on emp_skill (skill_id, rate_by_self),
+    criteria are OR-ed and, for "all", a profile must match every distinct skill.
+    '''
+    conditions = []
+    for criterion in search.criteria:
+        condition = EmpSkill.skill_id==criterion.skill_id
+        if criterion.min_self_rating is not None:
+            condition = and_(condition, EmpSkill.rate_by_self >= criterion.min_self_rating)
+        if criterion.min_evaluated_rating is not None:
+            condition = and_(condition, SkillEvaluator.evaluator_rating >= criterion.min_evaluated_rating)
+        conditions.append(condition)
+    matches = select(EmpSkill.user_profile_id).where(or_(*conditions))
+    if any(criterion.min_evaluated_rating is not None for criterion in search.criteria):
+        matches = matches.join(SkillEvaluator, SkillEvaluator.employee_id==EmpSkill.id, isouter=True)
+    matches = matches.group_by(EmpSkill.user_profile_id)
+    if search.match == "all":
+        skill_count = len({criterion.skill_id for criterion in search.criteria})
+        matches = matches.having(func.count(distinct(EmpSkill.skill_id))==skill_count)
+
+    query = (
+        select(UserProfile.id, User.full_name, User.email_address, UserProfile.occupied)
+        .join(User, User.user_profile_id==UserProfile.id)
+        .where(UserProfile.id.in_(matches))
+        .order_by(User.full_name, UserProfile.id)
+        .limit(search.limit)
+    )
+    if search.occupied is not None:
+        query = query.where(UserProfile.occupied==search.occupied)
+    return query
+
+
+@router.post("/matrix/search", dependencies=[Depends(require_permission("matrix", "read"))])
+def search_skills(request: PydanticSkillSearch, db: Session = Depends(get_read_db)):
+    '''
+    Find employees having skill X at level >= N, for several skills at once.
+    '''
+    if not request.criteria:
+        return JSONResponse(
+            status_code=400,
+            content={
+                "message": "At least one skill criterion is required.",
+                "data": {}
+            }
+        )
+    rows = db.execute(skill_search_query(request)).all()
+    data_dict = {
+        "message": "Skill search Successful.",
+        "data": [
+            {
+                "user_profile_id": row.id,
+                "full_name": row.full_name,
+                "email_address": row.email_address,
+                "occupied": row.occupied,
+            }
+            for row in rows
+        ]
+    }
+    return JSONResponse(
+        status_code=200,
+        content= data_dict
+    )
+
+
+EXPORT_COLUMNS = {
+    "user_profile_id": EmpSkill.user_profile_id,
+    "full_name": User.full_name,
+    "email_address": User.email_address,
+    "emp_skill_id": EmpSkill.id,
+    "skill_name": Skill.skill_name,
+    "skill_type": EmpSkill.skill_type,
+    "skill_category": EmpSkill.skill_category,
+    "rate_by_self": EmpSkill.rate_by_self,
+    "certificate": EmpSkill.certificate,
+    "is_evaluated": EmpSkill.is_evaluated,
+    "emp_manager_id": EmpSkill.emp_manager_id,
+    "evaluator_id": SkillEvaluator.evaluator_id,
+    "evaluator_rating": SkillEvaluator.evaluator_rating,
+    "evaluator_comment": SkillEvaluator.evaluator_comment,
+}
+
+
+def export_query():
+    '''
+    One row per EmpSkill with its employee, skill, certificate and evaluation.
+    '''
+    return (
+        select(*(column.label(name) for name, column in EXPORT_COLUMNS.items()))
+        .select_from(EmpSkill)
+        .join(User, User.user_profile_id==EmpSkill.user_profile_id)
+        .outerjoin(Skill, Skill.id==EmpSkill.skill_id)
+        .outerjoin(SkillEvaluator, SkillEvaluator.employee_id==EmpSkill.id)
+        .order_by(EmpSkill.user_profile_id, EmpSkill.id)
+    )
+
+
+def export_body(format, reader=None):
+    '''
+    Chunked CSV or NDJSON body of the employee skills export.
+    '''
+    columns = list(EXPORT_COLUMNS)
+    rows = iter_query(export_query(), reader)
+    if format == "csv":
+        return csv_chunks(columns, rows)
+    return chunked(ndjson_lines(dict(zip(columns, row)) for row in rows))
+
+
+@router.get("/matrix/export", dependencies=[Depends(require_permission("export", "read"))])
+def export_employee_skills(format: Literal["csv", "ndjson"] = "csv",
+                           authorization: Optional[str] = Header(None)):
+    '''
+    Export every employee skill row as CSV or NDJSON, streamed in constant memory.
+    '''
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        export_body(format, authorization),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename=employee_skills.{format}"},
+    )
+
+
+@router.post("/matrix/import", dependencies=[Depends(require_permission("import", "create"))])
+def import_employee_skills(file: UploadFile = File(...), db: Session = Depends(get_db),
+                           current_user: dict = Depends(verify_user)):
+    '''
+    Import employee skills from a CSV upload, creating missing skills.
+
+    Columns: email_address, skill_name, skill_type (required), skill_category,
+    rate_by_self, certificate. An existing (employee, skill) row is updated,
+    anything else is inserted; rejected rows are listed in the response.
+    '''
+    try:
+        report = import_emp_skills(db, open_csv(file.file), current_user["email"])
+    except (ValueError, csv.Error) as e:
+        return JSONResponse(
+            status_code=400,
+            content={
+                "message": f"Invalid CSV file: {e}",
+                "data": {}
+            }
+        )
+    if report.skills_created:
+        skill_crud.invalidate()
+    data_dict = {
+        "message": "Import Successful.",
+        "data": report.as_dict()
+    }
+    return JSONResponse(
+        status_code=200,
+        content= data_dict
+    )
+
+
+def evaluation_errors(db: Session, evaluations, evaluator_id):
+    '''
+    Check a batch set-wise: every employee_id is a valid id given once, every
+    emp_skill exists and is managed by the evaluator. Ids are compared in
+    canonical form. Returns (errors, ids already evaluated).
+    '''
+    errors = []
+    ids = {}
+    for evaluation in evaluations:
+        try:
+            employee_id = canonical_id(evaluation.employee_id)
+        except InvalidIdentifier:
+            errors.append({"employee_id": evaluation.employee_id, "error": "Invalid id."})
+            continue
+        if employee_id in ids:
+            errors.append({"employee_id": evaluation.employee_id, "error": "Duplicate employee_id."})
+        ids[employee_id] = None
+
+    rows = db.execute(
+        select(EmpSkill.id, EmpSkill.emp_manager_id, SkillEvaluator.id.label("evaluation_id"))
+        .outerjoin(SkillEvaluator, SkillEvaluator.employee_id==EmpSkill.id)
+        .where(EmpSkill.id.in_(ids))
+    ).all()
+    found = {str(row.id): row for row in rows}
+    for employee_id in ids:
+        row = found.get(employee_id)
+        if row is None:
+            errors.append({"employee_id": employee_id, "error": "Employee skill not found."})
+        elif str(row.emp_manager_id) != str(evaluator_id):
+            errors.append({"employee_id": employee_id, "error": "Not evaluated by this manager."})
+    evaluated = {employee_id for employee_id, row in found.items() if row.evaluation_id is not None}
+    return errors, evaluated
+
+
+def upsert_evaluations(db: Session, evaluations, evaluator_id, evaluated_by):
+    '''
+    One INSERT .. ON CONFLICT (employee_id) DO UPDATE for the whole batch.
+    '''
+    dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+    statement = dialect.insert(SkillEvaluator.__table__).values([
+        {
+            "id": uuid7(),
+            "employee_id": evaluation.employee_id,
+            "evaluator_id": evaluator_id,
+            "evaluator_rating": evaluation.evaluator_rating,
+            "evaluator_comment": evaluation.evaluator_comment,
+            "created_by": evaluated_by,
+        }
+        for evaluation in evaluations
+    ])
+    db.execute(statement.on_conflict_do_update(
+        index_elements=["employee_id"],
+        set_={
+            "evaluator_id": statement.excluded.evaluator_id,
+            "evaluator_rating": statement.excluded.evaluator_rating,
+            "evaluator_comment": statement.excluded.evaluator_comment,
+            "updated_at": func.now(),
+            "updated_by": statement.excluded.created_by,
+        },
+    ))
+
+
+@router.post("/matrix/evaluations", dependencies=[Depends(require_permission("matrix", "update"))])
+def evaluate_employee_skills(request: PydanticEvaluationBatch, db: Session = Depends(get_db),
+                             current_user: dict = Depends(verify_user)):
+    '''
+    Rate and comment on many employee skills of the manager's reports at once.
+
+    The batch is validated as a whole and nothing is saved if any entry is
+    rejected. Evaluations are upserted on employee_id and the employee skills
+    marked evaluated in the same transaction.
+    '''
+    evaluator_id = current_user["user_profile_id"]
+    if evaluator_id is None:
+        return JSONResponse(
+            status_code=400,
+            content={
+                "message": "Only employees with a profile can evaluate.",
+                "data": {}
+            }
+        )
+    if not request.evaluations or len(request.evaluations) > EVALUATION_BATCH_MAX_SIZE:
+        return JSONResponse(
+            status_code=400,
+            content={
+                "message": f"Send between 1 and {EVALUATION_BATCH_MAX_SIZE} evaluations.",
+                "data": {}
+            }
+        )
+    errors, evaluated = evaluation_errors(db, request.evaluations, evaluator_id)
+    if errors:
+        return JSONResponse(
+            status_code=400,
+            content={
+                "message": "Evaluations rejected, nothing was saved.",
+                "data": errors
+            }
+        )
+    ids = [evaluation.employee_id for evaluation in request.evaluations]
+    try:
+        upsert_evaluations(db, request.evaluations, evaluator_id, current_user["email"])
+        db.execute(
+            update(EmpSkill)
+            .where(EmpSkill.id.in_(ids))
+            .values(is_evaluated=True, updated_at=func.now(), updated_by=current_user["email"])
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+    except SQLAlchemyError:
+        db.rollback()
+        return JSONResponse(
+            status_code=400,
+            content={
+                "message": "Failed to save evaluations.",
+                "data": {}
+            }
+        )
+    data_dict = {
+        "message": "Evaluations saved.",
+        "data": {
+            "received": len(ids),
+            "created": len(ids) - len(evaluated),
+            "updated": len(evaluated),
+        }
+    }
+    return JSONResponse(
+        status_code=200,
+        content= data_dict
+    )
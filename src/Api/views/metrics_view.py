@@ -0,0 +1,81 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from sqlalchemy.pool import QueuePool
+
+from ..database import engine, async_engine
+from ..hashing import password_hash_pool
+from ..outbox import email_outbox
+from ..replicas import replica_router
+from ..metrics import REGISTRY, Counter, Gauge, collected
+
+
+router = APIRouter(
+    tags=["Metrics"],
+)
+
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+
+@REGISTRY.add_collector
+def database_pool_metrics():
+    '''
+    Connection pool gauges of the sync and async engines, replicas included.
+    '''
+    pools = {"sync": engine.pool, "async": async_engine.sync_engine.pool}
+    for replica in replica_router.replicas:
+        pools[replica.name] = replica.engine.pool
+    pools = {name: pool for name, pool in pools.items() if isinstance(pool, QueuePool)}
+    return [
+        collected(Gauge, "db_pool_size", "Configured connection pool size.", ("engine",),
+                  {(name,): pool.size() for name, pool in pools.items()}),
+        collected(Gauge, "db_pool_checked_out", "Connections currently checked out.", ("engine",),
+                  {(name,): pool.checkedout() for name, pool in pools.items()}),
+        collected(Gauge, "db_pool_overflow", "Connections open beyond the pool size.", ("engine",),
+                  {(name,): max(pool.overflow(), 0) for name, pool in pools.items()}),
+    ]
+
+
+@REGISTRY.add_collector
+def replica_metrics():
+    replicas = replica_router.replicas
+    return [
+        collected(Gauge, "db_replica_healthy", "1 while the read replica is in rotation.", ("replica",),
+                  {(replica.name,): int(replica.healthy) for replica in replicas}),
+        collected(Gauge, "db_replica_lag_seconds", "Replay lag at the last health check.", ("replica",),
+                  {(replica.name,): replica.lag for replica in replicas if replica.lag is not None}),
+        collected(Counter, "db_replica_outages_total", "Times the replica was taken out of rotation.",
+                  ("replica",), {(replica.name,): replica.outages for replica in replicas}),
+    ]
+
+
+@REGISTRY.add_collector
+def email_outbox_metrics():
+    stats = email_outbox.stats()
+    return [
+        collected(Counter, "email_messages_total", "Outbox messages by outcome.", ("outcome",),
+                  {(outcome,): stats[outcome] for outcome in ("sent", "retried", "failed", "rejected")}),
+        collected(Gauge, "email_outbox_queued", "Messages waiting in the outbox.", (),
+                  {(): stats["queued"] + stats["waiting_retry"]}),
+    ]
+
+
+@REGISTRY.add_collector
+def password_hash_pool_metrics():
+    stats = password_hash_pool.stats()
+    return [
+        collected(Gauge, "password_hash_in_flight", "bcrypt jobs running or queued.", (),
+                  {(): stats["in_flight"]}),
+        collected(Counter, "password_hash_rejected_total", "bcrypt jobs refused with a 503.",
+                  ("reason",), {("full",): stats["rejected"], ("timeout",): stats["timed_out"],
+                                ("broken_pool",): stats["failed"]}),
+    ]
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    '''
+    Metrics in the Prometheus text exposition format.
+
+    Rendered on the event loop, the only thread that updates the metrics.
+    '''
+    return PlainTextResponse(REGISTRY.render(), media_type=CONTENT_TYPE)
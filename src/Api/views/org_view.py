@@ -0,0 +1,191 @@
+from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends
+from fastapi.responses import JSONResponse
+
+from ..pydantic_models import PydanticProfileIds
+from ..helper import get_read_db, verify_user
+from ..permissions import require_permission
+from ..config import PROFILE_BATCH_MAX_SIZE
+from ..org import subtree_query, subtree_skill_rollup_query, profile_graph_query
+
+
+router = APIRouter(
+    prefix="/org",
+    tags=["Organisation"],
+    dependencies=[Depends(verify_user), Depends(require_permission("org", "read"))],
+)
+
+
+def members_response(db: Session, query):
+    rows = db.execute(query).all()
+    data_dict = {
+        "message": "Organisation members retrived Successfully.",
+        "data": [
+            {
+                "user_profile_id": row.descendant_id,
+                "manager_id": row.manager_id,
+                "depth": row.depth,
+                "full_name": row.full_name,
+                "email_address": row.email_address,
+            }
+            for row in rows
+        ]
+    }
+    return JSONResponse(
+        status_code=200,
+        content= data_dict
+    )
+
+
+@router.get("/{profile_id}/subtree")
+def get_subtree(profile_id, db: Session = Depends(get_read_db), skip: int = 0, limit: int = 1000):
+    '''
+    Get every report under a manager, at any depth.
+    '''
+    return members_response(db, subtree_query(profile_id, skip=skip, limit=limit))
+
+
+@router.get("/{profile_id}/team")
+def get_team(profile_id, depth: int = 1, db: Session = Depends(get_read_db),
+             skip: int = 0, limit: int = 1000):
+    '''
+    Get the reports up to `depth` levels under a manager (direct reports by default).
+    '''
+    return members_response(db, subtree_query(profile_id, depth, skip, limit))
+
+
+@router.get("/{profile_id}/skills")
+def get_subtree_skills(profile_id, include_self: bool = False, db: Session = Depends(get_read_db)):
+    '''
+    Get the skill rollup of a manager's whole subtree.
+    '''
+    rows = db.execute(subtree_skill_rollup_query(profile_id, include_self)).all()
+    data_dict = {
+        "message": "Skill rollup retrived Successfully.",
+        "data": [
+            {
+                "skill_id": row.id,
+                "skill_name": row.skill_name,
+                "employees": row.employees,
+                "avg_self_rating": float(row.avg_self_rating) if row.avg_self_rating is not None else None,
+                "max_self_rating": row.max_self_rating,
+                "avg_evaluator_rating": float(row.avg_evaluator_rating) if row.avg_evaluator_rating is not None else None,
+            }
+            for row in rows
+        ]
+    }
+    return JSONResponse(
+        status_code=200,
+        content= data_dict
+    )
+
+
+def profile_data(profile):
+    '''
+    A profile loaded with profile_graph_query as a dict; touches no unloaded relationship.
+    '''
+    manager = profile.team
+    return {
+        "user_profile_id": profile.id,
+        "occupied": profile.occupied,
+        "full_name": profile.user.full_name if profile.user else None,
+        "email_address": profile.user.email_address if profile.user else None,
+        "manager": {
+            "user_profile_id": manager.id,
+            "full_name": manager.user.full_name if manager.user else None,
+        } if manager else None,
+        "designation": {
+            "id": profile.designation.id,
+            "desg_name": profile.designation.desg_name,
+        } if profile.designation else None,
+        "competency": {
+            "id": profile.competency.id,
+            "comp_name": profile.competency.comp_name,
+        } if profile.competency else None,
+        "roles": [{"id": role.id, "role_name": role.role_name} for role in profile.roles],
+        "projects": [
+            {"id": project.id, "project_name": project.project_name} for project in profile.projects
+        ],
+        "skills": [
+            {
+                "emp_skill_id": emp_skill.id,
+                "skill_id": emp_skill.skill_id,
+                "skill_name": emp_skill.emp_skill.skill_name if emp_skill.emp_skill else None,
+                "skill_type": emp_skill.skill_type,
+                "skill_category": emp_skill.skill_category,
+                "rate_by_self": emp_skill.rate_by_self,
+                "certificate": emp_skill.certificate,
+                "is_evaluated": emp_skill.is_evaluated,
+                "evaluator_rating": emp_skill.evaluate[0].evaluator_rating if emp_skill.evaluate else None,
+                "evaluator_comment": emp_skill.evaluate[0].evaluator_comment if emp_skill.evaluate else None,
+            }
+            for emp_skill in profile.emp_skill_user
+        ],
+        "evaluations_given": [
+            {
+                "employee_id": evaluation.employee_id,
+                "evaluator_rating": evaluation.evaluator_rating,
+                "evaluator_comment": evaluation.evaluator_comment,
+            }
+            for evaluation in profile.skill_evaluator
+        ],
+    }
+
+
+def load_profiles(db: Session, profile_ids):
+    '''
+    Profiles in the order of `profile_ids` (ids in canonical form), skipping unknown ids.
+    '''
+    position = {profile_id: i for i, profile_id in enumerate(profile_ids)}
+    profiles = db.execute(profile_graph_query(profile_ids)).scalars().all()
+    return sorted(profiles, key=lambda profile: position.get(profile.id, len(position)))
+
+
+@router.post("/profiles")
+def get_profiles(request: PydanticProfileIds, db: Session = Depends(get_read_db)):
+    '''
+    Get the full profile of many employees at once; unknown ids are left out.
+    '''
+    profile_ids = list(dict.fromkeys(request.ids))
+    if len(profile_ids) > PROFILE_BATCH_MAX_SIZE:
+        return JSONResponse(
+            status_code=400,
+            content={
+                "message": f"At most {PROFILE_BATCH_MAX_SIZE} profiles can be requested at once.",
+                "data": {}
+            }
+        )
+    profiles = load_profiles(db, profile_ids) if profile_ids else []
+    data_dict = {
+        "message": "Profiles retrived Successfully.",
+        "data": [profile_data(profile) for profile in profiles]
+    }
+    return JSONResponse(
+        status_code=200,
+        content= data_dict
+    )
+
+
+@router.get("/{profile_id}")
+def get_profile(profile_id, db: Session = Depends(get_read_db)):
+    '''
+    Get an employee's profile with their user, manager, designation, competency,
+    roles, projects, skills and the evaluations they gave.
+    '''
+    profiles = load_profiles(db, [profile_id])
+    if not profiles:
+        return JSONResponse(
+            status_code=404,
+            content={
+                "message": "Profile not found.",
+                "data": {}
+            }
+        )
+    data_dict = {
+        "message": "Profile retrived Successfully.",
+        "data": profile_data(profiles[0])
+    }
+    return JSONResponse(
+        status_code=200,
+        content= data_dict
+    )
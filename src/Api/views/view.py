@@ -1,10 +1,15 @@
+import datetime
+
+from sqlalchemy import select, update, delete
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi.responses import JSONResponse
-from fastapi import APIRouter, status, Request
+from fastapi import APIRouter, status, Request, Depends
 
-from src.Api.models import User
+from src.Api.models import User, RefreshToken
 from ..pydantic_models import *
-from ..database import session as db
-from ..helper import hash_password, generate_jwt_token, send_email, decrypt_link, verify_password
+from ..helper import (hash_password, generate_jwt_token, send_email, verify_password,
+                      get_async_db, add_refresh_token, hash_refresh_token, read_email_token,
+                      consume_email_token, InvalidEmailToken, VERIFY_EMAIL, RESET_PASSWORD)
 
 
 router = APIRouter(
@@ -15,11 +20,11 @@ router = APIRouter(
 )
 
 @router.post("/signup")
-async def user_signup(request:PydanticUser, url: Request):
+async def user_signup(request:PydanticUser, url: Request, db: AsyncSession = Depends(get_async_db)):
     """
     Signup Api.
     """
-    hashed_password = hash_password(request.password, request.confirm_password)
+    hashed_password = await hash_password(request.password, request.confirm_password)
     if not hashed_password:
         return JSONResponse(
             status_code=400,
@@ -34,9 +39,9 @@ async def user_signup(request:PydanticUser, url: Request):
     try:
         new_user = User(**user_item)
         db.add(new_user)
-        db.commit()
-        db.refresh(new_user)
+        await db.commit()
     except Exception as e:
+        await db.rollback()
         return JSONResponse(
             status_code=400,
             content={
@@ -61,32 +66,38 @@ async def user_signup(request:PydanticUser, url: Request):
     )
 
 @router.get("/verify-email")
-async def verify_email(url:Request):
+async def verify_email(url:Request, db: AsyncSession = Depends(get_async_db)):
     """
     Email Verification Api.
+
+    A signup link activates the user. A forgot-password link is only
+    checked here and echoed back, /auth/update-password uses it up.
     """
-    token = url.query_params['token']
-    email = url.query_params['email']
-    decrypt_data = decrypt_link(eval(token))
-    if email != decrypt_data:
+    token = url.query_params.get('token', '')
+    try:
+        email_token = read_email_token(token, VERIFY_EMAIL, RESET_PASSWORD)
+        if email_token.purpose == VERIFY_EMAIL:
+            await consume_email_token(db, email_token)
+            result = await db.execute(select(User).where(User.email_address==email_token.email))
+            user = result.scalars().first()
+            if not user:
+                raise InvalidEmailToken("User doesn't exist.")
+            user.is_active = True
+            await db.commit()
+    except InvalidEmailToken as e:
         return JSONResponse(
             status_code=400,
             content={
-                "message": "Verification failed.",
+                "message": f"Verification failed. {e}",
                 "data": {}
             }
             )
-    forgot = url.query_params['forgot']
-    if forgot!="true":
-        user = db.query(User).filter(User.email_address==email).first()
-        user.is_active = True
-        db.commit()
-        db.refresh(user)
+    data = {"email": email_token.email}
+    if email_token.purpose == RESET_PASSWORD:
+        data["token"] = token
     data_dict = {
             "message": "Email verification successfull",
-            "data": {
-                "email": email
-            }
+            "data": data
         }
     return JSONResponse(
     status_code=200,
@@ -100,10 +111,10 @@ async def forgot_password_mail(data:PydanticForgotPassword, url:Request):
     """
     redirect_url = "verify-email"
     await send_email(
-                    data['email_address'],
+                    data.email_address,
                     str(url.base_url), 
                     redirect_url, 
-                    forgot="true"
+                    purpose=RESET_PASSWORD
                 )
     data_dict = {
             "message": "Email Sent Successfully.",
@@ -114,10 +125,14 @@ async def forgot_password_mail(data:PydanticForgotPassword, url:Request):
     content= data_dict
     )
 @router.post("/login")
-async def login(request:dict):
+async def login(request:dict, db: AsyncSession = Depends(get_async_db)):
+    """
+    Login Api, returns an access token and a refresh token for /auth/refresh.
+    """
     email = request['email']
     password = request["password"]
-    user = db.query(User).filter(User.email_address==email).first()    
+    result = await db.execute(select(User).where(User.email_address==email))
+    user = result.scalars().first()
     if not user:
         return JSONResponse(
             status_code=400,
@@ -127,7 +142,7 @@ async def login(request:dict):
             }
             )
     encrypted_password = user.password
-    verified_password = verify_password(password, encrypted_password)
+    verified_password = await verify_password(password, encrypted_password)
     if not verified_password:
         return JSONResponse(
             status_code=400,
@@ -137,24 +152,125 @@ async def login(request:dict):
             }
             )
     token = generate_jwt_token({"email": email})
+    # Expired tokens of the user are dropped here rather than by a sweeper.
+    await db.execute(delete(RefreshToken).where(
+        RefreshToken.user_id==user.id,
+        RefreshToken.expires_at<=datetime.datetime.now(tz=datetime.timezone.utc),
+    ))
+    refresh_token = add_refresh_token(db, user.id)
+    await db.commit()
     data_dict = {
             "message": "Login Successful.",
             "data": {
                 "access_token": token,
+                "refresh_token": refresh_token,
+            }
+        }
+    return JSONResponse(
+    status_code=200,
+    content= data_dict
+    )
+
+
+def revoke_refresh_tokens(*criteria):
+    return update(RefreshToken).where(
+        RefreshToken.revoked_at.is_(None), *criteria
+    ).values(revoked_at=datetime.datetime.now(tz=datetime.timezone.utc)).execution_options(
+        synchronize_session=False
+    )
+
+
+@router.post("/refresh")
+async def refresh_access_token(request:PydanticRefreshToken, db: AsyncSession = Depends(get_async_db)):
+    """
+    Exchange a refresh token for a new access token and refresh token.
+
+    No password check, so no bcrypt: one indexed lookup and one insert.
+    The presented token is revoked; presenting it again revokes every
+    token of its login.
+    """
+    now = datetime.datetime.now(tz=datetime.timezone.utc)
+    result = await db.execute(
+        select(RefreshToken, User.email_address)
+        .join(User, User.id==RefreshToken.user_id)
+        .where(RefreshToken.token_hash==hash_refresh_token(request.refresh_token),
+               RefreshToken.expires_at>now)
+        .with_for_update(of=RefreshToken)
+    )
+    row = result.first()
+    if row is None or row.RefreshToken.revoked_at is not None:
+        if row is not None:
+            await db.execute(revoke_refresh_tokens(RefreshToken.family_id==row.RefreshToken.family_id))
+            await db.commit()
+        return JSONResponse(
+            status_code=401,
+            content={
+                "message": "Invalid refresh token.",
+                "data": {}
+            }
+            )
+    token = row.RefreshToken
+    token.revoked_at = now
+    # Only the predecessor is kept for reuse detection, so a login holds
+    # at most two rows however often it refreshes.
+    await db.execute(delete(RefreshToken).where(
+        RefreshToken.family_id==token.family_id,
+        RefreshToken.revoked_at.is_not(None),
+        RefreshToken.id!=token.id,
+    ))
+    new_refresh_token = add_refresh_token(db, token.user_id, token.family_id)
+    await db.commit()
+    data_dict = {
+            "message": "Token Refreshed Successfully.",
+            "data": {
+                "access_token": generate_jwt_token({"email": row.email_address}),
+                "refresh_token": new_refresh_token,
             }
         }
     return JSONResponse(
     status_code=200,
     content= data_dict
     )
+
+
+@router.post("/logout")
+async def logout(request:PydanticRefreshToken, db: AsyncSession = Depends(get_async_db)):
+    """
+    Revoke the refresh token's login, its access token expires on its own.
+    """
+    family_ids = select(RefreshToken.family_id).where(
+        RefreshToken.token_hash==hash_refresh_token(request.refresh_token)
+    ).scalar_subquery()
+    await db.execute(revoke_refresh_tokens(RefreshToken.family_id==family_ids))
+    await db.commit()
+    data_dict = {
+            "message": "Logged out Successfully.",
+            "data": {}
+        }
+    return JSONResponse(
+    status_code=200,
+    content= data_dict
+    )
     
 
 @router.post("/update-password")
-async def change_password(request:PydanticChangePassword):
+async def change_password(request:PydanticChangePassword, db: AsyncSession = Depends(get_async_db)):
     """
-    Change password for forgot password.
+    Change password for forgot password, with the token of the reset link.
     """
-    hashed_password = hash_password(request.password, request.confirm_password)
+    try:
+        email_token = read_email_token(request.token, RESET_PASSWORD)
+        if email_token.email != request.email:
+            raise InvalidEmailToken("Invalid token.")
+    except InvalidEmailToken as e:
+        return JSONResponse(
+            status_code=400,
+            content={
+                "message": str(e),
+                "data": {}
+            }
+            )
+    hashed_password = await hash_password(request.password, request.confirm_password)
     if not hashed_password:
         return JSONResponse(
             status_code=400,
@@ -164,11 +280,15 @@ async def change_password(request:PydanticChangePassword):
             }
             )
     try:
-        user = db.query(User).filter(User.email_address==request.email).first()
-        user.password = request.password
-        db.commit()
-        db.refresh(user)
+        await consume_email_token(db, email_token)
+        result = await db.execute(select(User).where(User.email_address==request.email))
+        user = result.scalars().first()
+        user.password = hashed_password
+        # A password change ends every login of the user.
+        await db.execute(revoke_refresh_tokens(RefreshToken.user_id==user.id))
+        await db.commit()
     except Exception as e:
+        await db.rollback()
         return JSONResponse(
             status_code=400,
             content={
@@ -0,0 +1,76 @@
+"""native uuid keys
+
+Revision ID: 555bd10eb7b8
+Revises: 3b6702611bf1
+Create Date: 2026-10-18 13:20:41.112904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '555bd10eb7b8'
+down_revision: Union[str, None] = '3b6702611bf1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+PRIMARY_KEYS = [
+    'competency', 'designation', 'permission', 'project', 'role', 'skill',
+    'user_profile', 'emp_skill', 'user', 'skill_evaluator',
+]
+
+# (table, column, referred table, ondelete); constraint names are PostgreSQL's defaults.
+FOREIGN_KEYS = [
+    ('role_permission', 'role_id', 'role', None),
+    ('role_permission', 'permission_id', 'permission', None),
+    ('user_role', 'role_id', 'role', None),
+    ('user_role', 'user_profile_id', 'user_profile', None),
+    ('user_project', 'project_id', 'project', None),
+    ('user_project', 'user_profile_id', 'user_profile', None),
+    ('user', 'user_profile_id', 'user_profile', None),
+    ('user_profile', 'manager_id', 'user_profile', None),
+    ('user_profile', 'designation_id', 'designation', None),
+    ('user_profile', 'competency_id', 'competency', None),
+    ('user_profile_closure', 'ancestor_id', 'user_profile', 'CASCADE'),
+    ('user_profile_closure', 'descendant_id', 'user_profile', 'CASCADE'),
+    ('emp_skill', 'user_profile_id', 'user_profile', None),
+    ('emp_skill', 'emp_manager_id', 'user_profile', None),
+    ('emp_skill', 'skill_id', 'skill', None),
+    ('skill_evaluator', 'employee_id', 'emp_skill', None),
+    ('skill_evaluator', 'evaluator_id', 'user_profile', None),
+]
+
+
+def convert(type_name, cast):
+    # Foreign keys must be dropped while the two sides have different types.
+    for table, column, referred, _ in FOREIGN_KEYS:
+        op.drop_constraint(f'{table}_{column}_fkey', table, type_='foreignkey')
+    columns = {table: ['id'] for table in PRIMARY_KEYS}
+    for table, column, _, _ in FOREIGN_KEYS:
+        columns.setdefault(table, []).append(column)
+    # One ALTER TABLE per table, so each table is rewritten only once.
+    for table, names in columns.items():
+        op.execute('ALTER TABLE "{}" {}'.format(table, ", ".join(
+            f'ALTER COLUMN {name} TYPE {type_name} USING {name}::{cast}' for name in names
+        )))
+    for table, column, referred, ondelete in FOREIGN_KEYS:
+        op.create_foreign_key(f'{table}_{column}_fkey', table, referred, [column], ['id'],
+                              ondelete=ondelete)
+
+
+def upgrade() -> None:
+    # Existing keys are uuid4 strings, so they cast in place; any other
+    # value makes the migration fail before anything is committed.
+    if op.get_context().dialect.name != 'postgresql':
+        return
+    convert('UUID', 'uuid')
+
+
+def downgrade() -> None:
+    if op.get_context().dialect.name != 'postgresql':
+        return
+    convert('VARCHAR', 'text')
@@ -0,0 +1,48 @@
+import os
+import tempfile
+
+import pytest
+
+# Tests always run against a throwaway SQLite file, never the configured database.
+DB_PATH = os.path.join(tempfile.gettempdir(), "skill_matrix_tests.db")
+os.environ["SQLALCHEMY_DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+
+PASSWORD = "test-password"
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture(scope="session")
+def org():
+    '''
+    A generated organisation of 1000 profiles; user0 is the root manager and an admin.
+    '''
+    import main  # noqa: F401, registers every model
+    from src.Api.database import engine, Base
+    from src.Api.datagen import Distribution, generate
+
+    if os.path.exists(DB_PATH):
+        os.remove(DB_PATH)
+    Base.metadata.create_all(engine)
+    distribution = Distribution(users=1000, skills=100, skills_per_user=(2, 6), projects=20,
+                                designations=10, competencies=10, password=PASSWORD)
+    with engine.begin() as connection:
+        return generate(connection, distribution, progress=lambda _: None)
+
+
+@pytest.fixture(scope="session")
+def client(org):
+    from fastapi.testclient import TestClient
+    from main import app
+
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture(scope="session")
+def admin_headers(org, client):
+    response = client.post("/auth/login", json={"email": org.email(0), "password": PASSWORD})
+    return {"authorization": "Bearer " + response.json()["data"]["access_token"]}
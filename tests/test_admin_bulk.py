@@ -0,0 +1,89 @@
+from sqlalchemy import select, func
+
+from src.Api.models import Role
+
+
+def role_count(name):
+    from src.Api.database import engine
+
+    with engine.connect() as connection:
+        return connection.execute(
+            select(func.count()).select_from(Role).where(Role.role_name==name)
+        ).scalar()
+
+
+def test_bulk_create_reports_the_failing_items(org, client, admin_headers):
+    permission_id = str(org.permission_ids[0])
+    response = client.post("/admin/role/bulk", headers=admin_headers, json=[
+        {"role_name": "bulk-ok", "permissions": [permission_id]},
+        {"role_name": "bulk-bad", "permissions": [permission_id, "bad"]},
+        {"role_name": "bulk-ok", "permissions": []},
+        {"role_name": "bulk-bad", "permissions": ["worse"]},
+    ])
+
+    assert response.status_code == 400
+    assert response.json()["data"] == [
+        {"index": 1, "error": "Invalid id: 'bad'"},
+        {"index": 3, "error": "Invalid id: 'worse'"},
+    ]
+    assert role_count("bulk-ok") == role_count("bulk-bad") == 0
+
+
+def test_bulk_update_reports_the_failing_items_by_id(org, client, admin_headers):
+    response = client.post("/admin/role/bulk", headers=admin_headers, json=[
+        {"role_name": "bulk-update", "permissions": []},
+        {"role_name": "bulk-update", "permissions": []},
+    ])
+    assert response.status_code == 200
+    first, second = (status["id"] for status in response.json()["data"])
+
+    response = client.put("/admin/role/bulk", headers=admin_headers, json=[
+        {"id": first, "data": {"role_name": "bulk-updated", "permissions": []}},
+        {"id": second, "data": {"role_name": "bulk-updated", "permissions": ["bad"]}},
+    ])
+
+    assert response.status_code == 400
+    assert response.json()["data"] == [{"index": 1, "id": second, "error": "Invalid id: 'bad'"}]
+    assert role_count("bulk-update") == 2 and role_count("bulk-updated") == 0
+
+    response = client.put("/admin/role/bulk", headers=admin_headers, json=[
+        {"id": first, "data": {"role_name": "bulk-updated", "permissions": []}},
+    ])
+    assert response.status_code == 200
+    assert response.json()["data"] == [{"id": first, "status": "updated"}]
+
+
+def test_bulk_create_rejects_unknown_permission_ids(org, client, admin_headers):
+    unknown = "0190aaaa-0000-7000-8000-000000000000"
+    response = client.post("/admin/role/bulk", headers=admin_headers, json=[
+        {"role_name": "bulk-dangling", "permissions": [str(org.permission_ids[0])]},
+        {"role_name": "bulk-dangling", "permissions": [unknown.upper()]},
+    ])
+
+    assert response.status_code == 400
+    assert response.json()["data"] == [
+        {"index": 1, "error": f"Unknown permissions id: '{unknown.upper()}'"}
+    ]
+    assert role_count("bulk-dangling") == 0
+    assert client.get("/admin/skill-list", headers=admin_headers).status_code == 200
+
+
+def test_bulk_routes_accept_ids_in_any_spelling(org, client, admin_headers):
+    response = client.post("/admin/role/bulk", headers=admin_headers, json=[
+        {"role_name": "bulk-upper", "permissions": [str(org.permission_ids[0]).upper()]},
+    ])
+    assert response.status_code == 200
+    role_id = response.json()["data"][0]["id"]
+
+    response = client.put("/admin/role/bulk", headers=admin_headers, json=[
+        {"id": role_id.upper(), "data": {"role_name": "bulk-upper-renamed", "permissions": []}},
+    ])
+    assert response.status_code == 200
+    assert response.json()["data"] == [{"id": role_id, "status": "updated"}]
+    assert role_count("bulk-upper-renamed") == 1
+
+    response = client.request("DELETE", "/admin/role/bulk", headers=admin_headers,
+                              json={"ids": [role_id.upper()]})
+    assert response.status_code == 200
+    assert response.json()["data"] == [{"id": role_id, "status": "deleted"}]
+    assert role_count("bulk-upper-renamed") == 0
@@ -0,0 +1,53 @@
+from sqlalchemy import select
+
+from src.Api.helper import encode_cursor
+from src.Api.models import Project
+
+
+def project_rows():
+    from src.Api.database import engine
+
+    with engine.connect() as connection:
+        return connection.execute(
+            select(Project.id, Project.created_at).order_by(Project.created_at, Project.id)
+        ).all()
+
+
+def test_cursor_pages_cover_rows_created_in_the_same_second(org, client, admin_headers):
+    response = client.post("/admin/project/bulk", headers=admin_headers,
+                           json=[{"project_name": f"Paged {i}"} for i in range(8)])
+    assert response.status_code == 200
+    rows = project_rows()
+    assert len({created_at for _, created_at in rows}) < len(rows)
+
+    seen, cursor, pages = [], None, 0
+    while True:
+        params = {"limit": 10, **({"cursor": cursor} if cursor else {})}
+        response = client.get("/admin/project-list", headers=admin_headers, params=params)
+        assert response.status_code == 200
+        body = response.json()
+        seen += [project["id"] for project in body["data"]]
+        pages += 1
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+
+    assert seen == [id for id, _ in rows]
+    assert pages == -(-len(rows) // 10)
+
+
+def test_page_after_the_last_row_is_empty(org, client, admin_headers):
+    last_id, last_created_at = project_rows()[-1]
+    response = client.get("/admin/project-list", headers=admin_headers,
+                          params={"cursor": encode_cursor(last_created_at, last_id)})
+
+    assert response.status_code == 200
+    assert response.json()["data"] == []
+    assert response.json()["next_cursor"] is None
+
+
+def test_malformed_cursor_is_rejected(org, client, admin_headers):
+    response = client.get("/admin/project-list", headers=admin_headers, params={"cursor": "nope"})
+
+    assert response.status_code == 400
+    assert response.json()["message"] == "Invalid cursor."
@@ -0,0 +1,23 @@
+import pytest
+
+from src.Api.cache import CacheBackend, LRUCache
+
+
+def test_incomplete_backend_fails_on_instantiation():
+    class GetOnly(CacheBackend):
+        def get(self, key):
+            return None
+
+    with pytest.raises(TypeError):
+        GetOnly()
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(2, 60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert (cache.get("a"), cache.get("b"), cache.get("c")) == (1, None, 3)
+    assert cache.stats()["evictions"] == 1
@@ -0,0 +1,79 @@
+import base64
+
+from src.Api import helper
+from src.Api.helper import RESET_PASSWORD, VERIFY_EMAIL, create_email_token
+
+
+def tampered(token):
+    raw = bytearray(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+    raw[-1] ^= 1
+    return base64.urlsafe_b64encode(bytes(raw)).decode().rstrip("=")
+
+
+def verify(client, token):
+    return client.get("/auth/verify-email", params={"token": token})
+
+
+def update_password(client, email, token, password="changed-again"):
+    return client.post("/auth/update-password", json={
+        "email": email, "password": password, "confirm_password": password, "token": token,
+    })
+
+
+def test_tampered_signature_is_rejected(org, client):
+    email = org.email(980)
+    response = verify(client, tampered(create_email_token(email, VERIFY_EMAIL)))
+    assert response.status_code == 400
+    assert response.json()["message"] == "Verification failed. Invalid token."
+
+    response = update_password(client, email, tampered(create_email_token(email, RESET_PASSWORD)))
+    assert response.status_code == 400
+    assert response.json()["message"] == "Invalid token."
+
+
+def test_token_of_another_purpose_is_rejected(org, client):
+    email = org.email(981)
+    response = update_password(client, email, create_email_token(email, VERIFY_EMAIL))
+
+    assert response.status_code == 400
+    assert response.json()["message"] == "Invalid token."
+
+
+def test_token_of_another_email_is_rejected(org, client):
+    response = update_password(client, org.email(981), create_email_token(org.email(982), RESET_PASSWORD))
+
+    assert response.status_code == 400
+    assert response.json()["message"] == "Invalid token."
+
+
+def test_expired_token_is_rejected(org, client, monkeypatch):
+    email = org.email(983)
+    monkeypatch.setitem(helper.EMAIL_TOKEN_EXPIRY_IN_MINUTES, VERIFY_EMAIL, -1)
+    monkeypatch.setitem(helper.EMAIL_TOKEN_EXPIRY_IN_MINUTES, RESET_PASSWORD, -1)
+
+    response = verify(client, create_email_token(email, VERIFY_EMAIL))
+    assert response.status_code == 400
+    assert response.json()["message"] == "Verification failed. Token has expired."
+
+    response = update_password(client, email, create_email_token(email, RESET_PASSWORD))
+    assert response.status_code == 400
+    assert response.json()["message"] == "Token has expired."
+
+
+def test_tokens_work_only_once(org, client):
+    email = org.email(984)
+    token = create_email_token(email, VERIFY_EMAIL)
+    assert verify(client, token).status_code == 200
+    response = verify(client, token)
+    assert response.status_code == 400
+    assert response.json()["message"] == "Verification failed. Token has already been used."
+
+    token = create_email_token(email, RESET_PASSWORD)
+    # Checking a reset link doesn't use it up, changing the password does.
+    assert verify(client, token).status_code == 200
+    assert update_password(client, email, token).status_code == 200
+    response = update_password(client, email, token, "changed-twice")
+    assert response.status_code == 400
+    assert response.json()["message"] == "Token has already been used."
+    response = client.post("/auth/login", json={"email": email, "password": "changed-twice"})
+    assert response.status_code == 400
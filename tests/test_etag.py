@@ -0,0 +1,73 @@
+def create_project(client, headers, name):
+    response = client.post("/admin/project/bulk", headers=headers, json=[{"project_name": name}])
+    return response.json()["data"][0]["id"]
+
+
+def rename_project(client, headers, id, name):
+    response = client.put("/admin/project/bulk", headers=headers,
+                          json=[{"id": id, "data": {"project_name": name}}])
+    assert response.status_code == 200
+
+
+def test_get_answers_304_until_the_row_changes(org, client, admin_headers):
+    id = create_project(client, admin_headers, "ETag get")
+    response = client.get(f"/admin/project/{id}", headers=admin_headers)
+    etag = response.headers["etag"]
+
+    response = client.get(f"/admin/project/{id}", headers={**admin_headers, "if-none-match": etag})
+    assert response.status_code == 304
+
+    # Within the same second as the create, which a timestamp version can't tell apart.
+    rename_project(client, admin_headers, id, "ETag get renamed")
+    response = client.get(f"/admin/project/{id}", headers={**admin_headers, "if-none-match": etag})
+    assert response.status_code == 200
+    assert response.json()["data"]["project_name"] == "ETag get renamed"
+    assert response.headers["etag"] != etag
+
+
+def test_list_answers_304_until_the_table_changes(org, client, admin_headers):
+    id = create_project(client, admin_headers, "ETag list")
+    params = {"limit": 1000}
+    etag = client.get("/admin/project-list", headers=admin_headers, params=params).headers["etag"]
+
+    response = client.get("/admin/project-list", params=params,
+                          headers={**admin_headers, "if-none-match": etag})
+    assert response.status_code == 304
+
+    rename_project(client, admin_headers, id, "ETag list renamed")
+    response = client.get("/admin/project-list", params=params,
+                          headers={**admin_headers, "if-none-match": etag})
+    assert response.status_code == 200
+    assert "ETag list renamed" in [project["project_name"] for project in response.json()["data"]]
+    etag = response.headers["etag"]
+
+    response = client.request("DELETE", "/admin/project/bulk", headers=admin_headers, json={"ids": [id]})
+    assert response.status_code == 200
+    response = client.get("/admin/project-list", params=params,
+                          headers={**admin_headers, "if-none-match": etag})
+    assert response.status_code == 200
+    assert id not in [project["id"] for project in response.json()["data"]]
+
+
+def test_get_of_a_missing_row_is_not_cached_as_304(org, client, admin_headers):
+    id = create_project(client, admin_headers, "ETag missing")
+    etag = client.get(f"/admin/project/{id}", headers=admin_headers).headers["etag"]
+    response = client.request("DELETE", "/admin/project/bulk", headers=admin_headers, json={"ids": [id]})
+    assert response.status_code == 200
+
+    response = client.get(f"/admin/project/{id}", headers={**admin_headers, "if-none-match": etag})
+    assert response.status_code == 400
+
+
+def test_skills_created_by_an_import_change_the_skill_list_etag(org, client, admin_headers):
+    params = {"limit": 1000}
+    etag = client.get("/admin/skill-list", headers=admin_headers, params=params).headers["etag"]
+    csv = f"email_address,skill_name,skill_type\n{org.email(1)},ETag imported skill,primary\n"
+    response = client.post("/matrix/import", headers=admin_headers,
+                           files={"file": ("skills.csv", csv.encode(), "text/csv")})
+    assert response.json()["data"]["skills_created"] == 1
+
+    response = client.get("/admin/skill-list", params=params,
+                          headers={**admin_headers, "if-none-match": etag})
+    assert response.status_code == 200
+    assert "ETag imported skill" in [skill["skill_name"] for skill in response.json()["data"]]
@@ -0,0 +1,83 @@
+import pytest
+from sqlalchemy import select
+
+from src.Api.models import EmpSkill, SkillEvaluator
+
+
+@pytest.fixture(scope="module")
+def report_skills(org):
+    '''
+    (emp_skill id, already evaluated) of the skills the root manager evaluates.
+    '''
+    from src.Api.database import engine
+
+    with engine.connect() as connection:
+        rows = connection.execute(
+            select(EmpSkill.id, SkillEvaluator.id)
+            .outerjoin(SkillEvaluator, SkillEvaluator.employee_id==EmpSkill.id)
+            .where(EmpSkill.emp_manager_id==str(org.root_id))
+            .order_by(EmpSkill.id)
+        ).all()
+    return [(str(emp_skill_id), evaluation_id is not None) for emp_skill_id, evaluation_id in rows]
+
+
+def batch(employee_ids, rating=4):
+    return {"evaluations": [
+        {"employee_id": employee_id, "evaluator_rating": rating, "evaluator_comment": "Solid."}
+        for employee_id in employee_ids
+    ]}
+
+
+def test_ids_are_compared_in_canonical_form(client, admin_headers, report_skills):
+    employee_id = report_skills[0][0]
+    response = client.post("/matrix/evaluations", json=batch([employee_id.upper()]),
+                           headers=admin_headers)
+    assert response.status_code == 200
+
+    response = client.post("/matrix/evaluations", json=batch([employee_id, employee_id.upper()]),
+                           headers=admin_headers)
+    assert response.status_code == 400
+    assert response.json()["data"] == [
+        {"employee_id": employee_id.upper(), "error": "Duplicate employee_id."}
+    ]
+
+
+def test_batch_is_rejected_as_a_whole(org, client, admin_headers, report_skills):
+    employee_id = report_skills[1][0]
+    response = client.post("/matrix/evaluations",
+                           json=batch([employee_id, "bad", "0190aaaa-0000-7000-8000-000000000000"]),
+                           headers=admin_headers)
+
+    assert response.status_code == 400
+    assert response.json()["data"] == [
+        {"employee_id": "bad", "error": "Invalid id."},
+        {"employee_id": "0190aaaa-0000-7000-8000-000000000000", "error": "Employee skill not found."},
+    ]
+
+
+@pytest.mark.parametrize("rating", [0, 6])
+def test_rating_outside_the_scale_is_rejected(client, admin_headers, report_skills, rating):
+    response = client.post("/matrix/evaluations", json=batch([report_skills[0][0]], rating),
+                           headers=admin_headers)
+
+    assert response.status_code == 422
+
+
+def test_batch_upserts_and_marks_evaluated(client, admin_headers, report_skills):
+    from src.Api.database import engine
+
+    employee_ids = [employee_id for employee_id, _ in report_skills[2:]]
+    evaluated = sum(already for _, already in report_skills[2:])
+    response = client.post("/matrix/evaluations", json=batch(employee_ids, 2), headers=admin_headers)
+
+    assert response.status_code == 200
+    assert response.json()["data"] == {"received": len(employee_ids),
+                                       "created": len(employee_ids) - evaluated,
+                                       "updated": evaluated}
+    with engine.connect() as connection:
+        rows = connection.execute(
+            select(EmpSkill.is_evaluated, SkillEvaluator.evaluator_rating)
+            .join(SkillEvaluator, SkillEvaluator.employee_id==EmpSkill.id)
+            .where(EmpSkill.id.in_(employee_ids))
+        ).all()
+    assert sorted(rows) == [(True, 2)] * len(employee_ids)
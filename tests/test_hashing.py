@@ -0,0 +1,53 @@
+import time
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from src.Api.hashing import PasswordHashPool, _hash, _verify
+
+
+@pytest.fixture
+def pool():
+    pool = PasswordHashPool(size=1, queue_limit=0, timeout=30)
+    yield pool
+    pool.shutdown()
+
+
+def test_workers_are_spawned(pool):
+    pool.start()
+
+    assert pool._executor._mp_context.get_start_method() == "spawn"
+
+
+@pytest.mark.anyio
+async def test_hash_round_trip(pool):
+    password_hash = await pool.run(_hash, "secret")
+
+    assert await pool.run(_verify, "secret", password_hash)
+    assert not await pool.run(_verify, "wrong", password_hash)
+    assert pool.stats()["completed"] == 3
+
+
+@pytest.mark.anyio
+async def test_saturated_pool_answers_503(pool):
+    busy = asyncio.create_task(pool.run(time.sleep, 0.5))
+    await asyncio.sleep(0)
+
+    with pytest.raises(HTTPException) as error:
+        await pool.run(time.sleep, 0)
+    assert error.value.status_code == 503
+    assert pool.stats()["rejected"] == 1
+
+    await busy
+    await pool.run(time.sleep, 0)
+
+
+@pytest.mark.anyio
+async def test_slow_job_answers_503_after_the_timeout(pool):
+    pool.timeout = 0.1
+
+    with pytest.raises(HTTPException) as error:
+        await pool.run(time.sleep, 1)
+    assert error.value.status_code == 503
+    assert pool.stats()["timed_out"] == 1
@@ -0,0 +1,91 @@
+from sqlalchemy import select
+
+from src.Api import importer
+from src.Api.models import EmpSkill, Skill, User
+
+
+def import_csv(client, headers, content):
+    if isinstance(content, str):
+        content = content.encode()
+    return client.post("/matrix/import", headers=headers,
+                       files={"file": ("skills.csv", content, "text/csv")})
+
+
+def emp_skill(email, skill_name):
+    from src.Api.database import engine
+
+    with engine.connect() as connection:
+        return connection.execute(
+            select(EmpSkill.skill_type, EmpSkill.rate_by_self, EmpSkill.certificate)
+            .join(User, User.user_profile_id==EmpSkill.user_profile_id)
+            .join(Skill, Skill.id==EmpSkill.skill_id)
+            .where(User.email_address==email, Skill.skill_name==skill_name)
+        ).all()
+
+
+def test_last_row_for_an_employee_skill_wins(org, client, admin_headers):
+    email = org.email(970)
+    response = import_csv(client, admin_headers, (
+        "email_address,skill_name,skill_type,rate_by_self,certificate\n"
+        f"{email},Import wins,primary,1,first\n"
+        f"{email},Import wins,secondary,2,second\n"
+        f"{email},Import wins,primary,3,third\n"
+    ))
+
+    assert response.status_code == 200
+    report = response.json()["data"]
+    assert (report["received"], report["inserted"], report["superseded"]) == (3, 1, 2)
+    assert emp_skill(email, "Import wins") == [("primary", 3, "third")]
+
+    response = import_csv(client, admin_headers, (
+        "email_address,skill_name,skill_type,rate_by_self\n"
+        f"{email},Import wins,secondary,4\n"
+    ))
+    assert (response.json()["data"]["inserted"], response.json()["data"]["updated"]) == (0, 1)
+    assert emp_skill(email, "Import wins") == [("secondary", 4, None)]
+
+
+def test_rejected_rows_are_reported_by_line(org, client, admin_headers):
+    email = org.email(971)
+    response = import_csv(client, admin_headers, (
+        "email_address,skill_name,skill_type,rate_by_self\n"
+        f"{email},Import rejected,,1\n"
+        f"{email},Import rejected,primary,high\n"
+        "nobody@example.com,Import rejected,primary,1\n"
+        f"{email},Import accepted,primary,5\n"
+    ))
+
+    assert response.status_code == 200
+    report = response.json()["data"]
+    assert (report["received"], report["rejected"], report["inserted"]) == (4, 3, 1)
+    assert report["errors"] == [
+        {"line": 2, "error": "Empty skill_type."},
+        {"line": 3, "error": "rate_by_self must be an integer."},
+        {"line": 4, "error": "No user with a profile for nobody@example.com."},
+    ]
+    assert emp_skill(email, "Import rejected") == []
+    assert emp_skill(email, "Import accepted") == [("primary", 5, None)]
+
+
+def test_unusable_files_are_rejected(org, client, admin_headers):
+    response = import_csv(client, admin_headers, "email_address,skill_name\n")
+    assert response.status_code == 400
+    assert response.json()["message"] == "Invalid CSV file: Missing required column(s): skill_type."
+
+    response = import_csv(client, admin_headers,
+                          b"email_address,skill_name,skill_type\n\xff\xfe,bad,primary\n")
+    assert response.status_code == 400
+    assert response.json()["message"].startswith("Invalid CSV file: 'utf-8' codec can't decode")
+
+
+def test_batched_staging_without_copy(org, client, admin_headers, monkeypatch):
+    # The suite runs on SQLite, which stages with batched INSERTs instead of COPY.
+    monkeypatch.setattr(importer, "IMPORT_BATCH_SIZE", 2)
+    emails = [org.email(i) for i in range(972, 977)]
+    response = import_csv(client, admin_headers, "email_address,skill_name,skill_type\n" + "".join(
+        f"{email},Import batched,primary\n" for email in emails
+    ))
+
+    assert response.status_code == 200
+    assert response.json()["data"]["inserted"] == len(emails)
+    assert all(emp_skill(email, "Import batched") == [("primary", None, None)] for email in emails)
@@ -0,0 +1,25 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from src.Api.instrumentation import QueryStats, query_stats
+
+
+def test_failed_statements_leave_no_state_on_the_connection(org):
+    from src.Api.database import engine
+
+    stats = QueryStats()
+    token = query_stats.set(stats)
+    try:
+        with engine.connect() as connection:
+            for _ in range(3):
+                with pytest.raises(OperationalError):
+                    connection.execute(text("SELECT * FROM no_such_table"))
+            connection.execute(text("SELECT 1"))
+            info = dict(connection.connection.info)
+    finally:
+        query_stats.reset(token)
+
+    assert stats.count == 1
+    assert stats.total_seconds > 0
+    assert "query_start_time" not in info
@@ -0,0 +1,28 @@
+def test_malformed_filter_id_is_rejected_before_streaming(client, admin_headers):
+    response = client.get("/matrix", params={"project_id": "bad"}, headers=admin_headers)
+
+    assert response.status_code == 400
+    assert response.json() == {"message": "Invalid id: 'bad'", "data": {}}
+
+
+def test_filter_id_in_any_spelling_is_accepted(org, client, admin_headers):
+    designation_id = str(org.designation_ids[0])
+    lower = client.get("/matrix", params={"designation_id": designation_id}, headers=admin_headers)
+    upper = client.get("/matrix", params={"designation_id": designation_id.upper()},
+                       headers=admin_headers)
+
+    assert lower.status_code == upper.status_code == 200
+    assert lower.text and lower.text == upper.text
+
+
+def test_skill_search_limit_is_bounded(org, client, admin_headers):
+    criteria = [{"skill_id": str(org.skill_ids[0])}]
+    for limit in (0, -1, 1001):
+        response = client.post("/matrix/search", json={"criteria": criteria, "limit": limit},
+                               headers=admin_headers)
+        assert response.status_code == 422
+
+    response = client.post("/matrix/search", json={"criteria": criteria, "limit": 1},
+                           headers=admin_headers)
+    assert response.status_code == 200
+    assert len(response.json()["data"]) == 1
@@ -0,0 +1,163 @@
+import socket
+import asyncio
+
+import pytest
+from aiosmtpd.controller import Controller
+from aiosmtpd.smtp import AuthResult
+from fastapi import HTTPException
+from fastapi_mail import ConnectionConfig
+from sqlalchemy import create_engine, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.Api.database import async_database_url
+from src.Api.models import OutboxEmail
+from src.Api.outbox import EmailOutbox
+
+
+USERNAME = "outbox@example.com"
+PASSWORD = "secret"
+
+
+class Inbox:
+    def __init__(self) -> None:
+        self.messages = []
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append(envelope)
+        return "250 Message accepted for delivery"
+
+
+def authenticator(server, session, envelope, mechanism, auth_data):
+    return AuthResult(success=auth_data.login.decode() == USERNAME
+                      and auth_data.password.decode() == PASSWORD)
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def smtp_server():
+    inbox = Inbox()
+    controller = Controller(inbox, hostname="127.0.0.1", port=free_port(), authenticator=authenticator,
+                            auth_require_tls=False)
+    controller.start()
+    yield controller, inbox
+    controller.stop()
+
+
+@pytest.fixture
+async def session_factory(tmp_path):
+    '''
+    Sessions on a database of its own, which the app's outbox doesn't poll.
+    '''
+    url = f"sqlite:///{tmp_path / 'outbox.db'}"
+    engine = create_engine(url)
+    OutboxEmail.__table__.create(engine)
+    engine.dispose()
+    async_engine = create_async_engine(async_database_url(url))
+    yield sessionmaker(bind=async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+    await async_engine.dispose()
+
+
+def outbox_for(controller, session_factory, port=None, **kwargs):
+    settings = ConnectionConfig(
+        MAIL_USERNAME=USERNAME,
+        MAIL_PASSWORD=PASSWORD,
+        MAIL_FROM=USERNAME,
+        MAIL_PORT=port or controller.port,
+        MAIL_SERVER="127.0.0.1",
+        MAIL_STARTTLS=False,
+        MAIL_SSL_TLS=False,
+        USE_CREDENTIALS=True,
+        VALIDATE_CERTS=False,
+    )
+    kwargs.setdefault("poll_interval", 0.05)
+    return EmailOutbox(settings, session_factory, **kwargs)
+
+
+async def drain(outbox):
+    async def sent():
+        while await outbox.pending():
+            await asyncio.sleep(0.05)
+    await asyncio.wait_for(sent(), 10)
+    await outbox.stop()
+
+
+@pytest.mark.anyio
+async def test_queued_mail_is_delivered(smtp_server, session_factory):
+    controller, inbox = smtp_server
+    outbox = outbox_for(controller, session_factory, connections=2, batch_size=3)
+    for i in range(5):
+        await outbox.enqueue(f"user{i}@example.com", "Email Verification | Skill Matrix", f"<p>{i}</p>")
+    await drain(outbox)
+
+    assert sorted(envelope.rcpt_tos[0] for envelope in inbox.messages) == [
+        f"user{i}@example.com" for i in range(5)
+    ]
+    assert outbox.stats()["sent"] == 5
+    assert outbox.stats()["failed"] == 0
+
+
+@pytest.mark.anyio
+async def test_stopped_worker_is_restarted(smtp_server, session_factory):
+    controller, inbox = smtp_server
+    outbox = outbox_for(controller, session_factory, connections=1)
+    outbox.start()
+    outbox._workers[0].cancel()
+    await asyncio.gather(*outbox._workers, return_exceptions=True)
+
+    await outbox.enqueue("user@example.com", "Email Verification | Skill Matrix", "<p>hi</p>")
+    await drain(outbox)
+
+    assert len(inbox.messages) == 1
+
+
+@pytest.mark.anyio
+async def test_mail_survives_a_restart_and_a_dead_worker(smtp_server, session_factory):
+    controller, inbox = smtp_server
+    # No workers: the process stops before sending anything.
+    stopped = outbox_for(controller, session_factory, connections=0)
+    await stopped.enqueue("first@example.com", "Email Verification | Skill Matrix", "<p>1</p>")
+    await stopped.enqueue("second@example.com", "Email Verification | Skill Matrix", "<p>2</p>")
+    await stopped.stop()
+    # A worker that claims a row and dies before sending it.
+    dead = outbox_for(controller, session_factory, connections=0, batch_size=1, lease=0)
+    assert len(await dead._claim()) == 1
+
+    outbox = outbox_for(controller, session_factory, connections=1)
+    outbox.start()
+    await drain(outbox)
+
+    assert sorted(envelope.rcpt_tos[0] for envelope in inbox.messages) == [
+        "first@example.com", "second@example.com"
+    ]
+
+
+@pytest.mark.anyio
+async def test_failed_mail_is_retried_then_kept(smtp_server, session_factory):
+    controller, inbox = smtp_server
+    outbox = outbox_for(controller, session_factory, port=free_port(), connections=1,
+                        max_retries=1, backoff=0)
+    await outbox.enqueue("user@example.com", "Email Verification | Skill Matrix", "<p>hi</p>")
+    await drain(outbox)
+
+    assert (outbox.stats()["retried"], outbox.stats()["failed"]) == (1, 1)
+    async with session_factory() as db:
+        row = (await db.execute(select(OutboxEmail))).scalars().one()
+    assert row.attempts == 2 and row.failed_at is not None and row.last_error
+
+
+@pytest.mark.anyio
+async def test_full_outbox_answers_503(smtp_server, session_factory):
+    controller, inbox = smtp_server
+    outbox = outbox_for(controller, session_factory, connections=0, max_size=1)
+    await outbox.enqueue("first@example.com", "Email Verification | Skill Matrix", "<p>1</p>")
+
+    with pytest.raises(HTTPException) as error:
+        await outbox.enqueue("second@example.com", "Email Verification | Skill Matrix", "<p>2</p>")
+    assert error.value.status_code == 503
+    assert outbox.stats()["rejected"] == 1
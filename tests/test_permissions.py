@@ -0,0 +1,78 @@
+import uuid
+
+import pytest
+from sqlalchemy import insert, select
+
+from src.Api.models import RolePermission, UserRole
+from tests.conftest import PASSWORD
+
+
+@pytest.fixture(scope="module")
+def user_headers(org, client):
+    '''
+    Headers of a generated user that holds no roles.
+    '''
+    from src.Api.database import engine
+
+    with engine.connect() as connection:
+        with_roles = set(connection.execute(select(UserRole.user_profile_id)).scalars())
+    index = next(i for i, id in enumerate(org.profile_ids) if id not in with_roles)
+    response = client.post("/auth/login", json={"email": org.email(index), "password": PASSWORD})
+    return org.profile_ids[index], {"authorization": "Bearer " + response.json()["data"]["access_token"]}
+
+
+def grant(role_id, user_profile_id=None, permission_id=None):
+    from src.Api.database import engine
+
+    with engine.begin() as connection:
+        if user_profile_id is not None:
+            connection.execute(insert(UserRole).values(role_id=role_id, user_profile_id=user_profile_id))
+        if permission_id is not None:
+            connection.execute(insert(RolePermission).values(role_id=role_id, permission_id=permission_id))
+
+
+def test_missing_permission_is_forbidden(client, user_headers):
+    _, headers = user_headers
+    response = client.get("/admin/project-list", headers=headers)
+
+    assert response.status_code == 403
+    assert response.json()["detail"] == "Permission denied"
+
+
+def test_role_and_permission_writes_apply_immediately(client, admin_headers, user_headers):
+    user_profile_id, headers = user_headers
+    response = client.post("/admin/role/bulk", headers=admin_headers,
+                           json=[{"role_name": "rbac-test", "permissions": []}])
+    role_id = response.json()["data"][0]["id"]
+    grant(uuid.UUID(role_id), user_profile_id=user_profile_id)
+    assert client.get("/admin/skill-list", headers=headers).status_code == 403
+
+    response = client.post("/admin/permission/bulk", headers=admin_headers,
+                           json=[{"name": "rbac-test", "operation": "read"}])
+    permission_id = response.json()["data"][0]["id"]
+    response = client.put("/admin/role/bulk", headers=admin_headers, json=[
+        {"id": role_id, "data": {"role_name": "rbac-test", "permissions": [permission_id]}}])
+    assert response.status_code == 200
+    assert client.get("/admin/skill-list", headers=headers).status_code == 403
+
+    # The role write dropped the cached masks; the permission write must as well.
+    response = client.put(f"/admin/permission/{permission_id}", headers=admin_headers,
+                          json={"name": "skill", "operation": "read"})
+    assert response.status_code == 200
+    assert client.get("/admin/skill-list", headers=headers).status_code == 200
+
+    response = client.put("/admin/role/bulk", headers=admin_headers, json=[
+        {"id": role_id, "data": {"role_name": "rbac-test", "permissions": []}}])
+    assert response.status_code == 200
+    assert client.get("/admin/skill-list", headers=headers).status_code == 403
+
+
+def test_dangling_role_permission_is_ignored(client, admin_headers):
+    from src.Api.permissions import permission_engine
+
+    response = client.post("/admin/role/bulk", headers=admin_headers,
+                           json=[{"role_name": "rbac-dangling", "permissions": []}])
+    grant(uuid.UUID(response.json()["data"][0]["id"]), permission_id=uuid.uuid4())
+    permission_engine.invalidate()
+
+    assert client.get("/admin/skill-list", headers=admin_headers).status_code == 200
@@ -0,0 +1,52 @@
+import pytest
+
+from src.Api.instrumentation import QueryStats, query_stats
+
+
+def count_profile_queries(profile_ids):
+    '''
+    Queries issued to load and serialize `profile_ids` with the profile graph plan.
+    '''
+    from src.Api.database import SessionLocal
+    from src.Api.views.org_view import load_profiles, profile_data
+
+    stats = QueryStats()
+    token = query_stats.set(stats)
+    try:
+        with SessionLocal() as db:
+            data = [profile_data(profile) for profile in load_profiles(db, profile_ids)]
+    finally:
+        query_stats.reset(token)
+    assert len(data) == len(profile_ids)
+    return stats.count
+
+
+def test_profile_graph_query_count_is_constant(org):
+    profile_ids = [str(profile_id) for profile_id in org.profile_ids]
+    counts = {size: count_profile_queries(profile_ids[:size]) for size in (1, 10, 1000)}
+
+    assert len(profile_ids) == 1000
+    assert counts[1] == counts[10] == counts[1000], counts
+
+
+@pytest.mark.parametrize("size", [1, 1000])
+def test_profiles_endpoint_returns_the_graph_in_request_order(org, client, admin_headers, size):
+    profile_ids = [str(profile_id) for profile_id in reversed(org.profile_ids)][:size]
+    response = client.post("/org/profiles", json={"ids": profile_ids}, headers=admin_headers)
+
+    assert response.status_code == 200
+    profiles = response.json()["data"]
+    assert [profile["user_profile_id"] for profile in profiles] == profile_ids
+    assert all(profile["full_name"] and profile["skills"] for profile in profiles)
+
+
+def test_profile_endpoint(org, client, admin_headers):
+    profile_id = str(org.profile_ids[1])
+    response = client.get(f"/org/{profile_id}", headers=admin_headers)
+
+    assert response.status_code == 200
+    profile = response.json()["data"]
+    assert profile["user_profile_id"] == profile_id
+    assert profile["manager"]["user_profile_id"] == str(org.root_id)
+    missing = client.get("/org/0190aaaa-0000-7000-8000-000000000000", headers=admin_headers)
+    assert missing.status_code == 404
@@ -0,0 +1,81 @@
+import datetime
+
+from sqlalchemy import update
+
+from src.Api.helper import (RESET_PASSWORD, create_email_token, decode_jwt_token,
+                            hash_refresh_token)
+from src.Api.models import RefreshToken
+from tests.conftest import PASSWORD
+
+
+def login(client, email, password=PASSWORD):
+    response = client.post("/auth/login", json={"email": email, "password": password})
+    assert response.status_code == 200
+    return response.json()["data"]["refresh_token"]
+
+
+def refresh(client, refresh_token):
+    return client.post("/auth/refresh", json={"refresh_token": refresh_token})
+
+
+def test_refresh_rotates_the_token(org, client):
+    first = login(client, org.email(990))
+
+    response = refresh(client, first)
+    assert response.status_code == 200
+    second = response.json()["data"]["refresh_token"]
+    assert second != first
+    assert decode_jwt_token(response.json()["data"]["access_token"])["email"] == org.email(990)
+
+    assert refresh(client, second).status_code == 200
+
+
+def test_reusing_a_rotated_token_revokes_its_family(org, client):
+    first = login(client, org.email(991))
+    other_login = login(client, org.email(991))
+    second = refresh(client, first).json()["data"]["refresh_token"]
+
+    response = refresh(client, first)
+    assert response.status_code == 401
+    assert response.json()["message"] == "Invalid refresh token."
+    # The successor is revoked with the reused token, other logins are not.
+    assert refresh(client, second).status_code == 401
+    assert refresh(client, other_login).status_code == 200
+
+
+def test_logout_revokes_the_login(org, client):
+    first = login(client, org.email(992))
+    second = refresh(client, first).json()["data"]["refresh_token"]
+
+    assert client.post("/auth/logout", json={"refresh_token": second}).status_code == 200
+    assert refresh(client, second).status_code == 401
+
+
+def test_expired_token_is_rejected(org, client):
+    from src.Api.database import engine
+
+    token = login(client, org.email(993))
+    with engine.begin() as connection:
+        connection.execute(
+            update(RefreshToken)
+            .where(RefreshToken.token_hash==hash_refresh_token(token))
+            .values(expires_at=datetime.datetime.now(tz=datetime.timezone.utc)
+                    - datetime.timedelta(seconds=1))
+        )
+
+    assert refresh(client, token).status_code == 401
+
+
+def test_password_change_revokes_every_login(org, client):
+    email = org.email(994)
+    first, second = login(client, email), login(client, email)
+
+    response = client.post("/auth/update-password", json={
+        "email": email, "password": "changed", "confirm_password": "changed",
+        "token": create_email_token(email, RESET_PASSWORD),
+    })
+    assert response.status_code == 200
+
+    assert refresh(client, first).status_code == 401
+    assert refresh(client, second).status_code == 401
+    assert refresh(client, login(client, email, "changed")).status_code == 200
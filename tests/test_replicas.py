@@ -0,0 +1,28 @@
+import pytest
+
+from src.Api.database import SessionLocal, AsyncSessionLocal
+from src.Api.replicas import replica_router
+
+
+@pytest.fixture
+def writes(monkeypatch):
+    keys = []
+    monkeypatch.setattr(replica_router, "mark_write", keys.append)
+    return keys
+
+
+def test_commit_pins_the_writer(org, writes):
+    with SessionLocal() as db:
+        db.info["writer"] = "Bearer sync"
+        db.commit()
+
+    assert writes == ["Bearer sync"]
+
+
+@pytest.mark.anyio
+async def test_async_commit_pins_the_writer(org, writes):
+    async with AsyncSessionLocal() as db:
+        db.info["writer"] = "Bearer async"
+        await db.commit()
+
+    assert writes == ["Bearer async"]
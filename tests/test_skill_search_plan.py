@@ -0,0 +1,59 @@
+import pytest
+from sqlalchemy import select
+
+from src.Api.models import EmpSkill, SkillEvaluator
+from src.Api.pydantic_models import PydanticSkillSearch
+from src.Api.views.matrix_view import skill_search_query
+
+
+def query_plan(query):
+    '''
+    SQLite's EXPLAIN QUERY PLAN lines for a query, with its parameters inlined.
+    '''
+    from src.Api.database import engine
+
+    sql = str(query.compile(engine, compile_kwargs={"literal_binds": True}))
+    with engine.connect() as connection:
+        return [row[3] for row in connection.exec_driver_sql("EXPLAIN QUERY PLAN " + sql)]
+
+
+def assert_no_scan(plan, *tables):
+    scans = [line for line in plan if line.split()[:2] in (["SCAN", table] for table in tables)]
+    assert not scans, plan
+
+
+@pytest.mark.parametrize("match", ["all", "any"])
+@pytest.mark.parametrize("min_evaluated_rating", [None, 3])
+def test_skill_search_uses_skill_rating_index(org, match, min_evaluated_rating):
+    search = PydanticSkillSearch(
+        criteria=[
+            {"skill_id": str(org.skill_ids[0]), "min_self_rating": 2,
+             "min_evaluated_rating": min_evaluated_rating},
+            {"skill_id": str(org.skill_ids[1])},
+        ],
+        match=match,
+        occupied=True,
+    )
+    plan = query_plan(skill_search_query(search))
+
+    emp_skill_lines = [line for line in plan if " emp_skill " in f"{line} "]
+    assert emp_skill_lines and all(
+        line.startswith("SEARCH emp_skill USING") and "INDEX ix_emp_skill_skill_id_rate_by_self" in line
+        for line in emp_skill_lines
+    ), plan
+    assert_no_scan(plan, "emp_skill", "skill_evaluator", "user_profile", "user")
+    if min_evaluated_rating is not None:
+        assert any(line.startswith("SEARCH skill_evaluator USING") and "(employee_id=?)" in line
+                   for line in plan), plan
+
+
+@pytest.mark.parametrize("column, index", [
+    (EmpSkill.user_profile_id, "ix_emp_skill_user_profile_id"),
+    (EmpSkill.emp_manager_id, "ix_emp_skill_emp_manager_id"),
+    (SkillEvaluator.evaluator_id, "ix_skill_evaluator_evaluator_id"),
+])
+def test_foreign_key_lookups_use_their_index(org, column, index):
+    plan = query_plan(select(column.class_.id).where(column==str(org.profile_ids[0])))
+
+    assert any(f"INDEX {index} " in line for line in plan), plan
+    assert_no_scan(plan, column.class_.__tablename__)